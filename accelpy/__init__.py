@@ -20,19 +20,63 @@ __version__ = '1.0.0-beta.2'
 __copyright__ = "Copyright 2018 Accelize"
 __licence__ = "Apache 2.0"
 
-from sys import version_info as _py
-if (_py[0] < 3) or (_py[0] == 3 and _py[1] < 6):
+from sys import version_info as _version_info
+if _version_info < (3, 6):
     from sys import version
     raise ImportError(
         'Accelpy require Python 3.6 or more (Currently %s)' % version)
-del _py
 
-from accelpy._application import lint
-from accelpy._host import Host, iter_hosts
+__all__ = ['Host', 'HostInfo', 'Fleet', 'Pool', 'iter_hosts',
+           'iter_hosts_info', 'lint', 'exceptions']
 
-__all__ = ['Host', 'iter_hosts', 'lint', 'exceptions']
+# Public objects are imported on first access, this avoid loading the whole
+# package when only a part of it is required (Like with the command line)
+_LAZY = dict(
+    lint='accelpy._application', Host='accelpy._host',
+    iter_hosts='accelpy._host', iter_hosts_info='accelpy._host',
+    Fleet='accelpy._fleet', Pool='accelpy._pool', HostInfo='accelpy._registry')
 
-# Makes cleaner namespace
-for _name in __all__:
-    locals()[_name].__module__ = __name__
-del _name
+
+def __getattr__(name):
+    """
+    Import public objects on first access.
+
+    Args:
+        name (str): Object name.
+
+    Returns:
+        object: Public object.
+    """
+    from importlib import import_module
+
+    if name == 'exceptions':
+        return import_module('accelpy.exceptions')
+
+    try:
+        module = _LAZY[name]
+    except KeyError:
+        raise AttributeError(f"module '{__name__}' has no attribute '{name}'")
+
+    value = getattr(import_module(module), name)
+
+    # Makes cleaner namespace
+    value.__module__ = __name__
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    """
+    Module attributes.
+
+    Returns:
+        list of str: Attributes names.
+    """
+    return sorted(set(globals()) | set(__all__))
+
+
+if _version_info < (3, 7):
+    # Module "__getattr__" is not supported
+    for _name in __all__:
+        __getattr__(_name)
+    del _name
@@ -3,68 +3,200 @@
 """Command line interface"""
 
 
-def _host(args, init=False, **kwargs):
+def _host_name(args):
     """
-    Return Host instance.
+    Return the name of an existing host configuration.
 
     Args:
         args (argparse.Namespace): CLI arguments.
-        kwargs: accelpy._host.Host keyword arguments.
 
     Returns:
-        accelpy._host.Host: Host instance.
+        str: Host name.
     """
     from os.path import join, isfile, isdir
-
-    from accelpy import Host
     from accelpy._common import HOME_DIR
 
     name = args.name
     latest_path = join(HOME_DIR, 'hosts/latest')
 
+    if not name and isfile(latest_path):
+        # Use latest used name if "--name" not specified
+        with open(latest_path, 'rt') as latest_file:
+            latest = latest_file.read()
+
+        if isdir(join(HOME_DIR, 'hosts', latest)):
+            name = latest
+
+    if not name:
+        raise OSError(f'A new configuration needs to be created first with '
+                      f'"init", or an existing configuration must be '
+                      f'specified with "--name".')
+
+    elif name and not isdir(join(HOME_DIR, 'hosts', name)):
+        raise OSError(f'No configuration named "{name}".')
+
+    return name
+
+
+def _host(args, init=False, **kwargs):
+    """
+    Return Host instance.
+
+    Args:
+        args (argparse.Namespace): CLI arguments.
+        kwargs: accelpy._host.Host keyword arguments.
+
+    Returns:
+        accelpy._host.Host: Host instance.
+    """
+    from accelpy import Host
+
     if init:
         # Create a new configuration
+        name = args.name
         kwargs.update(dict(application=args.application, provider=args.provider,
                            user_config=args.user_config))
     else:
         # Load an existing configuration
-        if not name and isfile(latest_path):
-            # Use latest used name if "--name" not specified
-            with open(latest_path, 'rt') as latest_file:
-                latest = latest_file.read()
-
-            if isdir(join(HOME_DIR, 'hosts', latest)):
-                name = latest
-
-        if not name:
-            raise OSError(f'A new configuration needs to be created first with '
-                          f'"init", or an existing configuration must be '
-                          f'specified with "--name".')
-
-        elif name and not isdir(join(HOME_DIR, 'hosts', name)):
-            raise OSError(f'No configuration named "{name}".')
+        name = _host_name(args)
 
     # Create host object
     host = Host(name=name, **kwargs)
 
-    if not name:
-        print(host.name)
-
     # Save name as latest used name
-    with open(latest_path, 'wt') as latest_file:
-        latest_file.write(host.name)
+    if not kwargs.get('readonly'):
+        _set_latest(host.name)
 
     return host
 
 
+def _host_output(args, attribute):
+    """
+    Return a Terraform output of an existing host.
+
+    The Terraform state is read directly, without loading the host
+    configuration, if possible.
+
+    Args:
+        args (argparse.Namespace): CLI arguments.
+        attribute (str): accelpy._host.Host attribute name.
+
+    Returns:
+        str: Output value.
+    """
+    from os.path import join
+    from accelpy._common import HOME_DIR
+    from accelpy._server import OUTPUTS
+
+    name = _host_name(args)
+    forwarded, output = _request(attribute, name=name)
+    if forwarded:
+        return output
+
+    from accelpy._terraform import read_local_state
+    from accelpy.exceptions import ConfigurationException
+
+    state = read_local_state(join(HOME_DIR, 'hosts', name))
+    if state is None:
+        # State can not be read directly, use Terraform
+        return getattr(_host(args, readonly=True), attribute)
+
+    try:
+        return state['outputs'][OUTPUTS[attribute]]
+    except KeyError:
+        raise ConfigurationException('Configuration not applied.')
+
+
+def _operation(args, operation, **kwargs):
+    """
+    Run an operation on an existing host, in the accelpy daemon if running.
+
+    Args:
+        args (argparse.Namespace): CLI arguments.
+        operation (str): accelpy._host.Host method name.
+        kwargs: Operation keyword arguments.
+
+    Returns:
+        object: Operation result.
+    """
+    name = _host_name(args)
+    forwarded, result = _request(
+        operation, line_callback=None if kwargs.get('quiet', True) else print,
+        name=name, **kwargs)
+    if forwarded:
+        _set_latest(name)
+        return result
+
+    return getattr(_host(args), operation)(**kwargs)
+
+
+def _request(command, line_callback=None, **kwargs):
+    """
+    Run a command in the accelpy daemon if running.
+
+    Args:
+        command (str): Command, see "accelpy._server.COMMANDS".
+        line_callback (callable): Function called with each output line.
+        kwargs: Command keyword arguments.
+
+    Returns:
+        tuple: True and the command result if run by the daemon, else False
+            and None.
+    """
+    from accelpy._server import request
+
+    try:
+        return True, request(command, line_callback=line_callback, **kwargs)
+    except (FileNotFoundError, ConnectionRefusedError):
+        # Daemon not running
+        return False, None
+
+
+def _set_latest(name):
+    """
+    Save name as latest used name.
+
+    Args:
+        name (str): Host name.
+    """
+    from os.path import join
+    from accelpy._common import HOME_DIR
+
+    path = join(HOME_DIR, 'hosts/latest')
+    try:
+        with open(path, 'rt') as latest_file:
+            if latest_file.read() == name:
+                return
+    except OSError:
+        pass
+
+    with open(path, 'wt') as latest_file:
+        latest_file.write(name)
+
+
 def _action_init(args):
     """
     accelpy._host.Host instantiation
 
     Args:
         args (argparse.Namespace): CLI arguments.
+
+    Returns:
+        str: Names of created hosts if many hosts are created or if the name
+            is generated.
     """
-    _host(args, init=True)
+    if args.count > 1:
+        from accelpy import Host
+
+        hosts = Host.create_many(
+            args.count, application=args.application, provider=args.provider,
+            user_config=args.user_config, name=args.name)
+        _set_latest(hosts[-1].name)
+        return '\n'.join(host.name for host in hosts)
+
+    host = _host(args, init=True)
+    if not args.name:
+        return host.name
 
 
 def _action_plan(args):
@@ -77,7 +209,7 @@ def _action_plan(args):
     Returns:
         str: command output.
     """
-    return _host(args).plan()
+    return _operation(args, 'plan')
 
 
 def _action_apply(args):
@@ -90,7 +222,7 @@ def _action_apply(args):
     Returns:
         str: command output.
     """
-    return _host(args).apply(quiet=args.quiet)
+    return _operation(args, 'apply', quiet=args.quiet)
 
 
 def _action_build(args):
@@ -103,8 +235,9 @@ def _action_build(args):
     Returns:
         str: command output.
     """
-    return _host(args).build(
-        update_application=args.update_application, quiet=args.quiet)
+    return _operation(
+        args, 'build', update_application=args.update_application,
+        quiet=args.quiet, cache=not args.no_cache)
 
 
 def _action_destroy(args):
@@ -117,7 +250,45 @@ def _action_destroy(args):
     Returns:
         str: command output.
     """
-    return _host(args, keep_config=not args.delete).destroy(quiet=args.quiet)
+    if args.all or args.provider or args.application:
+        return _destroy_many(args)
+    return _operation(args, 'destroy', quiet=args.quiet, delete=args.delete)
+
+
+def _destroy_many(args):
+    """
+    accelpy._fleet.Fleet.destroy
+
+    Args:
+        args (argparse.Namespace): CLI arguments.
+
+    Returns:
+        str: Operations summary.
+    """
+    from os.path import join
+    from accelpy import Fleet
+    from accelpy._fleet import DESTROY_JOURNAL_FILE
+    from accelpy._host import CONFIG_DIR
+    from accelpy.exceptions import ConfigurationException, RuntimeException
+
+    if args.name:
+        raise ConfigurationException(
+            '"--name" can not be used with "--all", "--provider" or '
+            '"--application".')
+
+    fleet = Fleet.select(provider=args.provider, application=args.application,
+                         workers=args.workers)
+    if not len(fleet):
+        raise OSError('No configuration selected.')
+
+    results = fleet.destroy(
+        delete=args.delete, rate=args.rate,
+        journal=args.journal or join(CONFIG_DIR, DESTROY_JOURNAL_FILE))
+
+    summary = fleet.summary(results)
+    if any(result['error'] for result in results.values()):
+        raise RuntimeException(summary)
+    return summary
 
 
 def _action_ssh_private_key(args):
@@ -130,7 +301,13 @@ def _action_ssh_private_key(args):
     Returns:
         str: command output.
     """
-    return _host(args).ssh_private_key
+    from os.path import isabs, join
+    from accelpy._common import HOME_DIR
+
+    path = _host_output(args, 'ssh_private_key')
+    return (path if isabs(path) else
+            # Terraform returns relative path as "./file"
+            join(HOME_DIR, 'hosts', _host_name(args), path.lstrip('./')))
 
 
 def _action_ssh_user(args):
@@ -143,7 +320,7 @@ def _action_ssh_user(args):
     Returns:
         str: command output.
     """
-    return _host(args).ssh_user
+    return _host_output(args, 'ssh_user')
 
 
 def _action_private_ip(args):
@@ -156,7 +333,7 @@ def _action_private_ip(args):
     Returns:
         str: command output.
     """
-    return _host(args).private_ip
+    return _host_output(args, 'private_ip')
 
 
 def _action_public_ip(args):
@@ -169,18 +346,464 @@ def _action_public_ip(args):
     Returns:
         str: command output.
     """
-    return _host(args).public_ip
+    return _host_output(args, 'public_ip')
 
 
-def _action_list(_):
+def _action_info(args):
+    """
+    accelpy._host.Host.info
+
+    Args:
+        args (argparse.Namespace): CLI arguments.
+
+    Returns:
+        str: command output.
+    """
+    forwarded, infos = _request(
+        'info', name=None if args.all else _host_name(args))
+    if forwarded:
+        if not args.all:
+            infos = [infos]
+
+    elif args.all:
+        from accelpy import Host
+        from accelpy._host import iter_host_names
+        infos = [Host(name=name, readonly=True).info()
+                 for name in iter_host_names()]
+    else:
+        infos = [_host(args, readonly=True).info()]
+
+    if args.json:
+        from json import dumps
+        return dumps(infos if args.all else infos[0])
+
+    lines = []
+    for info in infos:
+        if lines:
+            lines.append('')
+        outputs = info.pop('outputs')
+        lines.extend(f'{key}: {"" if value is None else value}'
+                     for key, value in info.items())
+        lines.extend(f'outputs.{key}: {value}'
+                     for key, value in sorted(outputs.items()))
+    return '\n'.join(lines)
+
+
+def _action_list(args):
     """
     Return a list of hosts.
 
+    Args:
+        args (argparse.Namespace): CLI arguments.
+
     Returns:
         str: Hosts list.
     """
-    from accelpy import iter_hosts
-    return '\n'.join(host.name for host in iter_hosts())
+    application = args.application
+    if application is not None:
+        # The daemon may not run in the same directory
+        from os import fsdecode
+        from os.path import realpath
+        application = realpath(fsdecode(application))
+
+    kwargs = dict(
+        provider=args.provider, application=application, status=args.status)
+    forwarded, names = _request('list', **kwargs)
+    if not forwarded:
+        from accelpy._host import iter_host_names
+        names = iter_host_names(**kwargs)
+    return '\n'.join(names)
+
+
+def _action_fleet(args):
+    """
+    accelpy._fleet.Fleet operations.
+
+    Args:
+        args (argparse.Namespace): CLI arguments.
+
+    Returns:
+        str: Operations summary.
+    """
+    from accelpy import Fleet
+    from accelpy.exceptions import RuntimeException
+
+    fleet = Fleet(names=args.name, pattern=args.pattern, workers=args.workers)
+    if not len(fleet):
+        raise OSError('No configuration selected.')
+
+    operation = args.operation
+    if operation == 'build':
+        results = fleet.build(update_application=args.update_application,
+                              cache=not args.no_cache)
+    elif operation == 'destroy':
+        results = fleet.destroy(delete=args.delete)
+    else:
+        results = fleet.apply(build_once=args.build_once,
+                              cache=not args.no_cache)
+
+    summary = fleet.summary(results)
+    if any(result['error'] for result in results.values()):
+        raise RuntimeException(summary)
+    return summary
+
+
+def _action_sync(args):
+    """
+    accelpy._host.Host.update_configuration
+
+    Args:
+        args (argparse.Namespace): CLI arguments.
+
+    Returns:
+        str: command output.
+    """
+    from accelpy import Fleet
+    from accelpy.exceptions import RuntimeException
+
+    upgrades = dict()
+    if args.name or args.pattern:
+        fleet = Fleet(names=args.name, pattern=args.pattern,
+                      workers=args.workers)
+        if not len(fleet):
+            raise OSError('No configuration selected.')
+        if args.upgrade:
+            upgrades = fleet.upgrade_utilities()
+        results = fleet.update_configuration()
+    else:
+        host = _host(args)
+        if args.upgrade:
+            upgrades = {host.name: dict(result=host.upgrade_utilities(),
+                                        error=None)}
+        results = {host.name: dict(result=host.update_configuration(),
+                                   error=None)}
+
+    lines = []
+    for name in sorted(upgrades):
+        result = upgrades[name]
+        if result['error']:
+            lines.append(f'{name}: upgrade failed: {result["error"]}')
+            continue
+        lines.extend(
+            f'{name}: {utility} upgraded from {previous} to {version}'
+            for utility, (previous, version) in sorted(
+                result['result'].items()) if previous != version)
+
+    for name in sorted(results):
+        result = results[name]
+        if result['error']:
+            lines.append(f'{name}: failed: {result["error"]}')
+            continue
+
+        updated = [utility for utility in ('terraform', 'ansible', 'packer')
+                   if result['result'][utility]]
+        line = f'{name}: {", ".join(updated)} updated' if updated else \
+            f'{name}: up to date'
+        if result['result']['terraform_init']:
+            line += ' (Terraform will be initialized again)'
+        lines.append(line)
+
+    output = '\n'.join(lines)
+    if any(result['error'] for result in (
+            *results.values(), *upgrades.values())):
+        raise RuntimeException(output)
+    return output
+
+
+def _action_pool(args):
+    """
+    accelpy._pool.Pool operations.
+
+    Args:
+        args (argparse.Namespace): CLI arguments.
+
+    Returns:
+        str: command output.
+    """
+    from accelpy import Pool, Fleet
+    from accelpy.exceptions import RuntimeException
+
+    pool = Pool(args.name, application=args.application,
+                provider=args.provider, user_config=args.user_config,
+                size=args.size, workers=args.workers)
+    operation = args.operation
+
+    if operation == 'claim':
+        host = pool.claim(timeout=args.timeout)
+        _set_latest(host.name)
+        return host.name
+
+    elif operation == 'release':
+        if not args.host:
+            raise OSError('"release" requires "--host".')
+        pool.release(args.host, destroy=args.destroy)
+        return
+
+    elif operation == 'status':
+        return '\n'.join(
+            f'{key}: {value}' for key, value in pool.status().items())
+
+    results = pool.drain() if operation == 'drain' else pool.fill()
+    summary = Fleet.summary(results)
+    if any(result['error'] for result in results.values()):
+        raise RuntimeException(summary)
+    return summary
+
+
+def _action_mirror(args):
+    """
+    Manage the Terraform providers local filesystem mirror.
+
+    Args:
+        args (argparse.Namespace): CLI arguments.
+
+    Returns:
+        str: Providers available in the mirror.
+    """
+    from accelpy._terraform import Terraform
+
+    if args.import_archive:
+        providers = Terraform.import_mirror(args.import_archive)
+    elif args.export_archive:
+        Terraform.export_mirror(args.export_archive)
+        providers = Terraform.mirrored_providers()
+    else:
+        providers = _host(args).mirror_providers()
+    return '\n'.join(providers)
+
+
+def _action_serve(_):
+    """
+    accelpy._server.Server.serve_forever
+
+    Args:
+        _ (argparse.Namespace): CLI arguments.
+    """
+    from accelpy._server import Server
+
+    server = Server()
+    print(f'Serving on "{server.path}", press CTRL+C to stop.', flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+def _action_wait(args):
+    """
+    Wait for the end of an operation running in the accelpy daemon.
+
+    Args:
+        args (argparse.Namespace): CLI arguments.
+
+    Returns:
+        object: Operation result.
+    """
+    forwarded, result = _request(
+        'wait', line_callback=None if args.quiet else print,
+        name=_host_name(args))
+    if not forwarded:
+        from accelpy.exceptions import ConfigurationException
+        raise ConfigurationException('The accelpy daemon is not running.')
+    return result
+
+
+def _action_batch(args):
+    """
+    Run actions read as JSON lines from the standard input.
+
+    Each line is an object with the action name as "action", and the action
+    arguments with the same names as the command line arguments of the action.
+    An optional "id" is returned with the result.
+
+    Results are written as JSON lines in completion order, with the action
+    output as "result", or the error message as "error". Other outputs are
+    written on the standard error.
+
+    Args:
+        args (argparse.Namespace): CLI arguments.
+    """
+    from concurrent.futures import ThreadPoolExecutor, wait
+    from json import dumps, loads
+    from os import dup, dup2, fdopen
+    from sys import stdin, stdout
+    from threading import Lock
+    from accelpy._fleet import MAX_WORKERS
+
+    commands = _parser()[1]
+    for command in ('batch', 'serve'):
+        del commands[command]
+
+    def run(index, line, previous):
+        """
+        Run an action.
+
+        Args:
+            index (int): Line number.
+            line (str): JSON line.
+            previous (concurrent.futures.Future): Previous action on the same
+                configuration.
+
+        Returns:
+            dict: Result.
+        """
+        if previous is not None:
+            wait((previous,))
+
+        try:
+            request = loads(line)
+            response = dict(
+                id=request.get('id', index), action=request.get('action'))
+        except (ValueError, AttributeError):
+            return dict(id=index, error='Invalid JSON object.')
+
+        try:
+            action_args = _batch_args(commands, request)
+            response['result'] = globals()[
+                f'_action_{action_args.action}'](action_args)
+        except Exception as exception:
+            response['error'] = str(exception) or type(exception).__name__
+        return response
+
+    def write(future):
+        """
+        Write an action result.
+
+        Args:
+            future (concurrent.futures.Future): Action future.
+        """
+        response = future.result()
+        try:
+            line = dumps(response)
+        except (TypeError, ValueError) as exception:
+            response.pop('result', None)
+            response['error'] = f'Invalid result: {exception}'
+            line = dumps(response)
+        with lock:
+            results.write(line + '\n')
+            results.flush()
+
+    # Write results on the standard output, and other outputs (Including
+    # sub-processes outputs) on the standard error
+    stdout.flush()
+    results = fdopen(dup(stdout.fileno()), 'wt')
+    dup2(2, stdout.fileno())
+
+    lock = Lock()
+    latest = dict()
+    try:
+        with ThreadPoolExecutor(
+                max_workers=args.workers or MAX_WORKERS) as executor:
+            for index, line in enumerate(stdin, 1):
+                if not line.strip():
+                    continue
+
+                # Actions on a same configuration run sequentially
+                try:
+                    name = loads(line).get('name')
+                    if not isinstance(name, str):
+                        name = None
+                except (ValueError, AttributeError):
+                    name = None
+
+                future = executor.submit(run, index, line, latest.get(name))
+                future.add_done_callback(write)
+                latest[name] = future
+    finally:
+        stdout.flush()
+        dup2(results.fileno(), stdout.fileno())
+        results.close()
+
+
+def _batch_args(commands, request):
+    """
+    Convert a batch action request to CLI arguments.
+
+    Args:
+        commands (dict): Commands sub-parsers per name.
+        request (dict): Action request.
+
+    Returns:
+        argparse.Namespace: CLI arguments.
+    """
+    from argparse import Namespace, _AppendAction, _StoreConstAction
+    from accelpy.exceptions import ConfigurationException
+
+    kwargs = dict(request)
+    kwargs.pop('id', None)
+    action = kwargs.pop('action', None)
+    try:
+        parser = commands[action]
+    except (KeyError, TypeError):
+        raise ConfigurationException(f'Unsupported action "{action}".')
+
+    arguments = {argument.dest: argument for argument in parser._actions
+                 if argument.dest != 'help'}
+
+    unsupported = set(kwargs) - set(arguments)
+    if unsupported:
+        raise ConfigurationException(
+            f'Unsupported "{action}" arguments: '
+            f'{", ".join(sorted(unsupported))}.')
+
+    for dest, argument in arguments.items():
+        if kwargs.get(dest) is None:
+            if argument.required:
+                raise ConfigurationException(
+                    f'The "{action}" action requires "{dest}".')
+            kwargs[dest] = argument.default
+
+        # Flags
+        elif isinstance(argument, _StoreConstAction):
+            if not isinstance(kwargs[dest], bool):
+                raise ConfigurationException(
+                    f'Invalid "{action}" argument "{dest}": must be a '
+                    'boolean.')
+            kwargs[dest] = (
+                argument.const if kwargs[dest] else argument.default)
+
+        # Arguments that can be specified multiple times
+        elif isinstance(argument, _AppendAction):
+            values = kwargs[dest]
+            kwargs[dest] = [
+                _batch_value(action, argument, value) for value in (
+                    values if isinstance(values, list) else (values,))]
+
+        else:
+            kwargs[dest] = _batch_value(action, argument, kwargs[dest])
+
+    return Namespace(action=action, **kwargs)
+
+
+def _batch_value(action, argument, value):
+    """
+    Convert a batch action argument value like the CLI parser does.
+
+    Args:
+        action (str): Action.
+        argument (argparse.Action): Parser argument.
+        value: JSON value.
+
+    Returns:
+        Converted value.
+
+    Raises:
+        accelpy.exceptions.ConfigurationException: Invalid value.
+    """
+    from accelpy.exceptions import ConfigurationException
+
+    error = f'Invalid "{action}" argument "{argument.dest}": {value}.'
+    if isinstance(value, bool) or not isinstance(value, (str, int, float)):
+        raise ConfigurationException(error)
+
+    try:
+        value = (argument.type or str)(str(value))
+    except (TypeError, ValueError):
+        raise ConfigurationException(error)
+
+    if argument.choices and value not in argument.choices:
+        raise ConfigurationException(error)
+    return value
 
 
 def _action_lint(args):
@@ -197,9 +820,25 @@ def _action_lint(args):
     return lint(args.file)
 
 
-def _run_command():
+class _SkippedParser:
+    """Placeholder of the sub-parser of a command that is not selected"""
+
+    @staticmethod
+    def add_argument(*_, **__):
+        """Ignore argument"""
+
+
+def _parser(command=None):
     """
-    Command line entry point
+    Return the command line argument parser.
+
+    Args:
+        command (str): Selected command. If specified, only arguments of this
+            command are defined, to start faster.
+
+    Returns:
+        tuple: argparse.ArgumentParser, dict of commands sub-parsers per
+            name.
     """
     from argparse import ArgumentParser
 
@@ -212,10 +851,28 @@ def _run_command():
         dest='action', title='Commands',
         help='accelpy commands', description=
         'accelpy must perform one of the following commands:')
+    commands = dict()
+
+    def add_parser(name, description):
+        """
+        Add a command sub-parser.
+
+        Args:
+            name (str): Command name.
+            description (str): Command description.
+
+        Returns:
+            argparse.ArgumentParser: Sub-parser.
+        """
+        if command and name != command:
+            commands[name] = _SkippedParser
+        else:
+            commands[name] = sub_parsers.add_parser(
+                name, help=description, description=description)
+        return commands[name]
 
     description = 'Create a new configuration.'
-    action = sub_parsers.add_parser(
-        'init', help=description, description=description)
+    action = add_parser('init', description)
     action.add_argument(
         '--name', '-n', help='Name of the configuration to create, if not '
                              'specified a random name is generated. The '
@@ -228,37 +885,43 @@ def _run_command():
         '--user_config', '-c',
         help='Extra user configuration directory. Always also use the '
              '"~./accelize" directory.')
+    action.add_argument(
+        '--count', '-C', type=int, default=1,
+        help='Number of configurations to create. If more than one, '
+             '"--name" is used as prefix of configurations names and names '
+             'are returned as command output.')
 
     name_help = 'Configuration name to use.'
     description = 'Plan the host infrastructure creation and show details.'
-    action = sub_parsers.add_parser('plan', help=description,
-                                    description=description)
+    action = add_parser('plan', description)
     action.add_argument('--name', '-n', help=name_help)
 
     description = 'Create the host infrastructure.'
-    action = sub_parsers.add_parser(
-        'apply', help=description, description=description)
+    action = add_parser('apply', description)
     action.add_argument('--name', '-n', help=name_help)
     action.add_argument(
         '--quiet', '-q', action='store_true',
         help='If specified, hide outputs.')
 
     description = 'Create a virtual machine image of the configured host.'
-    action = sub_parsers.add_parser(
-        'build', help=description, description=description)
+    action = add_parser('build', description)
     action.add_argument('--name', '-n', help=name_help)
     action.add_argument(
         '--update_application', '-u', action='store_true',
         help='If applicable, update the application definition Yaml file to '
              'use this image as host base for the selected provider. Warning, '
              'this will reset any yaml file formatting and comments.')
+    action.add_argument(
+        '--no_cache', action='store_true',
+        help='If specified, always build a new image, even if an image was '
+             'already built from the same sources.')
     action.add_argument(
         '--quiet', '-q', action='store_true',
         help='If specified, hide outputs.')
 
-    description = 'Destroy the host infrastructure.'
-    action = sub_parsers.add_parser(
-        'destroy', help=description, description=description)
+    description = ('Destroy the host infrastructure, or the infrastructure of '
+                   'many hosts concurrently.')
+    action = add_parser('destroy', description)
     action.add_argument('--name', '-n', help=name_help)
     action.add_argument(
         '--quiet', '-q', action='store_true',
@@ -266,38 +929,221 @@ def _run_command():
     action.add_argument(
         '--delete', '-d', action='store_true',
         help='Delete configuration after command completion.')
+    action.add_argument(
+        '--all', '-A', action='store_true',
+        help='Destroy all configurations.')
+    action.add_argument(
+        '--provider', '-p',
+        help='Destroy all configurations with this provider.')
+    action.add_argument(
+        '--application', '-a',
+        help='Destroy all configurations with this application definition '
+             'file.')
+    action.add_argument(
+        '--workers', '-w', type=int,
+        help='Many configurations only. Maximum number of hosts destroyed '
+             'concurrently.')
+    action.add_argument(
+        '--rate', '-r', type=float,
+        help='Many configurations only. Maximum number of hosts destroys '
+             'started per second.')
+    action.add_argument(
+        '--journal', '-j',
+        help='Many configurations only. Path to the file where the progress '
+             'is recorded, and where an interrupted destroy is resumed from. '
+             'Default to "destroy_journal.jsonl" in the hosts configurations '
+             'directory.')
 
     description = 'Print the host SSH private key path.'
-    action = sub_parsers.add_parser(
-        'ssh_private_key', help=description, description=description)
+    action = add_parser('ssh_private_key', description)
     action.add_argument('--name', '-n', help=name_help)
 
     description = 'Print the name of the user to use to connect with SSH'
-    action = sub_parsers.add_parser(
-        'ssh_user', help=description, description=description)
+    action = add_parser('ssh_user', description)
     action.add_argument('--name', '-n', help=name_help)
 
     description = 'Print the private IP address.'
-    action = sub_parsers.add_parser(
-        'private_ip', help=description, description=description)
+    action = add_parser('private_ip', description)
     action.add_argument('--name', '-n', help=name_help)
 
     description = 'Print the public IP address.'
-    action = sub_parsers.add_parser(
-        'public_ip', help=description, description=description)
+    action = add_parser('public_ip', description)
     action.add_argument('--name', '-n', help=name_help)
 
+    description = ('Print all the host information and Terraform outputs at '
+                   'once.')
+    action = add_parser('info', description)
+    action.add_argument('--name', '-n', help=name_help)
+    action.add_argument(
+        '--all', '-A', action='store_true',
+        help='Print information of all configurations.')
+    action.add_argument(
+        '--json', '-j', action='store_true',
+        help='Print information as JSON.')
+
     description = 'List available host configurations.'
-    sub_parsers.add_parser(
-        'list', help=description, description=description)
+    action = add_parser('list', description)
+    action.add_argument(
+        '--provider', '-p', help='Only list configurations with this provider.')
+    action.add_argument(
+        '--application', '-a',
+        help='Only list configurations with this application definition file.')
+    action.add_argument(
+        '--status', '-s', choices=('initialized', 'applied', 'destroyed'),
+        help='Only list configurations with this status.')
+
+    description = ('Run an operation concurrently on many host '
+                   'configurations.')
+    action = add_parser('fleet', description)
+    action.add_argument(
+        'operation', choices=('apply', 'build', 'destroy'),
+        help='Operation to run on each host.')
+    action.add_argument(
+        '--name', '-n', action='append',
+        help='Configuration name to include. Can be specified multiple times.')
+    action.add_argument(
+        '--pattern', '-P',
+        help='Include all configurations with names matching this shell-style '
+             'pattern (Like "my_app_*").')
+    action.add_argument(
+        '--workers', '-w', type=int,
+        help='Maximum number of hosts operated concurrently.')
+    action.add_argument(
+        '--update_application', '-u', action='store_true',
+        help='"build" only. If applicable, update the application definition '
+             'Yaml file to use the image as host base for the selected '
+             'provider.')
+    action.add_argument(
+        '--delete', '-d', action='store_true',
+        help='"destroy" only. Delete configurations after command completion.')
+    action.add_argument(
+        '--build_once', '-b', action='store_true',
+        help='"apply" only. Build a virtual machine image once for all hosts '
+             'that share the same application and provider (With a '
+             '"container_image" package), and apply them from this image '
+             'instead of provisioning each host.')
+    action.add_argument(
+        '--no_cache', action='store_true',
+        help='"build" and "apply --build_once" only. Always build new images, '
+             'even if images were already built from the same sources.')
+
+    description = ('Update configurations from their sources (Application '
+                   'definition and configuration files). Only what changed is '
+                   'regenerated.')
+    action = add_parser('sync', description)
+    action.add_argument(
+        '--name', '-n', action='append',
+        help='Configuration name to update. Can be specified multiple times. '
+             'Default to the latest used configuration.')
+    action.add_argument(
+        '--pattern', '-P',
+        help='Update all configurations with names matching this shell-style '
+             'pattern (Like "my_app_*").')
+    action.add_argument(
+        '--workers', '-w', type=int,
+        help='Maximum number of configurations updated concurrently.')
+    action.add_argument(
+        '--upgrade', '-u', action='store_true',
+        help='Also upgrade Terraform and Packer to their current versions. '
+             'Each configuration keeps using the versions it was first used '
+             'with until upgraded.')
+
+    description = ('Manage a warm pool of applied hosts that can be claimed '
+                   'instantly.')
+    action = add_parser('pool', description)
+    action.add_argument(
+        'operation', choices=('fill', 'claim', 'release', 'status', 'drain'),
+        help='Pool operation: "fill" creates and applies hosts until the pool '
+             'is full, "claim" returns the name of a ready host, "release" '
+             'returns a claimed host to the pool, "status" prints the pool '
+             'hosts counts and "drain" destroys all hosts not claimed and '
+             'removes the pool.')
+    action.add_argument('--name', '-n', required=True, help='Pool name.')
+    action.add_argument(
+        '--application', '-a',
+        help='Path to application definition file. Required only to create a '
+             'new pool.')
+    action.add_argument('--provider', '-p', help='Provider name.')
+    action.add_argument(
+        '--user_config', '-c',
+        help='Extra user configuration directory. Always also use the '
+             '"~./accelize" directory.')
+    action.add_argument(
+        '--size', '-s', type=int,
+        help='Number of ready hosts to keep in the pool.')
+    action.add_argument(
+        '--workers', '-w', type=int,
+        help='Maximum number of hosts applied concurrently.')
+    action.add_argument(
+        '--host', '-H', help='"release" only. Name of the host to release.')
+    action.add_argument(
+        '--destroy', '-d', action='store_true',
+        help='"release" only. Destroy and delete the host instead of returning '
+             'it to the pool.')
+    action.add_argument(
+        '--timeout', '-t', type=float,
+        help='"claim" only. Wait up to this number of seconds for a host to '
+             'become ready.')
+
+    description = ('Manage the local mirror of Terraform providers, used by '
+                   'all configurations without network access. By default, '
+                   'add providers required by a configuration to the mirror.')
+    action = add_parser('mirror', description)
+    action.add_argument('--name', '-n', help=name_help)
+    action.add_argument(
+        '--import', '-i', dest='import_archive',
+        help='Path to a tar archive of providers to add to the mirror.')
+    action.add_argument(
+        '--export', '-e', dest='export_archive',
+        help='Path to a ".tar.gz" archive where to save the mirror.')
+
+    description = ('Start the accelpy daemon. While it runs, host configurations '
+                   'are kept in memory to answer faster, and operations run in '
+                   'the daemon and are not interrupted if the command is.')
+    add_parser('serve', description)
+
+    description = ('Wait for the end of an operation running in the accelpy '
+                   'daemon.')
+    action = add_parser('wait', description)
+    action.add_argument('--name', '-n', help=name_help)
+    action.add_argument(
+        '--quiet', '-q', action='store_true',
+        help='If specified, hide outputs.')
+
+    description = ('Run actions read as JSON lines from the standard input, '
+                   'and write their results as JSON lines in completion '
+                   'order. Actions on a same configuration run in order.')
+    action = add_parser('batch', description)
+    action.add_argument(
+        '--workers', '-w', type=int,
+        help='Maximum number of actions run concurrently.')
 
     description = 'lint an application definition file.'
-    action = sub_parsers.add_parser(
-        'lint', help=description, description=description)
+    action = add_parser('lint', description)
     action.add_argument('file', help='Path to file to lint.')
 
+    return parser, commands
+
+
+def _run_command(argv=None):
+    """
+    Command line entry point
+
+    Args:
+        argv (list of str): Command line arguments. Default to "sys.argv".
+    """
+    import sys
+
+    # Get arguments, only define arguments of the selected command if valid
+    if argv is None:
+        argv = sys.argv[1:]
+    command = next((arg for arg in argv if not arg.startswith('-')), None)
+    parser, commands = _parser(command)
+    if command not in commands:
+        parser = _parser()[0]
+
     # Get arguments and call function
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
     action = args.action
     if not action:
         parser.error('A command is required.')
@@ -309,7 +1155,6 @@ def _run_command():
     # Adds parent directory to sys.path:
     # Allows import of accelpy if this script is run locally
     from os.path import dirname, realpath
-    import sys
     sys.path.insert(0, dirname(dirname(realpath(__file__))))
 
     # Run command
@@ -320,7 +1165,8 @@ def _run_command():
             print(output)
         parser.exit()
     except (AccelizeException, OSError) as exception:
-        parser.error(str(exception))
+        # Show the usage of all commands
+        _parser()[0].error(str(exception))
 
 
 if __name__ == '__main__':
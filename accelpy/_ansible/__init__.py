@@ -1,11 +1,13 @@
 # coding=utf-8
 """Ansible configuration"""
-from os import makedirs, fsdecode, scandir, listdir
-from os.path import join, realpath, dirname, splitext, basename
+from os import makedirs, fsdecode, scandir, listdir, remove, walk
+from os.path import (
+    join, realpath, dirname, splitext, basename, isfile, islink, relpath)
 from sys import executable
 
 from accelpy._common import (
-    yaml_read, yaml_write, call, get_sources_dirs, symlink, get_sources_filters)
+    yaml_read, yaml_write, call, data_digest, get_sources_dirs, symlink,
+    get_sources_filters)
 
 
 class Ansible:
@@ -33,11 +35,25 @@ class Ansible:
         self._source_names = get_sources_filters(
             self._provider, application_type)
 
-    def create_configuration(self):
+    def get_sources(self):
         """
-        Generate Ansible configuration.
+        Get sources used to generate the configuration.
+
+        Roles dependencies are resolved and roles from Ansible Galaxy are
+        installed.
+
+        The result can be passed to "create_configuration" of many Ansible
+        configurations that share the same provider, application type and user
+        configuration to avoid retrieving sources many times.
+
+        Returns:
+            dict: Sources with "playbook" (Playbook content), "roles" (Roles
+                to add to the playbook), "roles_paths" (Paths of roles and
+                their local dependencies per name) and "cred" (Accelize
+                credentials file path) keys.
         """
         roles_local = dict()
+        cred_src = None
 
         # Get sources
         for source_dir in self._source_dirs:
@@ -51,7 +67,7 @@ class Ansible:
 
                     # Get Accelize credentials file
                     elif name == 'cred.json' and entry.is_file():
-                        symlink(entry.path, join(self._config_dir, 'cred.json'))
+                        cred_src = cred_src or entry.path
 
                     # Get roles
                     elif name == 'roles' and entry.is_dir():
@@ -59,24 +75,18 @@ class Ansible:
                                             for role in listdir(entry.path)})
 
         # Filter roles
-        roles = {name: path for name, path in roles_local.items()
-                 if name.split('.', 1)[0] in self._source_names}
+        roles = sorted(name for name in roles_local
+                       if name.split('.', 1)[0] in self._source_names)
 
-        # Initialize roles
-        role_dir = join(self._config_dir, 'roles')
-        makedirs(role_dir, exist_ok=True)
+        # Resolve roles dependencies
         galaxy_roles = set()
         roles_to_init = set(roles)
-        initialized_roles = set()
+        roles_paths = dict()
 
         while roles_to_init:
 
             role = roles_to_init.pop()
-            role_path = roles_local[role]
-            initialized_roles.add(role)
-
-            # Link role to configuration directory
-            symlink(role_path, join(role_dir, role))
+            role_path = roles_paths[role] = roles_local[role]
 
             # Get roles dependencies
             try:
@@ -96,7 +106,7 @@ class Ansible:
                     dep = dep_entry['role']
 
                 # Local dependencies: To initialize
-                if dep in roles_local and dep not in initialized_roles:
+                if dep in roles_local and dep not in roles_paths:
                     roles_to_init.add(dep)
 
                 # Ansible Galaxy dependencies: To download
@@ -106,18 +116,109 @@ class Ansible:
         # Install dependencies from Ansible Galaxy
         self.galaxy_install(galaxy_roles)
 
+        return dict(playbook=yaml_read(playbook_src), roles=roles,
+                    roles_paths=roles_paths, cred=cred_src)
+
+    def sources_digest(self, sources):
+        """
+        Return a digest of sources and variables used to generate the
+        configuration.
+
+        Args:
+            sources: Sources as returned by "get_sources".
+
+        Returns:
+            str: SHA-256 hexadecimal digest.
+        """
+        return data_digest(sources, self._variables)
+
+    def create_configuration(self, sources=None):
+        """
+        Generate Ansible configuration.
+
+        Args:
+            sources (dict): Sources as returned by "get_sources". If not
+                specified, sources are retrieved.
+        """
+        if sources is None:
+            sources = self.get_sources()
+
+        # Link Accelize credentials file
+        if sources['cred']:
+            symlink(sources['cred'], join(self._config_dir, 'cred.json'),
+                    replace=True)
+
+        # Link roles to configuration directory
+        role_dir = join(self._config_dir, 'roles')
+        makedirs(role_dir, exist_ok=True)
+        roles_paths = sources['roles_paths']
+        for role, role_path in roles_paths.items():
+            symlink(role_path, join(role_dir, role), replace=True)
+
+        # Remove roles not used anymore
+        for role in listdir(role_dir):
+            role_path = join(role_dir, role)
+            if role not in roles_paths and islink(role_path):
+                remove(role_path)
+
         # Create playbook
-        playbook = yaml_read(playbook_src)
-        playbook[0]['vars'] = {
-            key: value for key, value in self._variables.items()
-            if value is not None}
-        roles = sorted(roles)
-        playbook[0]['roles'] = (
-            [role for role in roles if role.endswith('.init')] +
-            [role for role in roles if not role.endswith('.init')])
+        playbook = sources['playbook']
+        roles = sources['roles']
+        playbook = [dict(
+            playbook[0],
+            vars={key: value for key, value in self._variables.items()
+                  if value is not None},
+            roles=([role for role in roles if role.endswith('.init')] +
+                   [role for role in roles if not role.endswith('.init')])
+        )] + playbook[1:]
 
         yaml_write(playbook, self._playbook)
 
+    def digest(self):
+        """
+        Return a digest of everything that goes into the provisioning: the
+        playbook, the content of roles and the content of files referenced by
+        variables.
+
+        Paths specific to the configuration directory are excluded, so two
+        configurations with the same sources have the same digest. Ansible
+        Galaxy roles are only identified by their name in roles dependencies.
+
+        Returns:
+            str: SHA-256 hexadecimal digest.
+        """
+        # Lazy import: Only used on image build
+        from hashlib import sha256
+
+        hasher = sha256()
+        config_dir = self._config_dir.encode()
+
+        # Playbook
+        with open(self._playbook, 'rb') as playbook:
+            hasher.update(playbook.read().replace(config_dir, b''))
+
+        # Files referenced by variables
+        for key in sorted(self._variables):
+            value = self._variables[key]
+            if isinstance(value, str) and value.startswith(
+                    self._config_dir) and isfile(value):
+                hasher.update(key.encode() + b'\0')
+                _hash_file(hasher, value)
+
+        # Roles
+        roles_dir = join(self._config_dir, 'roles')
+        for role in sorted(listdir(roles_dir)):
+            role_path = realpath(join(roles_dir, role))
+            for root, dirs, files in walk(role_path, followlinks=True):
+                dirs.sort()
+                for name in sorted(files):
+                    path = join(root, name)
+                    hasher.update(
+                        join(role, relpath(path, role_path)).encode() + b'\0')
+                    _hash_file(hasher, path)
+
+        return hasher.hexdigest()
+
     @classmethod
     def _executable(cls):
         """
@@ -202,3 +303,16 @@ class Ansible:
             str: command
         """
         return f'{cls._executable()}-playbook'
+
+
+def _hash_file(hasher, path):
+    """
+    Update a hash with a file content.
+
+    Args:
+        hasher (hashlib.HASH): Hash object.
+        path (str): File path.
+    """
+    with open(path, 'rb') as file:
+        for chunk in iter(lambda: file.read(65536), b''):
+            hasher.update(chunk)
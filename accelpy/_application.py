@@ -1,10 +1,21 @@
 # coding=utf-8
 """Application Definition"""
-from os import fsdecode
-
-from accelpy._common import yaml_read, yaml_write
+from json import dumps, loads
+from os import fsdecode, getpid, makedirs, replace
+from os.path import join
+from threading import get_ident
+
+from accelpy import __version__
+from accelpy._common import (
+    HOME_DIR, data_digest, json_read, yaml_load, yaml_write)
 from accelpy.exceptions import ConfigurationException
 
+#: Directory where validated definitions are cached, per content hash
+CACHE_DIR = join(HOME_DIR, 'cache', 'applications')
+
+# Digest of the definition format, used in cache keys
+_FORMAT_DIGEST = None
+
 # Application definition format
 FORMAT = {
     'application': {
@@ -122,8 +133,7 @@ class Application:
 
     def __init__(self, definition_file):
         self._path = fsdecode(definition_file)
-        self._environments = set()
-        self._definition = self._validate(yaml_read(self._path))
+        self._definition, self._environments = _load(self._path)
 
     def __getitem__(self, key):
         return self._definition.__getitem__(key)
@@ -167,207 +177,244 @@ class Application:
         """
         yaml_write(self._definition, path or self._path)
 
-    def _validate(self, definition):
-        """
-        Validate definition file content, and complete missing values.
 
-        Args:
-            definition (dict): Definition.
+def _compile_check(key, key_format, section_name):
+    """
+    Compile the function that checks a key value.
 
-        Returns:
-            dict: definition
+    Args:
+        key (str): Key
+        key_format (dict): Key format
+        section_name (str): Section name
 
-        Raises:
-            ValueError: Error in section format.
-        """
-        for section_name in FORMAT:
+    Returns:
+        callable: Function returning the checked value, eventually updated.
+    """
+    value_type = key_format.get('value_type', str)
 
-            section_format = FORMAT[section_name]
-            node_type = section_format['_node']
+    if isinstance(value_type, tuple) and value_type[0] == list:
+        element_type = value_type[1]
+        type_error = (f'The "{key}" key in "{section_name}" section must be a '
+                      f'list of "{element_type.__name__}".')
 
-            try:
-                section = definition[section_name]
-            except KeyError:
-                # Create missing definition section
-                section = definition[section_name] = node_type()
+        def check_type(value):
+            """Check list content type"""
+            if isinstance(value, list):
+                for element in value:
+                    if not isinstance(element, element_type):
+                        raise ConfigurationException(type_error)
 
-            self._validate_section(
-                node_type, section, section_name, section_format)
+            # Single element list
+            elif isinstance(value, element_type):
+                return [value]
 
-        return definition
+            # Bad value
+            elif value is not None:
+                raise ConfigurationException(type_error)
 
-    def _validate_section(
-            self, node_type, section, section_name, section_format):
-        """
-        Validate a section
+            return value
 
-        Args:
-            node_type (class): Type of node (dict or list)
-            section (dict or list): Section to validate.
-            section_name (str): Section name.
-            section_format (dict): Section format.
+    else:
+        type_error = (f'The "{key}" key in "{section_name}" section must be a '
+                      f'"{value_type.__name__}".')
 
-        Raises:
-            ValueError: Error in section format.
-        """
-        if not isinstance(section, node_type):
-            raise ConfigurationException(
-                f'The section "{section_name}" must be a '
-                f'{"mapping" if node_type == dict else "list"}.')
+        def check_type(value):
+            """Check value type"""
+            if value is not None and not isinstance(value, value_type):
+                raise ConfigurationException(type_error)
+            return value
 
-        for node in (section if isinstance(section, list) else (section,)):
-            args = (node, section_format, section_name)
-            self._validate_node(*args)
-            if not self._validate_env_node(*args):
-                self._check_required(*args)
+    valid_values = key_format.get('values')
+    if not valid_values:
+        return check_type
 
-    @staticmethod
-    def _validate_node(node, node_format, section_name):
-        """
-        Validate a node.
-
-        Args:
-            node (dict): Node to validate
-            node_format (dict): Node format
-            section_name (str): Parent section name.
+    allowed = tuple(valid_values) + (key_format.get('default'),)
+    possibles = ", ".join(str(valid_value) for valid_value in valid_values)
 
-        Raises:
-            accelpy.exceptions.ConfigException: Error in node format.
-        """
-        for key in node_format:
-
-            if key == '_node':
-                continue
+    def check(value):
+        """Check value is one of allowed values, and its type"""
+        if value not in allowed:
+            raise ConfigurationException(
+                f'Invalid value "{value}" for "{key}" key in "{section_name}" '
+                f'section (possibles values are {possibles}).')
+        return check_type(value)
 
-            key_format = node_format[key]
+    return check
 
-            # Set default value if missing
-            node.setdefault(key, key_format.get('default'))
-            value = node[key]
 
-            # Check and eventually update value
-            node[key] = Application._check_value(
-                key, key_format, value, section_name)
+class _SectionValidator:
+    """
+    Definition section validator, compiled from the section format.
 
-    @staticmethod
-    def _check_required(node, node_format, section_name):
+    Args:
+        section_name (str): Section name.
+        section_format (dict): Section format.
+    """
+    __slots__ = ('_name', '_node_type', '_keys', '_names')
+
+    def __init__(self, section_name, section_format):
+        self._name = section_name
+        self._node_type = section_format['_node']
+        self._names = frozenset(section_format)
+        self._keys = tuple(
+            (key, key_format.get('default'), key_format.get('required', False),
+             _compile_check(key, key_format, section_name))
+            for key, key_format in section_format.items() if key != '_node')
+
+    def validate(self, definition, environments):
         """
-        Check for required value in default env.
+        Validate the section, and complete missing values.
 
         Args:
-            node (dict): Node to validate
-            node_format (dict): Node format
-            section_name (str): Parent section name.
+            definition (dict): Definition.
+            environments (set of str): Set where add found environments.
 
         Raises:
-            accelpy.exceptions.ConfigException: Error in node format.
+            accelpy.exceptions.ConfigurationException: Error in section.
         """
-        for key in node_format:
+        try:
+            section = definition[self._name]
+        except KeyError:
+            # Create missing definition section
+            section = definition[self._name] = self._node_type()
 
-            if key == '_node':
-                continue
+        if not isinstance(section, self._node_type):
+            raise ConfigurationException(
+                f'The section "{self._name}" must be a '
+                f'{"mapping" if self._node_type == dict else "list"}.')
 
-            # Check required value for default environment
-            if node_format[key].get('required', False) and node[key] is None:
+        for node in (section if self._node_type == list else (section,)):
+            if not isinstance(node, dict):
                 raise ConfigurationException(
-                    f'The "{key}" key in "{section_name}" section is required.')
+                    f'The section "{self._name}" must be a list of mappings.')
+            self._validate_node(node, environments)
 
-    @staticmethod
-    def _check_value(key, key_format, value, section_name):
+    def _validate_node(self, node, environments):
         """
-        Check if value is valid
+        Validate a node.
 
         Args:
-            key (str): Key
-            key_format (dict): Key format
-            value: Key value
-            section_name (str): Section name
-
-        Returns:
-            value.
+            node (dict): Node to validate
+            environments (set of str): Set where add found environments.
 
         Raises:
-            accelpy.exceptions.ConfigException: Error in value.
+            accelpy.exceptions.ConfigurationException: Error in node.
         """
-        valid_values = key_format.get('values')
-        if valid_values and not (
-                value in valid_values or value == key_format.get('default')):
-            raise ConfigurationException(
-                f'Invalid value "{value}" for "{key}" key in "{section_name}" '
-                f'section (possibles values are '
-                f'{", ".join(str(valid_value) for valid_value in valid_values)}'
-                ').')
-
-        value_type = key_format.get('value_type', str)
-        if isinstance(value_type, tuple) and value_type[0] == list:
-            # Checks value content type
-            if isinstance(value, value_type[0]):
-                for element in value:
-                    if not isinstance(element, value_type[1]):
-                        raise ConfigurationException(
-                            f'The "{key}" key in "{section_name}" section must '
-                            f'be a list of "{value_type[1].__name__}".')
+        # Set default values if missing, check and eventually update values
+        for key, default, _, check in self._keys:
+            node[key] = check(node.setdefault(key, default))
+
+        envs = [env for env in node if env not in self._names]
+        if not envs:
+            # Check required values for default environment
+            for key, _, required, _ in self._keys:
+                if required and node[key] is None:
+                    raise ConfigurationException(
+                        f'The "{key}" key in "{self._name}" section is '
+                        f'required.')
+            return
 
-            # Single element list
-            elif isinstance(value, value_type[1]):
-                return [value]
+        # Validate environment override nodes
+        environments.update(envs)
+        for env in envs:
+            env_node = node[env]
+            if not isinstance(env_node, dict):
+                continue
 
-            # Bad value
-            elif value is not None:
-                raise ConfigurationException(
-                    f'The "{key}" key in "{section_name}" section must be a '
-                    f'list of "{value_type[1].__name__}".')
+            for key, _, required, check in self._keys:
+                value = env_node.get(key, node.get(key))
 
-        elif value is not None and not isinstance(value, value_type):
-            raise ConfigurationException(
-                f'The "{key}" key in "{section_name}" section must be a '
-                f'"{value_type.__name__}".')
+                # Required value for environment
+                if required and value is None:
+                    raise ConfigurationException(
+                        f'The "{key}" key in "{self._name}" section is '
+                        f'required for "{env}" environment.')
 
-        return value
+                # Check value
+                if key in env_node:
+                    env_node[key] = check(value)
 
-    def _validate_env_node(self, node, node_format, section_name):
-        """
-        Validate an environment override node.
 
-        Args:
-            node (dict): Node to validate
-            node_format (dict): Node format
-            section_name (str): Parent section name.
+# Definition format compiled into validators
+_SECTIONS = tuple(_SectionValidator(section_name, section_format)
+                  for section_name, section_format in FORMAT.items())
 
-        Raises:
-            ValueError: Error in node format.
 
-        Returns:
-            bool: True in at least one env found.
-        """
-        env_found = False
-        for env in node:
+def _validate(definition):
+    """
+    Validate definition file content, and complete missing values.
 
-            # Not an env
-            if env in node_format:
-                continue
+    Args:
+        definition (dict): Definition.
 
-            # Env found
-            self._environments.add(env)
-            env_found = True
-            env_node = node[env]
-            for key in node_format:
+    Returns:
+        tuple: Definition (dict), environments (set of str).
 
-                if key == '_node' or not isinstance(env_node, dict):
-                    continue
+    Raises:
+        accelpy.exceptions.ConfigurationException: Error in definition.
+    """
+    if not isinstance(definition, dict):
+        raise ConfigurationException(
+            'The application definition must be a mapping.')
 
-                value = env_node.get(key, node.get(key))
-                key_format = node_format[key]
+    environments = set()
+    for section in _SECTIONS:
+        section.validate(definition, environments)
+    return definition, environments
 
-                # Required value for environment
-                if key_format.get('required', False) and value is None:
-                    raise ConfigurationException(
-                        f'The "{key}" key in "{section_name}" section is '
-                        f'required for "{env}" environment.')
 
-                # Check value
-                if key in env_node:
-                    env_node[key] = Application._check_value(
-                        key, key_format, value, section_name)
+def _load(path):
+    """
+    Load and validate a definition file.
+
+    Validated definitions are cached by file content hash.
 
-        return env_found
+    Args:
+        path (str): Path to yaml definition file.
+
+    Returns:
+        tuple: Definition (dict), environments (set of str).
+
+    Raises:
+        accelpy.exceptions.ConfigurationException: Error in definition.
+    """
+    # Lazy import: Only used to load definitions
+    from hashlib import sha256
+
+    with open(path, 'rb') as file:
+        content = file.read()
+
+    global _FORMAT_DIGEST
+    if _FORMAT_DIGEST is None:
+        _FORMAT_DIGEST = data_digest(FORMAT, __version__).encode()
+
+    cache_file = join(
+        CACHE_DIR, f'{sha256(_FORMAT_DIGEST + content).hexdigest()}.json')
+    try:
+        cached = json_read(cache_file)
+        return cached['definition'], set(cached['environments'])
+    except (OSError, ValueError, KeyError, TypeError):
+        pass
+
+    definition, environments = _validate(yaml_load(content))
+
+    # Only cache definitions that are unchanged by JSON serialization
+    try:
+        serialized = dumps(dict(
+            definition=definition, environments=sorted(environments)))
+        cacheable = loads(serialized)['definition'] == definition
+    except (TypeError, ValueError):
+        cacheable = False
+
+    if cacheable:
+        try:
+            makedirs(CACHE_DIR, exist_ok=True)
+            tmp_file = f'{cache_file}.{getpid()}.{get_ident()}'
+            with open(tmp_file, 'wt') as file:
+                file.write(serialized)
+            replace(tmp_file, cache_file)
+        except OSError:
+            # Cache is optional
+            pass
+
+    return definition, environments
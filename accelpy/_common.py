@@ -2,28 +2,32 @@
 """Global configuration"""
 from json import dump as _json_dump, load as _json_load
 from os import (fsdecode as _fsdecode, symlink as _symlink, chmod as _chmod,
-                makedirs as _makesdirs)
+                makedirs as _makesdirs, remove as _remove)
 from os.path import (
     expanduser as _expanduser, isdir as _isdir, realpath as _realpath)
 from collections.abc import Mapping as _Mapping
-from subprocess import run as _run, PIPE as _PIPE
-
-try:
-    # Use LibYAML if available
-    from yaml import CSafeLoader as _Loader, CDumper as _Dumper
-except ImportError:
-    # Else use pure-Python library
-    from yaml import SafeLoader as _Loader, Dumper as _Dumper
-from yaml import dump as _yaml_dump, load as _yaml_load
+from contextlib import contextmanager as _contextmanager
+from subprocess import (
+    run as _run, PIPE as _PIPE, CompletedProcess as _CompletedProcess)
 
 from accelpy.exceptions import RuntimeException as _RuntimeException
 
 #: User configuration directory
 HOME_DIR = _expanduser('~/.accelize')
 
+#: Delay to wait for a cancelled subprocess to terminate before killing it
+TERMINATE_TIMEOUT = 60.0
+
+#: Number of output lines kept in memory when a subprocess output is streamed
+OUTPUT_TAIL_LINES = 100
+
+#: Size of chunks read from a streamed subprocess output
+OUTPUT_CHUNK_SIZE = 2 ** 16
+
 # Ensure directory exists and have restricted access rights
-_makesdirs(HOME_DIR, exist_ok=True)
-_chmod(HOME_DIR, 0o700)
+if not _isdir(HOME_DIR):
+    _makesdirs(HOME_DIR, exist_ok=True)
+    _chmod(HOME_DIR, 0o700)
 
 
 def yaml_read(path):
@@ -37,7 +41,29 @@ def yaml_read(path):
         dict or list: Un-serialized content
     """
     with open(_fsdecode(path), 'rt') as file:
-        return _yaml_load(file, Loader=_Loader)
+        return yaml_load(file)
+
+
+def yaml_load(stream):
+    """
+    Un-serialize YAML content.
+
+    Args:
+        stream (str, bytes or file-like object): YAML content.
+
+    Returns:
+        dict or list: Un-serialized content
+    """
+    # Lazy import: Only required by some commands
+    from yaml import load
+    try:
+        # Use LibYAML if available
+        from yaml import CSafeLoader as Loader
+    except ImportError:
+        # Else use pure-Python library
+        from yaml import SafeLoader as Loader
+
+    return load(stream, Loader=Loader)
 
 
 def yaml_write(data, path, **kwargs):
@@ -49,8 +75,17 @@ def yaml_write(data, path, **kwargs):
         path (path-like object): Path where save file.
         kwargs: "yaml.dump" kwargs.
     """
+    # Lazy import: Only required by some commands
+    from yaml import dump
+    try:
+        # Use LibYAML if available
+        from yaml import CDumper as Dumper
+    except ImportError:
+        # Else use pure-Python library
+        from yaml import Dumper
+
     with open(_fsdecode(path), 'wt') as file:
-        _yaml_dump(data, file, Dumper=_Dumper, **kwargs)
+        dump(data, file, Dumper=Dumper, **kwargs)
 
 
 def json_read(path, **kwargs):
@@ -81,6 +116,23 @@ def json_write(data, path, **kwargs):
         _json_dump(data, file, **kwargs)
 
 
+def data_digest(*data):
+    """
+    Return a digest of JSON serializable data.
+
+    Args:
+        data: Data to digest.
+
+    Returns:
+        str: SHA-256 hexadecimal digest.
+    """
+    # Lazy import: Only used to detect changes
+    from hashlib import sha256
+    from json import dumps
+
+    return sha256(dumps(data, sort_keys=True, default=str).encode()).hexdigest()
+
+
 def recursive_update(to_update, update):
     """
     Recursively updates nested directories.
@@ -102,25 +154,136 @@ def recursive_update(to_update, update):
     return to_update
 
 
-def call(command, check=True, pipe_stdout=False, **run_kwargs):
+def call(command, check=True, pipe_stdout=False, line_callback=None,
+         log_file=None, **run_kwargs):
     """
     Call command in subprocess.
 
+    If "line_callback" or "log_file" is specified, the output is streamed:
+    stdout and stderr are merged and processed line by line, and only the last
+    "OUTPUT_TAIL_LINES" lines are kept in memory.
+
     Args:
         command (iterable of str): Command
         run_kwargs: subprocess.run keyword arguments.
         check (bool): If True, Check return code for error.
         pipe_stdout (bool): If True, redirect stdout into a pipe, this allow to
             hide outputs from sys.stdout and permit to retrieve stdout as
-            "result.stdout".
+            "result.stdout" (Only the output tail if streamed).
+        line_callback (callable): Function called with each output line
+            (Without line ending) as argument.
+        log_file (path-like object): Path to a file where append the output.
 
     Returns:
         subprocess.CompletedProcess: Utility call result.
     """
-    if pipe_stdout:
-        run_kwargs.setdefault('stdout', _PIPE)
+    if line_callback or log_file:
+        # Lazy import: Only used when streaming
+        from subprocess import Popen, STDOUT
+
+        with _OutputStream(line_callback, log_file, pipe_stdout) as stream:
+            with Popen(command, stdout=_PIPE, stderr=STDOUT,
+                       start_new_session=True, **run_kwargs) as process:
+                try:
+                    while True:
+                        chunk = process.stdout.read1(OUTPUT_CHUNK_SIZE)
+                        stream.write_chunk(chunk)
+                        if not chunk:
+                            break
+
+                # Never leave the process running on error
+                except BaseException:
+                    _terminate(process)
+                    raise
+
+        result = _CompletedProcess(
+            command, process.returncode, stream.tail, None)
+
+    else:
+        if pipe_stdout:
+            run_kwargs.setdefault('stdout', _PIPE)
+
+        result = _run(
+            command, universal_newlines=True, stderr=_PIPE, **run_kwargs)
+
+    if check and result.returncode:
+        raise _RuntimeException((result.stderr or result.stdout or
+                                'See stdout for more information.').strip())
+
+    return result
+
+
+async def call_async(command, check=True, pipe_stdout=False,
+                     line_callback=None, log_file=None, **run_kwargs):
+    """
+    Call command in subprocess using asyncio.
+
+    The command is run in a new process group. If the calling task is
+    cancelled, the whole process group is terminated (And killed if not
+    terminated after "TERMINATE_TIMEOUT" seconds).
+
+    If "line_callback" or "log_file" is specified, the output is streamed:
+    stdout and stderr are merged and processed line by line, and only the last
+    "OUTPUT_TAIL_LINES" lines are kept in memory.
+
+    Args:
+        command (iterable of str): Command
+        run_kwargs: asyncio.create_subprocess_exec keyword arguments.
+        check (bool): If True, Check return code for error.
+        pipe_stdout (bool): If True, redirect stdout into a pipe, this allow to
+            hide outputs from sys.stdout and permit to retrieve stdout as
+            "result.stdout" (Only the output tail if streamed).
+        line_callback (callable): Function called with each output line
+            (Without line ending) as argument.
+        log_file (path-like object): Path to a file where append the output.
 
-    result = _run(command, universal_newlines=True, stderr=_PIPE, **run_kwargs)
+    Returns:
+        subprocess.CompletedProcess: Utility call result.
+    """
+    # Lazy import: Only used with asyncio
+    from asyncio import create_subprocess_exec
+
+    command = list(command)
+
+    if line_callback or log_file:
+        # Lazy import: Only used when streaming
+        from subprocess import STDOUT
+
+        with _OutputStream(line_callback, log_file, pipe_stdout) as stream:
+            process = await create_subprocess_exec(
+                *command, stdout=_PIPE, stderr=STDOUT, start_new_session=True,
+                **run_kwargs)
+            try:
+                while True:
+                    chunk = await process.stdout.read(OUTPUT_CHUNK_SIZE)
+                    stream.write_chunk(chunk)
+                    if not chunk:
+                        break
+                await process.wait()
+
+            # Never leave the process running on error, or if cancelled
+            except BaseException:
+                await _terminate_async(process)
+                raise
+
+        stdout, stderr = stream.tail, None
+
+    else:
+        if pipe_stdout:
+            run_kwargs.setdefault('stdout', _PIPE)
+
+        process = await create_subprocess_exec(
+            *command, stderr=_PIPE, start_new_session=True, **run_kwargs)
+        try:
+            stdout, stderr = await process.communicate()
+        except BaseException:
+            await _terminate_async(process)
+            raise
+
+        stdout = stdout.decode() if stdout is not None else None
+        stderr = stderr.decode() if stderr is not None else None
+
+    result = _CompletedProcess(command, process.returncode, stdout, stderr)
 
     if check and result.returncode:
         raise _RuntimeException((result.stderr or result.stdout or
@@ -129,6 +292,145 @@ def call(command, check=True, pipe_stdout=False, **run_kwargs):
     return result
 
 
+class _OutputStream:
+    """
+    Subprocess output lines handler.
+
+    Only the output tail is kept in memory. The output can be passed by chunks
+    of any size, to support lines of any length.
+
+    Args:
+        line_callback (callable): Function called with each line.
+        log_file (path-like object): Path to a file where append lines.
+        quiet (bool): If False, also write lines to sys.stdout.
+    """
+
+    def __init__(self, line_callback=None, log_file=None, quiet=False):
+        # Lazy import: Only used when streaming
+        from codecs import getincrementaldecoder
+        from collections import deque
+
+        self._tail = deque(maxlen=OUTPUT_TAIL_LINES)
+        self._decoder = getincrementaldecoder('utf-8')()
+        self._pending = []
+        self._line_callback = line_callback
+        self._quiet = quiet
+        self._log = open(_fsdecode(log_file), 'at') if log_file else None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if self._log:
+            self._log.close()
+
+    @property
+    def tail(self):
+        """
+        Last output lines.
+
+        Returns:
+            str: Output tail.
+        """
+        return ''.join(self._tail)
+
+    def write_chunk(self, chunk):
+        """
+        Handle an output chunk. Lines are handled once complete.
+
+        Args:
+            chunk (bytes): Output chunk. An empty chunk marks the end of the
+                output.
+        """
+        lines = self._decoder.decode(chunk, final=not chunk).split('\n')
+        for line in lines[:-1]:
+            self._pending.append(line)
+            self.write(''.join(self._pending) + '\n')
+            self._pending.clear()
+        self._pending.append(lines[-1])
+
+        if not chunk:
+            # Last line without line ending
+            line = ''.join(self._pending)
+            self._pending.clear()
+            if line:
+                self.write(line)
+
+    def write(self, line):
+        """
+        Handle an output line.
+
+        Args:
+            line (str): line.
+        """
+        self._tail.append(line)
+
+        if self._log:
+            self._log.write(line)
+            self._log.flush()
+
+        if not self._quiet:
+            # Lazy import: Only used when streaming
+            from sys import stdout
+            stdout.write(line)
+            stdout.flush()
+
+        if self._line_callback:
+            self._line_callback(line.rstrip('\n'))
+
+
+def _terminate(process):
+    """
+    Terminate a subprocess and its process group.
+
+    Args:
+        process (subprocess.Popen): Process started in a new session.
+    """
+    # Lazy import: Only used on termination
+    from os import killpg
+    from signal import SIGKILL, SIGTERM
+    from subprocess import TimeoutExpired
+
+    try:
+        killpg(process.pid, SIGTERM)
+        process.wait(TERMINATE_TIMEOUT)
+    except (ProcessLookupError, TimeoutExpired):
+        pass
+
+    # Kill remaining processes in the group
+    try:
+        killpg(process.pid, SIGKILL)
+    except ProcessLookupError:
+        pass
+    process.wait()
+
+
+async def _terminate_async(process):
+    """
+    Terminate an asyncio subprocess and its process group.
+
+    Args:
+        process (asyncio.subprocess.Process): Process started in a new session.
+    """
+    # Lazy import: Only used with asyncio
+    from asyncio import TimeoutError, wait_for
+    from os import killpg
+    from signal import SIGKILL, SIGTERM
+
+    try:
+        killpg(process.pid, SIGTERM)
+        await wait_for(process.wait(), TERMINATE_TIMEOUT)
+    except (ProcessLookupError, TimeoutError):
+        pass
+
+    # Kill remaining processes in the group
+    try:
+        killpg(process.pid, SIGKILL)
+    except ProcessLookupError:
+        pass
+    await process.wait()
+
+
 def get_sources_dirs(*src):
     """
     Return sources directories.
@@ -144,7 +446,28 @@ def get_sources_dirs(*src):
     return [_realpath(_fsdecode(path)) for path in paths if path]
 
 
-def symlink(src, dst):
+@_contextmanager
+def file_lock(path):
+    """
+    Exclusive lock between processes, based on a lock file.
+
+    Blocks until the lock is acquired.
+
+    Args:
+        path (path-like object): Lock file path.
+    """
+    # Lazy import: Only used when locking
+    from fcntl import flock, LOCK_EX, LOCK_UN
+
+    with open(_fsdecode(path), 'ab') as file:
+        flock(file.fileno(), LOCK_EX)
+        try:
+            yield
+        finally:
+            flock(file.fileno(), LOCK_UN)
+
+
+def symlink(src, dst, replace=False):
     """
     Extended "os.symlink" that:
     - Autodetect if target is directory.
@@ -154,12 +477,17 @@ def symlink(src, dst):
     Args:
         src (path-like object): Source path.
         dst (path-like object): Destination path.
+        replace (bool): If True, replace an existing destination that does not
+            link to the source.
     """
     src = _realpath(_fsdecode(src))
+    dst = _fsdecode(dst)
     try:
-        _symlink(src, _fsdecode(dst), target_is_directory=_isdir(src))
+        _symlink(src, dst, target_is_directory=_isdir(src))
     except FileExistsError:
-        pass
+        if replace and _realpath(dst) != src:
+            _remove(dst)
+            _symlink(src, dst, target_is_directory=_isdir(src))
 
 
 def get_sources_filters(provider, application):
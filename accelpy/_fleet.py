@@ -0,0 +1,522 @@
+# coding=utf-8
+"""Manage hosts fleets"""
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from fnmatch import fnmatchcase
+from json import dumps, loads
+from os import fsdecode, remove
+from threading import Lock
+from time import monotonic, sleep, time
+
+from accelpy._application import Application
+from accelpy._host import (
+    Host, get_registry, iter_host_names, remove_unused_utilities)
+
+#: Maximum default number of hosts operated concurrently
+MAX_WORKERS = 32
+
+#: Name of the default destroy journal file, in the hosts configuration
+#: directory
+DESTROY_JOURNAL_FILE = 'destroy_journal.jsonl'
+
+
+class Fleet:
+    """Fleet of hosts configurations.
+
+    Host life-cycle operations are run concurrently on all hosts of the fleet.
+    An error on a host does not stop operations on other hosts.
+
+    Args:
+        names (iterable of str): Names of hosts to include in the fleet.
+        pattern (str): Shell-style pattern used to select existing hosts by
+            name (Like "my_app_*"). Selected hosts are added to ones specified
+            by "names".
+        workers (int): Maximum number of hosts operated concurrently.
+            Default to the number of hosts in the fleet (Up to 32).
+    """
+
+    def __init__(self, names=None, pattern=None, workers=None):
+        names = set(names or ())
+        if pattern:
+            names.update(name for name in iter_host_names()
+                         if fnmatchcase(name, pattern))
+        self._names = tuple(sorted(names))
+        self._workers = workers or max(min(len(self._names), MAX_WORKERS), 1)
+
+    def __len__(self):
+        return len(self._names)
+
+    def __str__(self):
+        return f'<{self.__class__.__module__}.{self.__class__.__name__} ' \
+            f'(hosts={len(self)})>'
+
+    def __repr__(self):
+        return self.__str__()
+
+    @classmethod
+    def select(cls, provider=None, application=None, status=None,
+               workers=None):
+        """
+        Fleet of all existing hosts, or of hosts matching filters.
+
+        Args:
+            provider (str): If specified, only select hosts with this provider.
+            application (path-like object): If specified, only select hosts
+                with this application definition file.
+            status (str): If specified, only select hosts with this status
+                ("initialized", "applied" or "destroyed").
+            workers (int): Maximum number of hosts operated concurrently.
+
+        Returns:
+            accelpy.Fleet: Fleet.
+        """
+        return cls(names=iter_host_names(
+            provider=provider, application=application, status=status),
+            workers=workers)
+
+    @property
+    def names(self):
+        """
+        Names of hosts in the fleet.
+
+        Returns:
+            tuple of str: Names.
+        """
+        return self._names
+
+    def apply(self, quiet=True, build_once=False, cache=True):
+        """
+        Create the infrastructure of all hosts.
+
+        Args:
+            quiet (bool): If True, hide outputs.
+            build_once (bool): If True, hosts that share the same application
+                and provider, with a "container_image" package, are not
+                provisioned one by one: A virtual machine image is built once
+                for them, then all of them are applied from this image.
+                Hosts keep using this image on next applies.
+            cache (bool): "build_once" only. If True, reuse images of previous
+                builds with the same sources.
+
+        Returns:
+            dict: Per host results. See "accelpy.Fleet.summary".
+        """
+        if not build_once:
+            return self._run('apply', quiet=quiet)
+
+        results = self._build_images(quiet=quiet, cache=cache)
+        results.update(self._run('apply', names=tuple(
+            name for name in self._names if name not in results), quiet=quiet))
+        return results
+
+    def build(self, update_application=False, quiet=True, cache=True):
+        """
+        Create a virtual machine image of all hosts.
+
+        Args:
+            update_application (bool): If applicable, update the application
+                definition Yaml file to use this image as host base for the
+                selected provider.
+            quiet (bool): If True, hide outputs.
+            cache (bool): If True, reuse images of previous builds with the
+                same sources.
+
+        Returns:
+            dict: Per host results. See "accelpy.Fleet.summary".
+        """
+        return self._run('build', update_application=update_application,
+                         quiet=quiet, cache=cache)
+
+    def destroy(self, quiet=True, delete=None, rate=None, journal=None):
+        """
+        Destroy the infrastructure of all hosts.
+
+        Args:
+            quiet (bool): If True, hide outputs.
+            delete (bool): If True, also delete hosts configurations.
+            rate (float): Maximum number of hosts destroys started per second.
+                Default to no limit.
+            journal (path-like object): Path to a file where the progress is
+                recorded. Hosts recorded as destroyed by a previous interrupted
+                call are skipped if they were not applied again since. The file
+                is removed once all hosts are destroyed.
+
+        Returns:
+            dict: Per host results. See "accelpy.Fleet.summary".
+        """
+        names = self._names
+        results = dict()
+
+        if journal is not None:
+            journal = _Journal(journal)
+            completed = journal.completed()
+            registry = get_registry()
+            names = []
+            for name in self._names:
+                record = registry.get(name) if name in completed else None
+                if record is not None and record.status == 'destroyed':
+                    results[name] = dict(
+                        result='already destroyed', error=None)
+                else:
+                    names.append(name)
+
+        results.update(self._run(
+            'destroy', names=names, rate=rate, journal=journal, quiet=quiet,
+            delete=delete))
+
+        if journal is not None and not any(
+                result['error'] for result in results.values()):
+            journal.remove()
+
+        return results
+
+    def update_configuration(self):
+        """
+        Update configurations of all hosts from their sources.
+
+        Sources are retrieved once per group of hosts that share the same
+        application, provider and user configuration.
+
+        Returns:
+            dict: Per host results. See "accelpy.Fleet.summary" and
+                "accelpy.Host.update_configuration".
+        """
+        registry = get_registry()
+        groups = dict()
+        for name in self._names:
+            record = registry.get(name)
+            key = ((record.application, record.provider, record.user_config)
+                   if record is not None else name)
+            groups.setdefault(key, []).append(name)
+
+        results = dict()
+        if not groups:
+            return results
+
+        with ThreadPoolExecutor(
+                max_workers=min(len(groups), self._workers)) as executor:
+            for group_results in executor.map(
+                    self._update_group, groups.values()):
+                results.update(group_results)
+
+        return results
+
+    def upgrade_utilities(self):
+        """
+        Upgrade Terraform and Packer versions used by all hosts, then remove
+        installed versions not used anymore.
+
+        Returns:
+            dict: Per host results. See "accelpy.Fleet.summary" and
+                "accelpy.Host.upgrade_utilities".
+        """
+        results = self._run('upgrade_utilities', _remove_unused=False)
+        remove_unused_utilities()
+        return results
+
+    @staticmethod
+    def summary(results):
+        """
+        Summarize operation results.
+
+        Args:
+            results (dict): Per host results as returned by operations methods.
+                Each host name is mapped to a dict with "result" (Operation
+                return value) and "error" (Exception raised by operation, or
+                None) keys.
+
+        Returns:
+            str: Summary.
+        """
+        failed = sorted(name for name in results if results[name]['error'])
+        lines = [f'{len(results) - len(failed)} succeeded, '
+                 f'{len(failed)} failed']
+
+        for name in sorted(results):
+            host_result = results[name]
+            if host_result['error']:
+                lines.append(f'{name}: failed: {host_result["error"]}')
+            elif host_result['result'] is not None:
+                lines.append(f'{name}: succeeded: {host_result["result"]}')
+            else:
+                lines.append(f'{name}: succeeded')
+
+        return '\n'.join(lines)
+
+    def _run(self, operation, names=None, rate=None, journal=None, **kwargs):
+        """
+        Run an operation on all hosts.
+
+        Args:
+            operation (str): Host method name.
+            names (iterable of str): Names of hosts to operate. Default to all
+                hosts of the fleet.
+            rate (float): Maximum number of operations started per second.
+                Default to no limit.
+            journal (accelpy._fleet._Journal): Journal where record progress.
+            kwargs: Host method keyword arguments.
+
+        Returns:
+            dict: Per host results.
+        """
+        if names is None:
+            names = self._names
+        if not names:
+            return dict()
+
+        # Ensure utility is installed before starting workers
+        self._prepare(operation)
+
+        limiter = _RateLimiter(rate) if rate else None
+
+        results = dict()
+        with ThreadPoolExecutor(max_workers=self._workers) as executor:
+            futures = {
+                executor.submit(self._operate, name, operation, kwargs,
+                                limiter, journal): name
+                for name in names}
+
+            for future in as_completed(futures):
+                name = futures[future]
+                try:
+                    results[name] = dict(result=future.result(), error=None)
+                except Exception as exception:
+                    results[name] = dict(result=None, error=exception)
+
+        return results
+
+    def _build_images(self, quiet, cache):
+        """
+        Build a virtual machine image once per group of hosts that share the
+        same application and provider, with a "container_image" package, and
+        use it as base of all hosts of the group.
+
+        Args:
+            quiet (bool): If True, hide outputs.
+            cache (bool): If True, reuse images of previous builds with the
+                same sources.
+
+        Returns:
+            dict: Results of hosts of groups for which the image build failed.
+        """
+        registry = get_registry()
+        groups = dict()
+        for name in self._names:
+            record = registry.get(name)
+            if record is not None:
+                groups.setdefault(
+                    (record.application, record.provider), []).append(name)
+
+        buildable = []
+        for (application, provider), names in groups.items():
+            if len(names) < 2:
+                continue
+            try:
+                package_type = Application(application).get(
+                    'package', 'type', env=provider)
+            except Exception:
+                # Errors are reported by hosts operations
+                continue
+            if package_type == 'container_image':
+                buildable.append(names)
+
+        if not buildable:
+            return dict()
+
+        # Ensure Packer is installed before starting workers
+        self._prepare('build')
+
+        results = dict()
+        with ThreadPoolExecutor(
+                max_workers=min(len(buildable), self._workers)) as executor:
+            futures = {
+                executor.submit(self._build_group, names, quiet, cache): names
+                for names in buildable}
+
+            for future in as_completed(futures):
+                try:
+                    future.result()
+                except Exception as exception:
+                    results.update({name: dict(result=None, error=exception)
+                                    for name in futures[future]})
+
+        return results
+
+    @staticmethod
+    def _build_group(names, quiet, cache):
+        """
+        Build a virtual machine image from the first host of a group and use it
+        as base of all hosts of the group.
+
+        Args:
+            names (list of str): Hosts names.
+            quiet (bool): If True, hide outputs.
+            cache (bool): If True, reuse images of previous builds with the
+                same sources.
+
+        Returns:
+            str: Image.
+        """
+        with Host(name=names[0]) as host:
+            image = host.build(quiet=quiet, cache=cache)
+
+        for name in names:
+            with Host(name=name) as host:
+                host.use_image(image)
+
+        return image
+
+    @staticmethod
+    def _update_group(names):
+        """
+        Update configurations of a group of hosts sharing the same sources.
+
+        Args:
+            names (list of str): Hosts names.
+
+        Returns:
+            dict: Per host results.
+        """
+        sources = dict()
+        results = dict()
+        for name in names:
+            try:
+                with Host(name=name) as host:
+                    results[name] = dict(
+                        result=host.update_configuration(_sources=sources),
+                        error=None)
+            except Exception as exception:
+                results[name] = dict(result=None, error=exception)
+        return results
+
+    @staticmethod
+    def _operate(name, operation, kwargs, limiter=None, journal=None):
+        """
+        Run an operation on a single host.
+
+        Args:
+            name (str): Host name.
+            operation (str): Host method name.
+            kwargs: Host method keyword arguments.
+            limiter (accelpy._fleet._RateLimiter): Operations rate limiter.
+            journal (accelpy._fleet._Journal): Journal where record progress.
+
+        Returns:
+            Operation result.
+        """
+        if limiter is not None:
+            limiter.wait()
+
+        if journal is None:
+            with Host(name=name) as host:
+                return getattr(host, operation)(**kwargs)
+
+        journal.write(name, 'started')
+        try:
+            with Host(name=name) as host:
+                result = getattr(host, operation)(**kwargs)
+        except Exception as exception:
+            journal.write(name, 'failed', error=str(exception))
+            raise
+        journal.write(name, 'completed')
+        return result
+
+    @staticmethod
+    def _prepare(operation):
+        """
+        Get the executable of the utility required by the operation once,
+        to avoid concurrent installations from workers.
+
+        Args:
+            operation (str): Host method name.
+        """
+        # Lazy import: Only one of them is required
+        if operation == 'build':
+            from accelpy._packer import Packer as Utility
+        else:
+            from accelpy._terraform import Terraform as Utility
+
+        Utility._get_executable()
+
+
+class _RateLimiter:
+    """
+    Limit the rate of operations starts between threads.
+
+    Args:
+        rate (float): Maximum number of operations started per second.
+    """
+
+    def __init__(self, rate):
+        self._interval = 1.0 / rate
+        self._next = monotonic()
+        self._lock = Lock()
+
+    def wait(self):
+        """
+        Wait until an operation can be started.
+        """
+        with self._lock:
+            now = monotonic()
+            start = max(now, self._next)
+            self._next = start + self._interval
+        if start > now:
+            sleep(start - now)
+
+
+class _Journal:
+    """
+    Operations progress journal, saved as JSON lines.
+
+    Args:
+        path (path-like object): Journal file path.
+    """
+
+    def __init__(self, path):
+        self._path = fsdecode(path)
+        self._lock = Lock()
+
+    def completed(self):
+        """
+        Hosts with a completed operation.
+
+        Returns:
+            set of str: Hosts names.
+        """
+        completed = set()
+        try:
+            with open(self._path, 'rt') as journal:
+                for line in journal:
+                    try:
+                        entry = loads(line)
+                    except ValueError:
+                        # Line truncated by an interruption
+                        continue
+                    if entry['event'] == 'completed':
+                        completed.add(entry['name'])
+                    else:
+                        completed.discard(entry['name'])
+        except FileNotFoundError:
+            pass
+        return completed
+
+    def write(self, name, event, error=None):
+        """
+        Record a host event.
+
+        Args:
+            name (str): Host name.
+            event (str): "started", "completed" or "failed".
+            error (str): Error message.
+        """
+        line = dumps(dict(name=name, event=event, time=time(), error=error))
+        with self._lock, open(self._path, 'at') as journal:
+            journal.write(line + '\n')
+
+    def remove(self):
+        """
+        Remove the journal.
+        """
+        try:
+            remove(self._path)
+        except FileNotFoundError:
+            pass
@@ -1,13 +1,69 @@
 # coding=utf-8
 """HashiCorp utilities common functions"""
-from os import chmod, stat, makedirs, fsdecode, scandir
-from os.path import join, isfile, dirname, getmtime
+from os import (
+    chmod, environ, stat, makedirs, fsdecode, getpid, remove, replace,
+    scandir)
+from os.path import basename, join, isfile, dirname, getmtime
+from threading import Lock, Thread, get_ident
 from time import time
 
 from accelpy._common import (
-    HOME_DIR, call, json_read, json_write, get_sources_dirs,
-    get_sources_filters)
-from accelpy.exceptions import RuntimeException
+    HOME_DIR, call, call_async, data_digest, file_lock, json_read, json_write,
+    get_sources_dirs, get_sources_filters)
+from accelpy.exceptions import (
+    AccelizeException, ConfigurationException, RuntimeException)
+
+#: Suffix of the manifest file saved next to the executable
+MANIFEST_SUFFIX = '.manifest.json'
+
+#: Name of the lock file used to install utilities in the install directory
+INSTALL_LOCK_FILE = '.install.lock'
+
+#: Name of the utilities settings file in the user configuration directory
+SETTINGS_FILE = 'hashicorp.json'
+
+#: HashiCorp checkpoint API URL
+CHECKPOINT_URL = 'https://checkpoint-api.hashicorp.com/v1/check/'
+
+#: HashiCorp releases URL
+RELEASES_URL = 'https://releases.hashicorp.com/'
+
+#: Default delay in seconds before checking again the last utility version
+CHECKPOINT_TTL = 86400.0
+
+#: Timeout in seconds of HashiCorp checkpoint API requests
+CHECKPOINT_TIMEOUT = 10.0
+
+#: Maximum delay in seconds to wait for background last version updates on exit
+REVALIDATE_EXIT_TIMEOUT = 3.0
+
+#: Timeout in seconds of downloads connection and read operations
+DOWNLOAD_TIMEOUT = 60.0
+
+#: Size in bytes of downloaded chunks
+DOWNLOAD_CHUNK_SIZE = 1048576
+
+
+# Per utility installation locks
+_INSTALL_LOCKS = dict()
+
+# Per utility background last version updates, run once per process
+_REVALIDATIONS = dict()
+_REVALIDATIONS_LOCK = Lock()
+
+
+def _version_key(version):
+    """
+    Sort key of versions.
+
+    Args:
+        version (str): Version.
+
+    Returns:
+        tuple: Key.
+    """
+    return tuple(int(part) if part.isdigit() else -1
+                 for part in version.split('-', 1)[0].split('.'))
 
 
 class Utility:
@@ -20,8 +76,12 @@ class Utility:
         application_type (str): Application type.
         user_config (path-like object): User configuration directory.
         variables (dict): Utility variables.
+        version (str): Utility version to use. Default to the current version
+            (See "current_version").
+        version_callback (callable): If "version" is not specified, function
+            called with the version used as argument, on first use.
     """
-    # Memoized executable path
+    # Memoized executable path of the current version
     _executable = None
 
     # To override with __file__ in subclasses for good directory detection
@@ -33,8 +93,11 @@ class Utility:
 
     def __init__(self, config_dir,
                  provider=None, application_type=None, variables=None,
-                 user_config=None):
+                 user_config=None, version=None, version_callback=None):
         self._config_dir = fsdecode(config_dir)
+        self._version = version
+        self._version_callback = version_callback
+        self._exec_file = None
         self._provider = provider or ''
         self._variables = variables or dict()
         self._source_names = get_sources_filters(
@@ -72,61 +135,301 @@ class Utility:
         return join(HOME_DIR, cls._name())
 
     @classmethod
-    def _get_executable(cls):
+    def _get_executable(cls, version=None):
         """
-        Get utility executable path after installing or updating it if
-        required.
+        Get utility executable path after installing it if required.
+
+        Versions are installed side by side in the install directory.
+
+        Args:
+            version (str): Utility version. Default to the current version
+                (See "current_version").
+
+        Returns:
+            str: Executable path.
         """
-        if not cls._executable:
-            # Get utility release information from HashiCorp checkpoint API
-            last_release = cls._get_last_version()
+        if version is None:
+            if not cls._executable:
+                # Install only once at a time, other threads reuse the result
+                with _INSTALL_LOCKS.setdefault(cls._name(), Lock()):
+                    if not cls._executable:
+                        cls._executable = cls._install(
+                            cls._get_last_version())
+            return cls._executable
+
+        release = cls._pinned_release(version)
+        exec_file = cls._versioned_executable(release)
+        if cls._is_up_to_date(exec_file, release):
+            return exec_file
+
+        with _INSTALL_LOCKS.setdefault(cls._name(), Lock()):
+            return cls._install(release)
 
-            # Check if executable is already installed and up-to-date
-            cls._executable = exec_file = join(
-                cls._install_dir(), last_release['executable_name'])
+    @classmethod
+    def current_version(cls):
+        """
+        Current utility version: The version pinned in settings, or the last
+        released version. This version is used by new hosts.
 
-            if isfile(exec_file):
-                line = call((exec_file, 'version'),
-                            pipe_stdout=True).stdout.splitlines()[0]
-                exec_version = line.split(' ')[1].strip().lstrip('v')
+        Returns:
+            str: Version.
+        """
+        return cls._get_last_version()['current_version']
 
-                # If file is installed and up-to-date, returns its path
-                if exec_version == last_release['current_version']:
-                    return exec_file
+    @classmethod
+    def _local_current_version(cls):
+        """
+        Current utility version, from settings or the cached last version
+        information only. HashiCorp servers are never contacted.
 
-            # Download executables checksum file and associated signature
-            checksum_raw = cls._download(last_release['checksum_url']).content
-            checksum_sig_raw = cls._download(
-                last_release['signature_url']).content
+        Returns:
+            str: Version. None if unknown.
+        """
+        version = cls._settings().get(f'{cls._name()}_version')
+        if version:
+            return version
+        try:
+            return json_read(join(
+                cls._install_dir(), 'info.json'))['current_version']
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
 
-            # Verify checksum file signature against HashiCorp GPG key
-            cls._gpg_verify(checksum_raw, checksum_sig_raw)
+    @classmethod
+    def installed_versions(cls):
+        """
+        Installed utility versions.
+
+        Returns:
+            list of str: Versions.
+        """
+        executable_name = cls._release_info(dict(
+            current_version='', current_download_url=''))['executable_name']
+        try:
+            with scandir(cls._install_dir()) as entries:
+                return sorted(
+                    (entry.name for entry in entries if entry.is_dir() and
+                     isfile(join(entry.path, executable_name))),
+                    key=_version_key)
+        except FileNotFoundError:
+            return []
+
+    @classmethod
+    def remove_unused_versions(cls, used=()):
+        """
+        Remove installed utility versions that are not used.
+
+        The current version, as known locally without contacting HashiCorp
+        servers, and the last installed version are always kept.
+
+        Args:
+            used (iterable of str): Used versions.
+
+        Returns:
+            list of str: Removed versions.
+        """
+        # Lazy import: Only used on removal
+        from shutil import rmtree
+
+        keep = set(used)
+        keep.add(cls._local_current_version())
+        removed = []
+        makedirs(cls._install_dir(), exist_ok=True)
+        with _INSTALL_LOCKS.setdefault(cls._name(), Lock()), file_lock(
+                join(cls._install_dir(), INSTALL_LOCK_FILE)):
+            installed = cls.installed_versions()
+            for version in installed[:-1]:
+                if version not in keep:
+                    rmtree(join(cls._install_dir(), version))
+                    removed.append(version)
+        return removed
+
+    @classmethod
+    def _versioned_executable(cls, release):
+        """
+        Executable path of a release.
 
-            # Download the latest compressed executable
-            compressed = cls._download(last_release['archive_url']).content
+        Args:
+            release (dict): Release information.
 
-            # Verify executable checksum
-            cls._checksum_verify(
-                checksum_raw, compressed, last_release['archive_name'])
+        Returns:
+            str: Executable path.
+        """
+        return join(cls._install_dir(), release['current_version'],
+                    release['executable_name'])
 
-            # Ensure directories exists
-            makedirs(cls._plugins_dir(), exist_ok=True)
+    @classmethod
+    def _install(cls, last_release):
+        """
+        Install the utility release if required.
 
-            # Lazy import package that are required only on install
-            from io import BytesIO
-            from zipfile import ZipFile
+        Only one process installs the utility at a time, others wait and reuse
+        the result.
 
-            # Extract executable and returns its path
-            compressed_file_obj = BytesIO(compressed)
-            compressed_file_obj.seek(0)
-            with ZipFile(compressed_file_obj) as compressed_file:
-                cls._executable = compressed_file.extract(
-                    compressed_file.namelist()[0], path=cls._install_dir())
+        Args:
+            last_release (dict): Release information.
+
+        Returns:
+            str: Executable path.
+        """
+        exec_file = cls._versioned_executable(last_release)
+
+        # If file is installed and up-to-date, returns its path
+        if cls._is_up_to_date(exec_file, last_release):
+            return exec_file
+
+        makedirs(cls._plugins_dir(), exist_ok=True)
+        with file_lock(join(cls._install_dir(), INSTALL_LOCK_FILE)):
+
+            # Move executable installed by previous accelpy versions in its
+            # version directory
+            cls._move_unversioned(last_release['executable_name'])
+
+            # May have been installed by another process while waiting
+            if cls._is_up_to_date(exec_file, last_release):
+                return exec_file
+
+            if cls._settings().get('offline'):
+                raise RuntimeException(
+                    f'Unable to install {cls._name()} '
+                    f'{last_release["current_version"]}: Offline mode is '
+                    'enabled.')
+
+            # Lazy import: Only used on update
+            from concurrent.futures import ThreadPoolExecutor
+
+            # Download executables checksum file, associated signature and
+            # the compressed executable concurrently
+            makedirs(dirname(exec_file), exist_ok=True)
+            archive = join(dirname(exec_file), last_release['archive_name'])
+            try:
+                with ThreadPoolExecutor(max_workers=3) as executor:
+                    checksum = executor.submit(
+                        cls._download, last_release['checksum_url'])
+                    checksum_sig = executor.submit(
+                        cls._download, last_release['signature_url'])
+                    digest = executor.submit(
+                        cls._download_file, last_release['archive_url'],
+                        archive)
+
+                    checksum_raw = checksum.result().content
+                    checksum_sig_raw = checksum_sig.result().content
+                    digest = digest.result()
+
+                # Verify checksum file signature against HashiCorp GPG key
+                cls._gpg_verify(checksum_raw, checksum_sig_raw)
+
+                # Verify executable checksum
+                if digest != cls._expected_checksum(
+                        checksum_raw, last_release['archive_name']):
+                    raise RuntimeException(
+                        f'Unable to update {cls._name()}: Invalid checksum')
+
+                # Extract executable
+                cls._extract(archive, exec_file)
+            finally:
+                try:
+                    remove(archive)
+                except FileNotFoundError:
+                    pass
 
             # Ensure the file is executable
-            chmod(cls._executable, stat(cls._executable).st_mode | 0o111)
+            chmod(exec_file, stat(exec_file).st_mode | 0o111)
+
+            # Trust the verified executable on next calls
+            cls._write_manifest(exec_file, last_release['current_version'])
 
-        return cls._executable
+        return exec_file
+
+    @classmethod
+    def _move_unversioned(cls, executable_name):
+        """
+        Move an executable installed directly in the install directory to its
+        version directory.
+
+        Args:
+            executable_name (str): Executable name.
+        """
+        exec_file = join(cls._install_dir(), executable_name)
+        if not isfile(exec_file):
+            return
+
+        version = cls._installed_version(exec_file)
+        version_dir = join(cls._install_dir(), version)
+        makedirs(version_dir, exist_ok=True)
+        for name in (executable_name, executable_name + MANIFEST_SUFFIX):
+            replace(join(cls._install_dir(), name), join(version_dir, name))
+
+    @classmethod
+    def _is_up_to_date(cls, exec_file, last_release):
+        """
+        Check if the executable is installed and up-to-date.
+
+        Args:
+            exec_file (str): Executable path.
+            last_release (dict): Last version information.
+
+        Returns:
+            bool: True if up-to-date.
+        """
+        return isfile(exec_file) and cls._installed_version(
+            exec_file) == last_release['current_version']
+
+    @classmethod
+    def _installed_version(cls, exec_file):
+        """
+        Get the version of an installed executable.
+
+        The version is read from the manifest saved next to the executable. The
+        executable is called to get its version only if the file was modified
+        since the manifest was written.
+
+        Args:
+            exec_file (str): Executable path.
+
+        Returns:
+            str: Version.
+        """
+        exec_stat = stat(exec_file)
+        try:
+            manifest = json_read(exec_file + MANIFEST_SUFFIX)
+        except (OSError, ValueError):
+            manifest = dict()
+
+        if (manifest.get('size') == exec_stat.st_size and
+                manifest.get('mtime') == exec_stat.st_mtime_ns):
+            return manifest['version']
+
+        line = call((exec_file, 'version'),
+                    pipe_stdout=True).stdout.splitlines()[0]
+        exec_version = line.split(' ')[1].strip().lstrip('v')
+        cls._write_manifest(exec_file, exec_version)
+        return exec_version
+
+    @staticmethod
+    def _write_manifest(exec_file, version):
+        """
+        Write the manifest of an executable.
+
+        Args:
+            exec_file (str): Executable path.
+            version (str): Executable version.
+        """
+        # Lazy import: Only used on update
+        from hashlib import sha256
+
+        hasher = sha256()
+        with open(exec_file, 'rb') as file:
+            for chunk in iter(lambda: file.read(1048576), b''):
+                hasher.update(chunk)
+
+        # Written atomically, since may be read concurrently
+        exec_stat = stat(exec_file)
+        manifest = exec_file + MANIFEST_SUFFIX
+        tmp_manifest = f'{manifest}.{getpid()}.{get_ident()}'
+        json_write(dict(version=version, sha256=hasher.hexdigest(),
+                        size=exec_stat.st_size, mtime=exec_stat.st_mtime_ns),
+                   tmp_manifest)
+        replace(tmp_manifest, manifest)
 
     @classmethod
     def _download(cls, url):
@@ -156,56 +459,333 @@ class Utility:
 
         return response
 
+    @classmethod
+    def _settings(cls):
+        """
+        Utility settings.
+
+        Settings are read from the "hashicorp.json" file in the user
+        configuration directory. Supported settings are:
+
+        - "offline" (bool): If True, never contact HashiCorp servers. The
+          installed utility version is used. Can also be set with the
+          "ACCELPY_OFFLINE" environment variable.
+        - "<utility>_version" (str): Pinned utility version (For instance,
+          "terraform_version"). The last version is not checked. Can also be
+          set with the "ACCELPY_<UTILITY>_VERSION" environment variable.
+        - "checkpoint_ttl" (float): Delay in seconds before checking again the
+          last utility version.
+
+        Returns:
+            dict: Settings.
+
+        Raises:
+            accelpy.exceptions.ConfigurationException: Invalid settings file.
+        """
+        path = join(HOME_DIR, SETTINGS_FILE)
+        try:
+            settings = json_read(path)
+        except FileNotFoundError:
+            settings = dict()
+        except ValueError as exception:
+            raise ConfigurationException(
+                f'Invalid settings file "{path}": {exception}')
+
+        if not isinstance(settings, dict):
+            raise ConfigurationException(
+                f'Invalid settings file "{path}": must be a JSON object.')
+
+        offline = environ.get('ACCELPY_OFFLINE')
+        if offline is not None:
+            settings['offline'] = offline.lower() not in (
+                '', '0', 'false', 'no')
+
+        version = environ.get(f'ACCELPY_{cls._name().upper()}_VERSION')
+        if version:
+            settings[f'{cls._name()}_version'] = version
+
+        return settings
+
+    @classmethod
+    def _download_file(cls, url, path):
+        """
+        Download from URL to a file.
+
+        The content is streamed to a temporary file, and hashed while
+        downloaded. If a previous download of the same file was interrupted,
+        it is resumed.
+
+        Args:
+            url (str): URL.
+            path (str): Destination file path.
+
+        Returns:
+            str: SHA-256 hexadecimal digest of the file.
+
+        Raises:
+            accelpy.exceptions.RuntimeException: HTTP Error.
+        """
+        # Lazy import: Only used on update
+        from hashlib import sha256
+        from requests import get
+        from requests.exceptions import RequestException
+
+        part_file = f'{path}.part'
+        hasher = sha256()
+
+        # Hash the already downloaded part to resume the download
+        try:
+            with open(part_file, 'rb') as file:
+                for chunk in iter(lambda: file.read(DOWNLOAD_CHUNK_SIZE), b''):
+                    hasher.update(chunk)
+                start = file.tell()
+        except FileNotFoundError:
+            start = 0
+
+        headers = {'Range': f'bytes={start}-'} if start else dict()
+        try:
+            with get(url, headers=headers, stream=True,
+                     timeout=DOWNLOAD_TIMEOUT) as response:
+
+                if start and response.status_code != 206:
+                    # Resume not supported or invalid part: Start again
+                    hasher = sha256()
+                    start = 0
+                    if response.status_code == 416:
+                        remove(part_file)
+                        return cls._download_file(url, path)
+
+                response.raise_for_status()
+                with open(part_file, 'ab' if start else 'wb') as file:
+                    for chunk in response.iter_content(DOWNLOAD_CHUNK_SIZE):
+                        file.write(chunk)
+                        hasher.update(chunk)
+
+        except RequestException as error:
+            raise RuntimeException(
+                f'Unable to update {cls._name()}: {str(error)}')
+
+        replace(part_file, path)
+        return hasher.hexdigest()
+
+    @staticmethod
+    def _extract(archive, exec_file):
+        """
+        Extract the executable from the archive and atomically replace the
+        existing executable.
+
+        Args:
+            archive (str): Zip archive path.
+            exec_file (str): Executable path.
+
+        Returns:
+            str: Executable path.
+        """
+        # Lazy import package that are required only on install
+        from tempfile import TemporaryDirectory
+        from zipfile import ZipFile
+
+        with ZipFile(archive) as compressed_file, TemporaryDirectory(
+                dir=dirname(exec_file)) as tmp_dir:
+            replace(compressed_file.extract(
+                compressed_file.namelist()[0], path=tmp_dir), exec_file)
+        return exec_file
+
     @classmethod
     def _get_last_version(cls):
         """
-        Get last version information from HashiCorp checkpoint API.
+        Get last version information.
+
+        The information is retrieved from HashiCorp checkpoint API and cached.
+        Once the cache expired, the cached information is still returned while
+        it is updated in background. The checkpoint API is not used if the
+        version is pinned or if the offline mode is enabled.
 
         Returns:
             dict: Last version information.
+
+        Raises:
+            accelpy.exceptions.RuntimeException: Unable to get information.
         """
+        settings = cls._settings()
+        version = settings.get(f'{cls._name()}_version')
+        if version:
+            return cls._pinned_release(version)
+
         info_cache = join(cls._install_dir(), 'info.json')
+        try:
+            last_release = json_read(info_cache)
+            expired = getmtime(info_cache) < time() - settings.get(
+                'checkpoint_ttl', CHECKPOINT_TTL)
+        except (OSError, ValueError):
+            last_release = None
+
+        if settings.get('offline'):
+            installed = cls.installed_versions()
+            if last_release is None or (
+                    last_release.get('current_version') not in installed):
+                # Use the last installed version
+                if not installed:
+                    raise RuntimeException(
+                        f'Unable to get {cls._name()} version: Offline mode is '
+                        'enabled and no version is installed.')
+                last_release = cls._pinned_release(installed[-1])
+            return last_release
+
+        elif last_release is None:
+            return cls._check_last_version(info_cache)
+
+        elif expired:
+            # Stale while revalidate
+            cls._start_revalidation(info_cache, last_release)
 
-        # Get Last version information from HashiCorp checkpoint API
-        if not isfile(info_cache) or getmtime(info_cache) < time() - 3600.0:
+        return last_release
 
-            # Lazy import: Only used on update
-            from platform import machine, system
+    @classmethod
+    def _check_last_version(cls, info_cache, cached=None):
+        """
+        Get last version information from HashiCorp checkpoint API and cache
+        it.
 
-            # Update from the web
-            last_release = cls._download(
-                'https://checkpoint-api.hashicorp.com/v1/check/' +
-                cls._name()).json()
+        Args:
+            info_cache (str): Cache file path.
+            cached (dict): Cached information, used to perform a conditional
+                request.
 
-            current_version = last_release['current_version']
-            download_url = last_release['current_download_url'].rstrip('/')
+        Returns:
+            dict: Last version information.
 
-            # Define platform specific utility executable and archive name
-            arch = machine().lower()
-            arch = {'x86_64': 'amd64'}.get(arch, arch)
+        Raises:
+            accelpy.exceptions.RuntimeException: Unable to get information.
+        """
+        # Lazy import: Only used on update
+        from requests import get
+        from requests.exceptions import RequestException
 
-            last_release['archive_name'] = archive_name = \
-                f"{cls._name()}_{current_version}_{system().lower()}_{arch}.zip"
+        headers = dict()
+        if cached and cached.get('etag'):
+            headers['If-None-Match'] = cached['etag']
+        if cached and cached.get('last_modified'):
+            headers['If-Modified-Since'] = cached['last_modified']
 
-            last_release['executable_name'] = \
-                f'{cls._name()}.exe' if system() == 'Windows' else cls._name()
+        try:
+            response = get(CHECKPOINT_URL + cls._name(), headers=headers,
+                           timeout=CHECKPOINT_TIMEOUT)
+            response.raise_for_status()
 
-            # Define download URL
-            last_release['archive_url'] = f"{download_url}/{archive_name}"
-            last_release['checksum_url'] = checksum_url = \
-                f"{download_url}/{cls._name()}_{current_version}_SHA256SUMS"
-            last_release['signature_url'] = f"{checksum_url}.sig"
+            if response.status_code == 304 and cached:
+                # Not modified
+                last_release = cached
+            else:
+                last_release = cls._release_info(response.json())
+                last_release['etag'] = response.headers.get('ETag')
+                last_release['last_modified'] = response.headers.get(
+                    'Last-Modified')
 
-            # Cache result
-            makedirs(cls._install_dir(), exist_ok=True)
-            json_write(last_release, info_cache)
+        except (RequestException, ValueError) as exception:
+            raise RuntimeException(
+                f'Unable to update {cls._name()}: {str(exception)}')
 
-        else:
-            # Get cached version
-            last_release = json_read(info_cache)
+        # Cache result, also updates the cache date if not modified.
+        # Written atomically, since may be read concurrently.
+        makedirs(cls._install_dir(), exist_ok=True)
+        tmp_cache = f'{info_cache}.{getpid()}'
+        json_write(last_release, tmp_cache)
+        replace(tmp_cache, info_cache)
 
         return last_release
 
+    @classmethod
+    def _start_revalidation(cls, info_cache, cached):
+        """
+        Update cached last version information in background, only once per
+        process. The update is waited briefly on exit.
+
+        Args:
+            info_cache (str): Cache file path.
+            cached (dict): Cached information.
+        """
+        with _REVALIDATIONS_LOCK:
+            if cls in _REVALIDATIONS:
+                return
+
+            thread = _REVALIDATIONS[cls] = Thread(
+                target=cls._revalidate_last_version, daemon=True,
+                args=(info_cache, cached))
+            thread.start()
+
+            if len(_REVALIDATIONS) == 1:
+                # Lazy import: Only used on update
+                from atexit import register
+                register(_join_revalidations)
+
+    @classmethod
+    def _revalidate_last_version(cls, info_cache, cached):
+        """
+        Update cached last version information. Errors are ignored, the cached
+        information is used until the next successful update.
+
+        Args:
+            info_cache (str): Cache file path.
+            cached (dict): Cached information.
+        """
+        try:
+            cls._check_last_version(info_cache, cached)
+        except (AccelizeException, OSError):
+            pass
+
+    @classmethod
+    def _pinned_release(cls, version):
+        """
+        Get information of a specific release.
+
+        Args:
+            version (str): Version.
+
+        Returns:
+            dict: Release information.
+        """
+        version = version.lstrip('v')
+        return cls._release_info(dict(
+            current_version=version,
+            current_download_url=f'{RELEASES_URL}{cls._name()}/{version}/'))
+
+    @classmethod
+    def _release_info(cls, release):
+        """
+        Add platform specific information to release information.
+
+        Args:
+            release (dict): Release information with "current_version" and
+                "current_download_url" keys.
+
+        Returns:
+            dict: Release information.
+        """
+        # Lazy import: Only used on update
+        from platform import machine, system
+
+        current_version = release['current_version']
+        download_url = release['current_download_url'].rstrip('/')
+
+        # Define platform specific utility executable and archive name
+        arch = machine().lower()
+        arch = {'x86_64': 'amd64'}.get(arch, arch)
+
+        release['archive_name'] = archive_name = \
+            f"{cls._name()}_{current_version}_{system().lower()}_{arch}.zip"
+
+        release['executable_name'] = \
+            f'{cls._name()}.exe' if system() == 'Windows' else cls._name()
+
+        # Define download URL
+        release['archive_url'] = f"{download_url}/{archive_name}"
+        release['checksum_url'] = checksum_url = \
+            f"{download_url}/{cls._name()}_{current_version}_SHA256SUMS"
+        release['signature_url'] = f"{checksum_url}.sig"
+
+        return release
+
     @classmethod
     def _checksum_verify(cls, checksum_list, data, filename):
         """
@@ -220,26 +800,41 @@ class Utility:
         Raises:
             accelpy.exceptions.RuntimeException: Invalid Checksum.
         """
-        # Get file checksum in checksum file
-        for line in checksum_list.decode().splitlines():
-            if filename in line:
-                checksum = line.split(' ')[0].strip()
-                break
-        else:
-            # Should never raise
-            raise RuntimeException(
-                f'Unable to update {cls._name()}: No checksum found')
-
         # Lazy import package that are required only on install
         from hashlib import sha256
 
         # Verify checksum
         sha = sha256()
         sha.update(data)
-        if sha.hexdigest() != checksum:
+        if sha.hexdigest() != cls._expected_checksum(checksum_list, filename):
             raise RuntimeException(
                 f'Unable to update {cls._name()}: Invalid checksum')
 
+    @classmethod
+    def _expected_checksum(cls, checksum_list, filename):
+        """
+        Get the expected SHA256 checksum of a file.
+
+        Args:
+            checksum_list (bytes): List of checksum. Should have one
+                line per file formatted as "digest filename".
+            filename (str): Name of file to verify
+
+        Returns:
+            str: SHA-256 hexadecimal digest.
+
+        Raises:
+            accelpy.exceptions.RuntimeException: No checksum for this file.
+        """
+        # Get file checksum in checksum file
+        for line in checksum_list.decode().splitlines():
+            if filename in line:
+                return line.split(' ')[0].strip()
+
+        # Should never raise
+        raise RuntimeException(
+            f'Unable to update {cls._name()}: No checksum found')
+
     @classmethod
     def _gpg_verify(cls, data, signature):
         """
@@ -280,6 +875,21 @@ class Utility:
             raise RuntimeException(
                 f'Unable to update {cls._name()}: Invalid signature')
 
+    def _executable_file(self):
+        """
+        Get the executable path of the utility version used.
+
+        Returns:
+            str: Executable path.
+        """
+        if not self._exec_file:
+            self._exec_file = self._get_executable(self._version)
+            if self._version is None:
+                self._version = basename(dirname(self._exec_file))
+                if self._version_callback:
+                    self._version_callback(self._version)
+        return self._exec_file
+
     def _exec(self, *args, check=True, pipe_stdout=False, **run_kwargs):
         """
         Call utility.
@@ -295,10 +905,77 @@ class Utility:
         Returns:
             subprocess.CompletedProcess: Utility call result.
         """
-        return call([self._get_executable()] + list(args),
+        run_kwargs.setdefault('env', self._environ())
+        return call([self._executable_file()] + list(args),
                     cwd=self._config_dir, check=check, pipe_stdout=pipe_stdout,
                     **run_kwargs)
 
+    async def _exec_async(self, *args, check=True, pipe_stdout=False,
+                          **run_kwargs):
+        """
+        Call utility using asyncio.
+
+        Args:
+            args: Utility positional arguments.
+            run_kwargs: asyncio.create_subprocess_exec keyword arguments.
+            check (bool): If True, Check return code for error.
+            pipe_stdout (bool): If True, redirect stdout into a pipe, this allow
+                to hide outputs from sys.stdout and permit to retrieve stdout as
+                "result.stdout".
+
+        Returns:
+            subprocess.CompletedProcess: Utility call result.
+        """
+        executable = self._exec_file
+        if not executable:
+            # Lazy import: Only used with asyncio
+            from asyncio import get_event_loop
+
+            # May require to install the utility: Do not block the loop
+            executable = await get_event_loop().run_in_executor(
+                None, self._executable_file)
+
+        run_kwargs.setdefault('env', self._environ())
+        return await call_async(
+            [executable] + list(args), cwd=self._config_dir, check=check,
+            pipe_stdout=pipe_stdout, **run_kwargs)
+
+    @classmethod
+    def _environ(cls):
+        """
+        Utility environment variables.
+
+        Returns:
+            dict: Environment variables. None to inherit the current process
+                environment.
+        """
+
+    def get_sources(self):
+        """
+        Get sources used to generate the configuration.
+
+        The result can be passed to "create_configuration" of many utilities
+        that share the same provider, application type and user configuration
+        to avoid retrieving sources many times.
+
+        Returns:
+            list of tuple of str: name and path to source files.
+        """
+        return list(self._list_sources())
+
+    def sources_digest(self, sources):
+        """
+        Return a digest of sources and variables used to generate the
+        configuration.
+
+        Args:
+            sources: Sources as returned by "get_sources".
+
+        Returns:
+            str: SHA-256 hexadecimal digest.
+        """
+        return data_digest(sources, self._variables)
+
     def _list_sources(self):
         """
         List source files matching current configuration.
@@ -329,5 +1006,14 @@ class Utility:
         Returns:
             str: version
         """
-        return self._exec('version', pipe_stdout=True).stdout.strip().rsplit(
-                          maxsplit=1)[-1].lstrip('v')
+        return self._installed_version(self._executable_file())
+
+
+def _join_revalidations():
+    """
+    Wait for background last version updates, up to
+    "REVALIDATE_EXIT_TIMEOUT" seconds.
+    """
+    deadline = time() + REVALIDATE_EXIT_TIMEOUT
+    for thread in tuple(_REVALIDATIONS.values()):
+        thread.join(max(deadline - time(), 0.0))
@@ -1,25 +1,162 @@
 """Manage hosts life-cycle"""
-from os import chmod, fsdecode, makedirs, scandir, symlink
+from functools import partial
+from os import chmod, fsdecode, makedirs, scandir
 from os.path import isabs, isdir, isfile, join, realpath
 
 from accelpy._application import Application
-from accelpy._common import HOME_DIR, json_read, json_write, get_sources_dirs
+from accelpy._common import (
+    HOME_DIR, json_read, json_write, get_sources_dirs, symlink)
+from accelpy._registry import Registry
 from accelpy.exceptions import ConfigurationException
 
 CONFIG_DIR = join(HOME_DIR, 'hosts')
 
+# Configuration directories already reconciled with the registry
+_RECONCILED = set()
 
-def iter_hosts():
+
+def iter_hosts(provider=None, application=None, status=None, readonly=False):
     """
     Iter over existing hosts configurations.
 
+    Args:
+        provider (str): If specified, only returns hosts with this provider.
+        application (path-like object): If specified, only returns hosts with
+            this application definition file.
+        status (str): If specified, only returns hosts with this status
+            ("initialized", "applied" or "destroyed").
+        readonly (bool): If True, open hosts in read-only mode.
+
     Returns:
         generator of accelpy._manager.Host: Generator of Host
         configurations.
     """
-    for entry in scandir(CONFIG_DIR):
-        if entry.is_dir():
-            yield Host(name=entry.name)
+    for name in iter_host_names(provider, application, status):
+        yield Host(name=name, readonly=readonly)
+
+
+def iter_hosts_info(provider=None, application=None, status=None):
+    """
+    Iter over existing hosts information.
+
+    This only reads the hosts registry and is far lighter than "iter_hosts".
+
+    Args:
+        provider (str): If specified, only returns hosts with this provider.
+        application (path-like object): If specified, only returns hosts with
+            this application definition file.
+        status (str): If specified, only returns hosts with this status
+            ("initialized", "applied" or "destroyed").
+
+    Returns:
+        generator of accelpy._registry.HostInfo: Generator of Host
+        information.
+    """
+    if application is not None:
+        application = realpath(fsdecode(application))
+
+    yield from get_registry().select(
+        provider=provider, application=application, status=status)
+
+
+def iter_host_names(provider=None, application=None, status=None):
+    """
+    Iter over existing hosts configurations names.
+
+    Args:
+        provider (str): If specified, only returns hosts with this provider.
+        application (path-like object): If specified, only returns hosts with
+            this application definition file.
+        status (str): If specified, only returns hosts with this status
+            ("initialized", "applied" or "destroyed").
+
+    Returns:
+        generator of str: Generator of Host names.
+    """
+    for info in iter_hosts_info(provider, application, status):
+        yield info.name
+
+
+def remove_unused_utilities():
+    """
+    Remove installed Terraform and Packer versions not used by any host.
+
+    Returns:
+        dict: "terraform" and "packer" keys with lists of removed versions as
+            values.
+    """
+    # Lazy import: Only used on removal
+    from accelpy._packer import Packer
+    from accelpy._terraform import Terraform
+
+    used = dict(terraform=set(), packer=set())
+    try:
+        with scandir(CONFIG_DIR) as entries:
+            for entry in entries:
+                try:
+                    user_parameters = json_read(
+                        join(entry.path, 'user_parameters.json'))
+                except (OSError, ValueError):
+                    continue
+                for name, versions in used.items():
+                    versions.add(user_parameters.get(f'{name}_version'))
+    except FileNotFoundError:
+        pass
+
+    return {utility._name(): utility.remove_unused_versions(
+        used[utility._name()] - {None}) for utility in (Terraform, Packer)}
+
+
+def get_registry():
+    """
+    Get the hosts registry.
+
+    On first use in the process, the registry is reconciled with the
+    configurations directories: Directories missing from the registry (Created
+    by a previous accelpy version, or copied in the configuration directory)
+    are added to it, and records of removed directories are removed.
+
+    Returns:
+        accelpy._registry.Registry: Registry.
+    """
+    makedirs(CONFIG_DIR, exist_ok=True)
+    registry = Registry(join(CONFIG_DIR, 'registry.sqlite'))
+    if CONFIG_DIR in _RECONCILED:
+        return registry
+
+    known = registry.names()
+    records = dict()
+    with scandir(CONFIG_DIR) as entries:
+        for entry in entries:
+            if not entry.is_dir():
+                continue
+            elif entry.name in known:
+                known.discard(entry.name)
+                continue
+            try:
+                user_parameters = json_read(
+                    join(entry.path, 'user_parameters.json'))
+            except (OSError, ValueError):
+                continue
+
+            records[entry.name] = dict(
+                provider=user_parameters.get('provider'),
+                user_config=user_parameters.get('user_config'),
+                application=realpath(join(entry.path, 'application.yml')),
+                status='applied' if isfile(join(
+                    entry.path, 'terraform.tfstate')) else 'initialized')
+
+    if records:
+        # Never overwrite records updated concurrently
+        registry.update_many(records, overwrite=False)
+
+    # Remaining known names have no configuration directory anymore
+    for name in known:
+        if not isdir(join(CONFIG_DIR, name)):
+            registry.remove(name)
+
+    _RECONCILED.add(CONFIG_DIR)
+    return registry
 
 
 class Host:
@@ -42,10 +179,15 @@ class Host:
         keep_config (bool): If True, does not remove configuration on context
             manager exit or object deletion. A configuration is never removed if
             its Terraform managed infrastructure still exists
+        readonly (bool): If True, open an existing configuration for
+            inspection only. Operations that modify the host are not allowed
+            and nothing is done on context manager exit or object deletion.
+        _sources (dict): Configuration sources shared between many hosts.
+            Internal use only, see "create_many".
     """
     def __init__(self, name=None, application=None, provider=None,
                  user_config=None, destroy_on_exit=False,
-                 keep_config=True):
+                 keep_config=True, readonly=False, _sources=None):
 
         # Initialize some futures values
         self._ansible_config = None
@@ -57,6 +199,7 @@ class Host:
         # If true, Terraform infrastructure is destroyed on exit
         self._destroy_on_exit = destroy_on_exit
         self._keep_config = keep_config
+        self._readonly = readonly
 
         # Define name
         if not name:
@@ -66,7 +209,9 @@ class Host:
 
         # Define configuration directory en files
         self._config_dir = join(CONFIG_DIR, name)
-        user_parameters_json = join(self._config_dir, 'user_parameters.json')
+        self._user_parameters_json = user_parameters_json = join(
+            self._config_dir, 'user_parameters.json')
+        self._sources_json = join(self._config_dir, 'sources.json')
         self._output_json = join(self._config_dir, 'output.json')
         self._accelize_drm_conf_json = join(
             self._config_dir, 'accelize_drm_conf.json')
@@ -74,7 +219,7 @@ class Host:
 
         # Create a new configuration
         config_exists = isdir(self._config_dir)
-        if not config_exists and application:
+        if not config_exists and application and not readonly:
 
             # Ensure config is cleaned on creation error
             self._keep_config = False
@@ -88,6 +233,8 @@ class Host:
             # Get user parameters used
             self._provider = provider
             self._user_config = fsdecode(user_config or HOME_DIR)
+            self._image = None
+            self._utilities_versions = dict()
 
             # Save user parameters
             json_write(dict(provider=self._provider,
@@ -96,6 +243,9 @@ class Host:
 
             # Get application and add it as link with configuration
             self._application_yaml = realpath(fsdecode(application))
+            if _sources is None:
+                _sources = dict()
+            self._application_definition = _sources.get('application')
 
             # Check Accelize Requirements
             self._init_accelize_drm()
@@ -104,13 +254,18 @@ class Host:
             symlink(self._application_yaml, join(
                 self._config_dir, 'application.yml'))
 
-            # Initialize Terraform and Ansible configuration
-            self._terraform.create_configuration()
-            self._ansible.create_configuration()
-            self._packer.create_configuration()
+            # Initialize Terraform, Ansible and Packer configuration
+            _sources.setdefault('application', self._application)
+            self._configure(_sources)
 
             self._keep_config = keep_config
 
+            # Register the host
+            get_registry().update(
+                self._name, provider=self._provider,
+                application=self._application_yaml,
+                user_config=self._user_config, status='initialized')
+
         # Load an existing configuration
         elif config_exists:
 
@@ -122,6 +277,10 @@ class Host:
             user_parameters = json_read(user_parameters_json)
             self._provider = user_parameters['provider']
             self._user_config = user_parameters['user_config']
+            self._image = user_parameters.get('image')
+            self._utilities_versions = {
+                utility: user_parameters.get(f'{utility}_version')
+                for utility in ('terraform', 'packer')}
 
         # Unable to create configuration
         else:
@@ -129,6 +288,94 @@ class Host:
                 'Require at least an existing host name, or an '
                 'application to create a new host.')
 
+    @classmethod
+    def create_many(cls, count, application, provider=None, user_config=None,
+                    name=None, **kwargs):
+        """
+        Create many new hosts configurations from the same application.
+
+        Configurations sources are retrieved only once and shared between
+        all hosts.
+
+        Args:
+            count (int): Number of hosts to create.
+            application (path-like object): Path to application definition file.
+            provider (str): Provider name.
+            user_config (path-like object): User configuration directory.
+                Always also use the "~./accelize" directory.
+            name (str): Hosts names prefix. Hosts are named "<name>_<index>".
+                If not specified, random names are generated.
+            kwargs: Other "accelpy.Host" keyword arguments.
+
+        Returns:
+            list of accelpy.Host: Created hosts.
+        """
+        if name:
+            names = [f'{name}_{index}' for index in range(count)]
+            for host_name in names:
+                if isdir(join(CONFIG_DIR, host_name)):
+                    raise ConfigurationException(
+                        f'A configuration named "{host_name}" already exists.')
+        else:
+            names = [None] * count
+
+        sources = dict()
+        hosts = []
+        try:
+            for host_name in names:
+                hosts.append(cls(
+                    name=host_name, application=application, provider=provider,
+                    user_config=user_config, _sources=sources, **kwargs))
+
+        except Exception:
+            # Clean up already created configurations on error
+            for host in hosts:
+                host._keep_config = False
+                host._clean_up()
+            raise
+
+        return hosts
+
+    def _configure(self, shared_sources):
+        """
+        Generate Terraform, Ansible and Packer configurations if sources changed.
+
+        A digest of sources of each utility is saved in the configuration
+        directory to detect changes.
+
+        Args:
+            shared_sources (dict): Configuration sources shared between many
+                hosts.
+
+        Returns:
+            dict: See "update_configuration".
+        """
+        try:
+            digests = json_read(self._sources_json)
+        except (OSError, ValueError):
+            digests = dict()
+
+        updated = dict()
+        for utility in ('terraform', 'ansible', 'packer'):
+            handler = getattr(self, f'_{utility}')
+            try:
+                sources = shared_sources[utility]
+            except KeyError:
+                sources = shared_sources[utility] = handler.get_sources()
+
+            digest = handler.sources_digest(sources)
+            updated[utility] = digests.get(utility) != digest
+            if updated[utility]:
+                handler.create_configuration(sources)
+                digests[utility] = digest
+
+        init_digest = self._terraform.configuration_digest()
+        updated['terraform_init'] = digests.get('terraform_init') != init_digest
+        digests['terraform_init'] = init_digest
+
+        json_write(digests, self._sources_json)
+        return updated
+
     def _init_accelize_drm(self):
         """Initialize Accelize DRM requirements"""
 
@@ -150,7 +397,7 @@ class Host:
             cred_path = join(src, 'cred.json')
 
             if isfile(cred_path):
-                symlink(cred_path, self._accelize_drm_cred_json)
+                symlink(cred_path, self._accelize_drm_cred_json, replace=True)
                 break
             else:
                 raise ConfigurationException(
@@ -182,36 +429,326 @@ class Host:
         Returns:
             str: Show planned infrastructure detail.
         """
+        self._check_writable()
         return self._terraform.plan()
 
-    def apply(self, quiet=False):
+    async def plan_async(self):
+        """
+        Plan the host infrastructure creation and show details using asyncio.
+
+        Returns:
+            str: Show planned infrastructure detail.
+        """
+        self._check_writable()
+        return await self._terraform.plan_async()
+
+    def apply(self, quiet=False, line_callback=None, event_callback=None):
         """
         Create the host infrastructure.
 
+        The output is also appended to the "apply.log" file in the
+        configuration directory, and resources operations durations are saved
+        in its "durations.json" file.
+
         Args:
             quiet (bool): If True, hide outputs.
+            line_callback (callable): Function called with each output line
+                (Without line ending) as argument.
+            event_callback (callable): Function called with each Terraform
+                progress event ("accelpy._terraform.TerraformEvent").
         """
+        self._check_writable()
+
         # Reset cached output
         self._terraform_output = None
 
         # Apply
-        self._terraform.apply(quiet=quiet)
+        self._terraform.apply(
+            quiet=quiet, event_callback=event_callback,
+            **self._stream_kwargs('apply', line_callback))
+        self._applied()
 
-    def build(self, update_application=False, quiet=False):
+    async def apply_async(self, quiet=False, line_callback=None,
+                          event_callback=None):
+        """
+        Create the host infrastructure using asyncio.
+
+        If cancelled, the running Terraform process is terminated.
+        The output is also appended to the "apply.log" file in the
+        configuration directory, and resources operations durations are saved
+        in its "durations.json" file.
+
+        Args:
+            quiet (bool): If True, hide outputs.
+            line_callback (callable): Function called with each output line
+                (Without line ending) as argument.
+            event_callback (callable): Function called with each Terraform
+                progress event ("accelpy._terraform.TerraformEvent").
+        """
+        self._check_writable()
+        self._terraform_output = None
+        await self._terraform.apply_async(
+            quiet=quiet, event_callback=event_callback,
+            **self._stream_kwargs('apply', line_callback))
+        self._applied()
+
+    def build(self, update_application=False, quiet=False,
+              line_callback=None, cache=True):
         """
         Create a virtual machine image of the configured host.
 
+        The output is also appended to the "build.log" file in the
+        configuration directory.
+
         Args:
             update_application (bool): If applicable, update the application
                 definition Yaml file to use this image as host base for the
                 selected provider. Warning, this will reset any yaml file
                 formatting and comments.
             quiet (bool): If True, hide outputs.
+            line_callback (callable): Function called with each output line
+                (Without line ending) as argument.
+            cache (bool): If True, return the image of a previous build with
+                the same template, playbook, roles and variables instead of
+                building it again. The built image is added to the cache.
+
+        Returns:
+            str: Image ID or path (Depending provider)
+        """
+        self._check_writable()
+        return self._built(self._packer.build(
+            quiet=quiet, fingerprint=self._image_fingerprint(cache),
+            **self._stream_kwargs('build', line_callback)), update_application)
+
+    async def build_async(self, update_application=False, quiet=False,
+                          line_callback=None, cache=True):
+        """
+        Create a virtual machine image of the configured host using asyncio.
+
+        If cancelled, the running Packer process is terminated.
+        The output is also appended to the "build.log" file in the
+        configuration directory.
+
+        Args:
+            update_application (bool): If applicable, update the application
+                definition Yaml file to use this image as host base for the
+                selected provider. Warning, this will reset any yaml file
+                formatting and comments.
+            quiet (bool): If True, hide outputs.
+            line_callback (callable): Function called with each output line
+                (Without line ending) as argument.
+            cache (bool): If True, return the image of a previous build with
+                the same template, playbook, roles and variables instead of
+                building it again. The built image is added to the cache.
+
+        Returns:
+            str: Image ID or path (Depending provider)
+        """
+        self._check_writable()
+        return self._built(await self._packer.build_async(
+            quiet=quiet, fingerprint=self._image_fingerprint(cache),
+            **self._stream_kwargs('build', line_callback)), update_application)
+
+    def use_image(self, image):
+        """
+        Use an existing virtual machine image as host base.
+
+        The host is then not provisioned with Ansible on "apply".
+
+        Args:
+            image (str): Image ID or path (Depending provider), as returned by
+                "build".
+        """
+        self._check_writable()
+        self._image = image
+        user_parameters = json_read(self._user_parameters_json)
+        user_parameters['image'] = image
+        json_write(user_parameters, self._user_parameters_json)
+        self._terraform.update_variables(package_vm_image=image)
+
+    def upgrade_utilities(self, _remove_unused=True):
+        """
+        Use the current versions of Terraform and Packer (Last released
+        versions, or versions pinned in settings).
+
+        Each host keeps using the Terraform and Packer versions it was first
+        used with until upgraded. Installed versions that are not used anymore
+        by any host are removed.
+
+        Args:
+            _remove_unused (bool): If True, remove unused versions.
+                Internal use only.
+
+        Returns:
+            dict: "terraform" and "packer" keys with (previous version,
+                new version) tuples as values. Previous version is None if the
+                utility was not used yet.
+        """
+        self._check_writable()
+
+        # Lazy import: Only used on upgrade
+        from accelpy._packer import Packer
+        from accelpy._terraform import Terraform
+
+        upgraded = dict()
+        for utility in (Terraform, Packer):
+            name = utility._name()
+            upgraded[name] = (self._utilities_versions.get(name),
+                              utility.current_version())
+            self._save_utility_version(name, upgraded[name][1])
+
+        self._terraform_config = None
+        self._packer_config = None
+        if _remove_unused:
+            remove_unused_utilities()
+        return upgraded
+
+    def mirror_providers(self):
+        """
+        Download Terraform providers required by this host configuration to the
+        local filesystem mirror shared by all hosts. Next initializations then
+        resolve these providers from the mirror without network access.
+
+        Returns:
+            list of str: Providers available in the mirror.
+        """
+        return self._terraform.mirror_providers()
+
+    def update_configuration(self, _sources=None):
+        """
+        Update the configuration from its sources: application definition,
+        Terraform, Ansible and Packer configuration files, from this package and
+        user configuration directories.
+
+        Only utilities configurations with changed sources are regenerated.
+
+        Args:
+            _sources (dict): Configuration sources shared between many hosts.
+                Internal use only.
+
+        Returns:
+            dict: "terraform", "ansible" and "packer" keys with True as value if
+                the utility configuration was updated, and "terraform_init"
+                key with True as value if Terraform requires to be initialized
+                again.
+        """
+        self._check_writable()
+
+        # Reload application definition and utilities configurations
+        self._application_definition = None
+        self._ansible_config = None
+        self._packer_config = None
+        self._terraform_config = None
+
+        if _sources is None:
+            _sources = dict()
+        self._application_definition = _sources.get('application')
+        self._init_accelize_drm()
+        _sources.setdefault('application', self._application)
+
+        return self._configure(_sources)
+
+    def destroy(self, quiet=False, delete=None, line_callback=None,
+                event_callback=None):
+        """
+        Destroy the host infrastructure.
+
+        The output is also appended to the "destroy.log" file in the
+        configuration directory, and resources operations durations are saved
+        in its "durations.json" file.
+
+        Args:
+            quiet (bool): If True, hide outputs.
+            delete (bool): If True, also delete the configuration on context
+                manager exit or object deletion.
+            line_callback (callable): Function called with each output line
+                (Without line ending) as argument.
+            event_callback (callable): Function called with each Terraform
+                progress event ("accelpy._terraform.TerraformEvent").
+        """
+        self._check_writable()
+        if delete is not None:
+            self._keep_config = not delete
+        self._terraform.destroy(
+            quiet=quiet, event_callback=event_callback,
+            **self._stream_kwargs('destroy', line_callback))
+        self._destroyed()
+
+    async def destroy_async(self, quiet=False, delete=None,
+                            line_callback=None, event_callback=None):
+        """
+        Destroy the host infrastructure using asyncio.
+
+        If cancelled, the running Terraform process is terminated.
+        The output is also appended to the "destroy.log" file in the
+        configuration directory, and resources operations durations are saved
+        in its "durations.json" file.
+
+        Args:
+            quiet (bool): If True, hide outputs.
+            delete (bool): If True, also delete the configuration on context
+                manager exit or object deletion.
+            line_callback (callable): Function called with each output line
+                (Without line ending) as argument.
+            event_callback (callable): Function called with each Terraform
+                progress event ("accelpy._terraform.TerraformEvent").
+        """
+        self._check_writable()
+        if delete is not None:
+            self._keep_config = not delete
+        await self._terraform.destroy_async(
+            quiet=quiet, event_callback=event_callback,
+            **self._stream_kwargs('destroy', line_callback))
+        self._destroyed()
+
+    def _stream_kwargs(self, operation, line_callback):
+        """
+        Output streaming keyword arguments for an operation.
+
+        Args:
+            operation (str): Operation name.
+            line_callback (callable): Function called with each output line.
+
+        Returns:
+            dict: "accelpy._common.call" keyword arguments.
+        """
+        return dict(line_callback=line_callback,
+                    log_file=join(self._config_dir, f'{operation}.log'))
+
+    def _applied(self):
+        """
+        Update host after infrastructure creation.
+        """
+        self._terraform_output = self._terraform.output
+        get_registry().update(
+            self._name, status='applied', outputs=self._terraform_output)
+
+    def _image_fingerprint(self, cache):
+        """
+        Fingerprint of the image built from this configuration.
+
+        Args:
+            cache (bool): If False, do not compute the fingerprint.
+
+        Returns:
+            str: Fingerprint. None if "cache" is False.
+        """
+        if cache:
+            return self._packer.fingerprint(self._ansible.digest())
+        return None
+
+    def _built(self, manifest, update_application):
+        """
+        Update host after image creation.
+
+        Args:
+            manifest (dict): Packer build manifest.
+            update_application (bool): If True, update the application
+                definition Yaml file to use this image.
 
         Returns:
             str: Image ID or path (Depending provider)
         """
-        manifest = self._packer.build(quiet=quiet)
         image = self._packer.get_artifact(manifest)
 
         if update_application and self._application_yaml:
@@ -227,19 +764,43 @@ class Host:
 
         return image
 
-    def destroy(self, quiet=False, delete=None):
+    def _destroyed(self):
         """
-        Destroy the host infrastructure.
-
-        Args:
-            quiet (bool): If True, hide outputs.
-            delete (bool): If True, also delete the configuration on context
-                manager exit or object deletion.
+        Update host after infrastructure destruction.
         """
-        if delete is not None:
-            self._keep_config = not delete
-        self._terraform.destroy(quiet=quiet)
         self._terraform_output = None
+        get_registry().update(self._name, status='destroyed', outputs={})
+
+    def info(self):
+        """
+        Host information.
+
+        Returns:
+            dict: Host information: "name", "provider", "application"
+                (Definition file path), "user_config", "config_dir", "status",
+                "ssh_private_key", "ssh_user", "public_ip", "private_ip" (None
+                if not applied) and "outputs" (All Terraform outputs).
+        """
+        self._terraform_output = outputs = self._terraform_state.output
+
+        record = get_registry().get(self._name)
+        if record:
+            status = record.status
+        else:
+            status = ('applied' if self._terraform_state.state_list() else
+                      'initialized')
+
+        ssh_private_key = outputs.get('host_ssh_private_key')
+        return dict(
+            name=self._name, provider=self._provider,
+            application=self._application_yaml, user_config=self._user_config,
+            config_dir=self._config_dir, status=status,
+            ssh_private_key=self._ssh_private_key_path(ssh_private_key)
+            if ssh_private_key else None,
+            ssh_user=outputs.get('remote_user'),
+            public_ip=outputs.get('host_public_ip'),
+            private_ip=outputs.get('host_private_ip'),
+            outputs=outputs)
 
     @property
     def ssh_private_key(self):
@@ -249,10 +810,8 @@ class Host:
         Returns:
             str: Path ro Private key to use to connect to host using SSH.
         """
-        path = self._get_terraform_output('host_ssh_private_key')
-        return (path if isabs(path) else
-                # Terraform returns relative path as "./file"
-                join(self._config_dir, path.lstrip('./')))
+        return self._ssh_private_key_path(
+            self._get_terraform_output('host_ssh_private_key'))
 
     @property
     def ssh_user(self):
@@ -274,6 +833,16 @@ class Host:
         """
         return self._name
 
+    @property
+    def readonly(self):
+        """
+        True if the host was opened in read-only mode.
+
+        Returns:
+            bool: Read-only mode.
+        """
+        return self._readonly
+
     @property
     def private_ip(self):
         """
@@ -307,6 +876,31 @@ class Host:
         """
         return self._application.get(section, key, env=self._provider)
 
+    def _ssh_private_key_path(self, path):
+        """
+        Return absolute SSH private key path.
+
+        Args:
+            path (str): Path from Terraform output.
+
+        Returns:
+            str: Absolute path.
+        """
+        return (path if isabs(path) else
+                # Terraform returns relative path as "./file"
+                join(self._config_dir, path.lstrip('./')))
+
+    def _check_writable(self):
+        """
+        Check if the host can be modified.
+
+        Raises:
+            accelpy.exceptions.ConfigurationException: Read-only host.
+        """
+        if self._readonly:
+            raise ConfigurationException(
+                f'The host "{self._name}" is opened in read-only mode.')
+
     def _get_terraform_output(self, key):
         """
         Get an output from Terraform state.
@@ -319,7 +913,7 @@ class Host:
         """
         if not self._terraform_output:
             # Load and cache Terraform outputs
-            self._terraform_output = self._terraform.output
+            self._terraform_output = self._terraform_state.output
 
         try:
             return self._terraform_output[key]
@@ -382,7 +976,8 @@ class Host:
 
             self._packer_config = Packer(
                 provider=self._provider, config_dir=self._config_dir,
-                user_config=self._user_config, variables=variables)
+                user_config=self._user_config, variables=variables,
+                **self._utility_kwargs('packer'))
 
         return self._packer_config
 
@@ -401,18 +996,74 @@ class Host:
             variables = dict(
                 firewall_rules=self._application['firewall_rules'],
                 fpga_count=self._app('fpga', 'count'),
-                package_vm_image=self._app('package', 'name')
-                if self._app('package', 'type') == 'vm_image' else '',
+                package_vm_image=self._image or (
+                    self._app('package', 'name')
+                    if self._app('package', 'type') == 'vm_image' else ''),
                 host_name=self._name,
                 host_provider=self._provider
             )
 
             self._terraform_config = Terraform(
                 provider=self._provider, config_dir=self._config_dir,
-                user_config=self._user_config, variables=variables)
+                user_config=self._user_config, variables=variables,
+                **self._utility_kwargs('terraform'))
 
         return self._terraform_config
 
+    @property
+    def _terraform_state(self):
+        """
+        Terraform utility to use to only access the Terraform state.
+
+        Unlike "_terraform", this does not require to load the application
+        definition.
+
+        Returns:
+            project._terraform.Terraform: Terraform
+        """
+        if self._terraform_config:
+            return self._terraform_config
+
+        # Lazy import: May not be used all time
+        from accelpy._terraform import Terraform
+
+        return Terraform(
+            provider=self._provider, config_dir=self._config_dir,
+            user_config=self._user_config, **self._utility_kwargs('terraform'))
+
+    def _utility_kwargs(self, name):
+        """
+        Utility version keyword arguments.
+
+        The utility version used is saved on first use, and is used until the
+        host is upgraded.
+
+        Args:
+            name (str): Utility name.
+
+        Returns:
+            dict: accelpy._hashicorp.Utility keyword arguments.
+        """
+        kwargs = dict(version=self._utilities_versions.get(name))
+        if not self._readonly:
+            kwargs['version_callback'] = partial(
+                self._save_utility_version, name)
+        return kwargs
+
+    def _save_utility_version(self, name, version):
+        """
+        Save the version of a utility used by this host.
+
+        Args:
+            name (str): Utility name.
+            version (str): Version. None to use the current version on next
+                use.
+        """
+        self._utilities_versions[name] = version
+        user_parameters = json_read(self._user_parameters_json)
+        user_parameters[f'{name}_version'] = version
+        json_write(user_parameters, self._user_parameters_json)
+
     @property
     def _application(self):
         """
@@ -431,17 +1082,20 @@ class Host:
         Clean up configuration directory if there is no remaining resource
         within the Terraform state.
         """
-        if self._config_dir is not None and isdir(self._config_dir):
+        if (not self._readonly and self._config_dir is not None and
+                isdir(self._config_dir)):
             # Destroy managed infrastructure if exists
-            if self._destroy_on_exit and self._terraform.state_list():
-                self._terraform.destroy(quiet=True)
+            if self._destroy_on_exit and self._terraform_state.state_list():
+                self.destroy(quiet=True)
 
             # Check if there is some remaining resources in state file
             # If it is the case, do not clean up configuration to allow
             # to reuse it
-            if not self._terraform.state_list() and not self._keep_config:
+            if (not self._keep_config and
+                    not self._terraform_state.state_list()):
 
                 # Lazy import: Only used on remove
                 from shutil import rmtree
 
                 rmtree(self._config_dir)
+                get_registry().remove(self._name)
@@ -1,10 +1,16 @@
 # coding=utf-8
 """Terraform configuration"""
-from os.path import join
+from os import getpid, makedirs, replace
+from os.path import join, isfile
+from threading import Lock, get_ident
+from time import time
 
-from accelpy._common import recursive_update, json_read, json_write
+from accelpy._common import file_lock, recursive_update, json_read, json_write
 from accelpy._hashicorp import Utility
 
+# Images cache index lock
+_IMAGES_LOCK = Lock()
+
 
 class Packer(Utility):
     """Packer configuration.
@@ -34,19 +40,37 @@ class Packer(Utility):
         Utility.__init__(self, *args, **kwargs)
         self._template = join(self._config_dir, 'template.json')
 
-    def create_configuration(self):
+    def get_sources(self):
+        """
+        Get sources used to generate the configuration.
+
+        The result can be passed to "create_configuration" of many utilities
+        that share the same provider and user configuration to avoid retrieving
+        sources many times.
+
+        Returns:
+            dict: Sources templates content per name.
+        """
+        return {name: json_read(src_path)
+                for name, src_path in self._list_sources()}
+
+    def create_configuration(self, sources=None):
         """
         Generate packer configuration file.
+
+        Args:
+            sources (dict): Sources as returned by "get_sources". If not
+                specified, sources are retrieved.
         """
         # Lazy import: Only used on new configuration creation
         from accelpy._ansible import Ansible
 
         # Get template from this package and user directories
-        self._variables['ansible'] = Ansible.playbook_exec()
-        sources = dict(vars=dict(variables=self._variables))
+        if sources is None:
+            sources = self.get_sources()
 
-        for name, src_path in self._list_sources():
-            sources[name] = json_read(src_path)
+        self._variables['ansible'] = Ansible.playbook_exec()
+        sources = dict(sources, vars=dict(variables=self._variables))
 
         # Generate the Packer template file
         template = dict()
@@ -55,20 +79,172 @@ class Packer(Utility):
 
         json_write(template, self._template)
 
-    def build(self, quiet=False):
+    def build(self, quiet=False, line_callback=None, log_file=None,
+              fingerprint=None):
         """
         Build image.
 
         Args:
             quiet (bool): If True, hide outputs.
+            line_callback (callable): Function called with each output line.
+                If specified, the output is streamed (See
+                "accelpy._common.call").
+            log_file (path-like object): Path to a file where append the
+                output. If specified, the output is streamed.
+            fingerprint (str): Image fingerprint, as returned by "fingerprint".
+                If specified, the manifest of a previous build with the same
+                fingerprint is returned without building, and the manifest of
+                the new build is added to the images cache.
 
         Returns:
             dict: Packer manifest (Last build only).
         """
-        # Build
-        self._exec('build', '-color=false', self._template, pipe_stdout=quiet)
+        manifest = self.get_cached_image(fingerprint)
+        if manifest is None:
+            self._exec('build', '-color=false', self._template,
+                       pipe_stdout=quiet, line_callback=line_callback,
+                       log_file=log_file)
+            manifest = self._built(fingerprint)
+        return manifest
+
+    async def build_async(self, quiet=False, line_callback=None,
+                          log_file=None, fingerprint=None):
+        """
+        Build image using asyncio.
 
-        # Read manifest file
+        Args:
+            quiet (bool): If True, hide outputs.
+            line_callback (callable): Function called with each output line.
+                If specified, the output is streamed (See
+                "accelpy._common.call").
+            log_file (path-like object): Path to a file where append the
+                output. If specified, the output is streamed.
+            fingerprint (str): Image fingerprint, as returned by "fingerprint".
+                If specified, the manifest of a previous build with the same
+                fingerprint is returned without building, and the manifest of
+                the new build is added to the images cache.
+
+        Returns:
+            dict: Packer manifest (Last build only).
+        """
+        manifest = self.get_cached_image(fingerprint)
+        if manifest is None:
+            await self._exec_async(
+                'build', '-color=false', self._template, pipe_stdout=quiet,
+                line_callback=line_callback, log_file=log_file)
+            manifest = self._built(fingerprint)
+        return manifest
+
+    def fingerprint(self, *digests):
+        """
+        Return the fingerprint of the image that the template would build.
+
+        The "image_name" variable is excluded since it is specific to each
+        configuration.
+
+        Args:
+            digests (str): Digests of other image sources
+                (Like the Ansible provisioning digest).
+
+        Returns:
+            str: SHA-256 hexadecimal fingerprint.
+        """
+        # Lazy import: Only used on image build
+        from hashlib import sha256
+        from json import dumps
+
+        template = json_read(self._template)
+        template.get('variables', dict()).pop('image_name', None)
+
+        hasher = sha256(dumps(template, sort_keys=True).encode())
+        for digest in digests:
+            hasher.update(digest.encode())
+        return hasher.hexdigest()
+
+    @classmethod
+    def get_cached_image(cls, fingerprint):
+        """
+        Get the manifest of a previously built image from the images cache.
+
+        Args:
+            fingerprint (str): Image fingerprint.
+
+        Returns:
+            dict: Packer manifest. None if no image cached.
+        """
+        if not fingerprint:
+            return None
+
+        try:
+            manifest = cls._read_images()[fingerprint]['manifest']
+        except KeyError:
+            return None
+
+        if manifest['builder_type'] in ('file',) and not isfile(
+                cls.get_artifact(manifest)):
+            # Image file was removed
+            return None
+        return manifest
+
+    @classmethod
+    def _read_images(cls):
+        """
+        Read the images cache index.
+
+        Returns:
+            dict: Images per fingerprint.
+        """
+        try:
+            return json_read(cls._images_index())
+        except (OSError, ValueError):
+            return dict()
+
+    @classmethod
+    def _images_index(cls):
+        """
+        Images cache index path.
+
+        Returns:
+            str: path.
+        """
+        return join(cls._install_dir(), 'images.json')
+
+    def _built(self, fingerprint):
+        """
+        Read the manifest of the last build and add it to the images cache.
+
+        Args:
+            fingerprint (str): Image fingerprint.
+
+        Returns:
+            dict: Packer manifest (Last build only).
+        """
+        manifest = self._read_manifest()
+        if not fingerprint:
+            return manifest
+
+        path = self._images_index()
+        makedirs(self._install_dir(), exist_ok=True)
+        with _IMAGES_LOCK, file_lock(f'{path}.lock'):
+            images = self._read_images()
+            images[fingerprint] = dict(
+                manifest=manifest, artifact=self.get_artifact(manifest),
+                created=time())
+
+            # Written atomically, since may be read concurrently
+            tmp_path = f'{path}.{getpid()}.{get_ident()}'
+            json_write(images, tmp_path)
+            replace(tmp_path, path)
+
+        return manifest
+
+    def _read_manifest(self):
+        """
+        Read the Packer manifest of the last build.
+
+        Returns:
+            dict: Packer manifest (Last build only).
+        """
         manifest = json_read(join(self._config_dir, 'packer-manifest.json'))
         last_run_uuid = manifest['last_run_uuid']
         for build in manifest['builds']:
@@ -0,0 +1,330 @@
+# coding=utf-8
+"""Manage warm pools of hosts"""
+from contextlib import contextmanager
+from os import fsdecode
+from os.path import join, realpath
+from threading import Event, Lock, Thread
+from time import monotonic, sleep
+
+from accelpy._common import file_lock
+from accelpy._fleet import Fleet
+from accelpy._host import Host, get_registry
+from accelpy.exceptions import (
+    AccelizeException, ConfigurationException, RuntimeException)
+
+#: Default delay between two background refills of a pool
+REFILL_INTERVAL = 60.0
+
+
+class Pool:
+    """Warm pool of hosts.
+
+    A pool keeps a number of applied hosts of the same application ready to be
+    claimed. Claiming a host from a pool is atomic, even between processes,
+    and takes only a registry update instead of a full "apply".
+
+    The pool definition is saved in the hosts registry, so an existing pool
+    can be opened only by its name.
+
+    Args:
+        name (str): Name of the pool. Hosts of the pool are named
+            "<name>_<random>".
+        application (path-like object): Path to application definition file.
+            Required only to create a new pool.
+        provider (str): Provider name.
+        user_config (path-like object): User configuration directory.
+            Always also use the "~./accelize" directory.
+        size (int): Number of ready hosts to keep in the pool.
+            Default to 1 for a new pool.
+        workers (int): Maximum number of hosts applied concurrently.
+    """
+
+    def __init__(self, name, application=None, provider=None,
+                 user_config=None, size=None, workers=None):
+        self._name = name
+        self._workers = workers
+        self._registry = get_registry()
+        self._fill_lock = Lock()
+        self._wake_up = Event()
+        self._stopping = Event()
+        self._thread = None
+        self._last_results = dict()
+
+        values = dict()
+        if application:
+            # Create or update the pool definition
+            values.update(
+                application=realpath(fsdecode(application)),
+                provider=provider, user_config=fsdecode(
+                    user_config) if user_config else None)
+            if size is None and self._registry.get_pool(name) is None:
+                size = 1
+
+        if size is not None:
+            values['size'] = size
+
+        if values:
+            self._registry.update_pool(name, **values)
+
+        self._definition = self._registry.get_pool(name)
+        if self._definition is None:
+            raise ConfigurationException(
+                f'No pool named "{name}". An application is required to '
+                'create a new pool.')
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+    def __str__(self):
+        return f'<{self.__class__.__module__}.{self.__class__.__name__} ' \
+            f'(name={self._name})>'
+
+    def __repr__(self):
+        return self.__str__()
+
+    @property
+    def name(self):
+        """
+        Name of the pool.
+
+        Returns:
+            str: Name.
+        """
+        return self._name
+
+    @property
+    def size(self):
+        """
+        Number of ready hosts to keep in the pool.
+
+        Returns:
+            int: Size.
+        """
+        return self._definition['size']
+
+    @property
+    def last_results(self):
+        """
+        Results of the last fill. Useful to check background refills errors.
+
+        Returns:
+            dict: Per host results. See "accelpy.Fleet.summary".
+        """
+        return self._last_results
+
+    def status(self):
+        """
+        Return pool hosts counts.
+
+        Returns:
+            dict: Number of "ready" (Applied and not claimed), "pending"
+                (Not applied yet) and "claimed" hosts, and pool "size".
+        """
+        status = dict(size=self.size, ready=0, pending=0, claimed=0)
+        for record in self._registry.select(pool=self._name):
+            if record.claimed:
+                status['claimed'] += 1
+            elif record.status == 'applied':
+                status['ready'] += 1
+            else:
+                status['pending'] += 1
+        return status
+
+    def fill(self):
+        """
+        Create and apply hosts until the pool contains "size" ready hosts.
+
+        Hosts that fail to apply are destroyed and deleted.
+
+        Returns:
+            dict: Per host results of created hosts. See
+                "accelpy.Fleet.summary".
+        """
+        with self._lock():
+            ready = 0
+            names = []
+            for record in self._registry.select(pool=self._name):
+                if record.claimed:
+                    continue
+                elif record.status == 'applied':
+                    ready += 1
+                else:
+                    # Retry hosts not applied yet
+                    names.append(record.name)
+
+            results = dict()
+            sources = dict()
+            for _ in range(self.size - ready - len(names)):
+                try:
+                    names.append(self._create_host(sources))
+                except (AccelizeException, OSError) as exception:
+                    results[f'{self._name}_*'] = dict(
+                        result=None, error=exception)
+                    break
+
+            if names:
+                results.update(Fleet(names=names, workers=self._workers).apply())
+
+            # Remove failed hosts
+            failed = [name for name in names if results[name]['error']]
+            if failed:
+                Fleet(names=failed, workers=self._workers).destroy(delete=True)
+
+            self._last_results = results
+            return results
+
+    def claim(self, timeout=None):
+        """
+        Claim a ready host from the pool.
+
+        The host is removed from pool ready hosts until released. If a
+        background refill is running, the pool is refilled.
+
+        Args:
+            timeout (float): If specified, wait up to this number of seconds
+                for a host to become ready.
+
+        Returns:
+            accelpy.Host: Claimed host.
+
+        Raises:
+            accelpy.exceptions.RuntimeException: No host available.
+        """
+        deadline = monotonic() + (timeout or 0.0)
+        while True:
+            record = self._registry.claim(self._name)
+            self._wake_up.set()
+            if record is not None:
+                return Host(name=record.name)
+
+            remaining = deadline - monotonic()
+            if remaining <= 0:
+                raise RuntimeException(
+                    f'No host available in pool "{self._name}".')
+            sleep(min(remaining, 1.0))
+
+    def release(self, host, destroy=False):
+        """
+        Return a claimed host to the pool.
+
+        Args:
+            host (accelpy.Host or str): Host or host name.
+            destroy (bool): If True, destroy and delete the host instead of
+                returning it to the pool ready hosts (For instance, if its state
+                can not be reused).
+        """
+        name = host if isinstance(host, str) else host.name
+        record = self._registry.get(name)
+        if record is None or record.pool != self._name:
+            raise ConfigurationException(
+                f'Host "{name}" does not belong to pool "{self._name}".')
+
+        if destroy:
+            with Host(name=name) as pool_host:
+                pool_host.destroy(quiet=True, delete=True)
+            self._wake_up.set()
+        else:
+            self._registry.update(name, claimed=None)
+
+    def drain(self):
+        """
+        Destroy and delete all hosts not claimed and remove the pool definition.
+
+        Claimed hosts are detached from the pool and kept.
+
+        Returns:
+            dict: Per host results. See "accelpy.Fleet.summary".
+        """
+        self.stop()
+        with self._lock():
+            names = [record.name for record in self._registry.select(
+                pool=self._name) if not record.claimed]
+            results = Fleet(names=names, workers=self._workers).destroy(
+                delete=True)
+            self._registry.remove_pool(self._name)
+            return results
+
+    def start(self, interval=REFILL_INTERVAL):
+        """
+        Start refilling the pool in a background thread.
+
+        The pool is refilled immediately, then every "interval" seconds and
+        after each claim.
+
+        Args:
+            interval (float): Delay between two refills in seconds.
+        """
+        if self._thread is not None:
+            return
+        self._stopping.clear()
+        self._thread = Thread(
+            target=self._refill, args=(interval,), daemon=True,
+            name=f'accelpy_pool_{self._name}')
+        self._thread.start()
+
+    def stop(self):
+        """
+        Stop refilling the pool in background. Wait for the running refill
+        to complete.
+        """
+        if self._thread is None:
+            return
+        self._stopping.set()
+        self._wake_up.set()
+        self._thread.join()
+        self._thread = None
+
+    def _refill(self, interval):
+        """
+        Refill the pool until stopped.
+
+        Args:
+            interval (float): Delay between two refills in seconds.
+        """
+        while not self._stopping.is_set():
+            self._wake_up.clear()
+            try:
+                self.fill()
+
+            # Keep refilling, the error is reported in last results
+            except Exception as exception:
+                self._last_results = {
+                    f'{self._name}_*': dict(result=None, error=exception)}
+            self._wake_up.wait(interval)
+
+    @contextmanager
+    def _lock(self):
+        """
+        Lock the pool hosts creation and removal, between threads and
+        processes.
+        """
+        # Lazy import: Read at runtime to use the current value
+        from accelpy._host import CONFIG_DIR
+
+        with self._fill_lock, file_lock(
+                join(CONFIG_DIR, f'.pool_{self._name}.lock')):
+            yield
+
+    def _create_host(self, sources):
+        """
+        Create a new host configuration in the pool.
+
+        Args:
+            sources (dict): Configuration sources shared between hosts.
+
+        Returns:
+            str: Host name.
+        """
+        # Lazy import: Only used when creating hosts
+        from uuid import uuid4
+
+        name = f'{self._name}_{uuid4().hex[:8]}'
+        Host(name=name, application=self._definition['application'],
+             provider=self._definition['provider'],
+             user_config=self._definition['user_config'], _sources=sources)
+        self._registry.update(name, pool=self._name)
+        return name
@@ -0,0 +1,373 @@
+# coding=utf-8
+"""Hosts registry"""
+from contextlib import contextmanager
+from json import dumps, loads
+from os import fsdecode
+from sqlite3 import connect
+from time import time
+
+#: Registry database schema version
+SCHEMA_VERSION = 2
+
+#: Registry columns, in database order
+COLUMNS = ('name', 'provider', 'application', 'user_config', 'status',
+           'outputs', 'created', 'updated', 'pool', 'claimed')
+
+_SELECT = ', '.join(COLUMNS)
+
+#: Columns that can be used to filter hosts
+FILTERS = ('provider', 'application', 'status', 'pool')
+
+#: Pools columns, in database order
+POOL_COLUMNS = ('name', 'application', 'provider', 'user_config', 'size')
+
+
+class Registry:
+    """
+    Hosts registry.
+
+    Index of hosts configurations stored in a SQLite database. This allows to
+    list and filter hosts without reading all configurations directories.
+
+    Args:
+        path (path-like object): Registry database path.
+    """
+
+    def __init__(self, path):
+        self._path = fsdecode(path)
+        with self._connect() as connection:
+            self._init_schema(connection)
+
+    def get(self, name):
+        """
+        Get a host record.
+
+        Args:
+            name (str): Host name.
+
+        Returns:
+            accelpy._registry.HostInfo: Host record. None if host not in
+                registry.
+        """
+        with self._connect() as connection:
+            row = connection.execute(
+                f'SELECT {_SELECT} FROM hosts WHERE name = ?',
+                (name,)).fetchone()
+        return self._record(row) if row else None
+
+    def names(self):
+        """
+        Get names of all hosts in the registry.
+
+        Returns:
+            set of str: Host names.
+        """
+        with self._connect() as connection:
+            return {row[0] for row in connection.execute(
+                'SELECT name FROM hosts')}
+
+    def select(self, **filters):
+        """
+        Select hosts records.
+
+        Args:
+            filters: Values to filter hosts with. Filters with None value are
+                ignored. Possible filters are "provider", "application",
+                "status" and "pool".
+
+        Returns:
+            list of dict: Hosts records, sorted by name.
+        """
+        conditions = []
+        parameters = []
+        for key in FILTERS:
+            value = filters.get(key)
+            if value is not None:
+                conditions.append(f'{key} = ?')
+                parameters.append(value)
+
+        query = f'SELECT {_SELECT} FROM hosts'
+        if conditions:
+            query += ' WHERE ' + ' AND '.join(conditions)
+        query += ' ORDER BY name'
+
+        with self._connect() as connection:
+            rows = connection.execute(query, parameters).fetchall()
+        return [self._record(row) for row in rows]
+
+    def update(self, name, **values):
+        """
+        Add or update a host record.
+
+        Args:
+            name (str): Host name.
+            values: Columns values to set.
+        """
+        self.update_many({name: values})
+
+    def update_many(self, records, overwrite=True):
+        """
+        Add or update many hosts records in a single transaction.
+
+        Args:
+            records (dict): Columns values to set per host name.
+            overwrite (bool): If False, only add missing hosts records and
+                keep existing ones unchanged.
+        """
+        now = time()
+        with self._connect() as connection:
+            for name, values in records.items():
+                values = dict(values)
+                if 'outputs' in values:
+                    values['outputs'] = dumps(values['outputs'])
+
+                added = connection.execute(
+                    'INSERT OR IGNORE INTO hosts (name, created, updated) '
+                    'VALUES (?, ?, ?)', (name, now, now)).rowcount
+                if not (added or overwrite):
+                    continue
+
+                values['updated'] = now
+                connection.execute(
+                    'UPDATE hosts SET ' +
+                    ', '.join(f'{key} = ?' for key in values) +
+                    ' WHERE name = ?', list(values.values()) + [name])
+
+    def remove(self, name):
+        """
+        Remove a host record.
+
+        Args:
+            name (str): Host name.
+        """
+        with self._connect() as connection:
+            connection.execute('DELETE FROM hosts WHERE name = ?', (name,))
+
+    def claim(self, pool):
+        """
+        Atomically claim an applied and unclaimed host of a pool.
+
+        Args:
+            pool (str): Pool name.
+
+        Returns:
+            accelpy._registry.HostInfo: Claimed host record. None if no host
+                available.
+        """
+        with self._connect() as connection:
+            # Lock database until commit to ensure host is claimed only once
+            connection.execute('BEGIN IMMEDIATE')
+            row = connection.execute(
+                f'SELECT {_SELECT} FROM hosts WHERE pool = ? AND '
+                "status = 'applied' AND claimed IS NULL "
+                'ORDER BY updated LIMIT 1', (pool,)).fetchone()
+            if not row:
+                return None
+
+            now = time()
+            connection.execute(
+                'UPDATE hosts SET claimed = ?, updated = ? WHERE name = ?',
+                (now, now, row[0]))
+
+        record = self._record(row)
+        record.claimed = record.updated = now
+        return record
+
+    def get_pool(self, name):
+        """
+        Get a pool definition.
+
+        Args:
+            name (str): Pool name.
+
+        Returns:
+            dict: Pool definition. None if pool not in registry.
+        """
+        with self._connect() as connection:
+            row = connection.execute(
+                f'SELECT {", ".join(POOL_COLUMNS)} FROM pools WHERE name = ?',
+                (name,)).fetchone()
+        return dict(zip(POOL_COLUMNS, row)) if row else None
+
+    def update_pool(self, name, **values):
+        """
+        Add or update a pool definition.
+
+        Args:
+            name (str): Pool name.
+            values: Columns values to set.
+        """
+        with self._connect() as connection:
+            connection.execute(
+                'INSERT OR IGNORE INTO pools (name) VALUES (?)', (name,))
+            if values:
+                connection.execute(
+                    'UPDATE pools SET ' +
+                    ', '.join(f'{key} = ?' for key in values) +
+                    ' WHERE name = ?', list(values.values()) + [name])
+
+    def remove_pool(self, name):
+        """
+        Remove a pool definition. Hosts of this pool are detached from it.
+
+        Args:
+            name (str): Pool name.
+        """
+        with self._connect() as connection:
+            connection.execute('DELETE FROM pools WHERE name = ?', (name,))
+            connection.execute(
+                'UPDATE hosts SET pool = NULL, claimed = NULL WHERE pool = ?',
+                (name,))
+
+    @contextmanager
+    def _connect(self):
+        """
+        Connect to the database.
+
+        The transaction is committed (or rolled back on error) and the
+        connection closed on context manager exit.
+
+        Yields:
+            sqlite3.Connection: Database connection.
+        """
+        connection = connect(self._path, timeout=60.0)
+        try:
+            with connection:
+                yield connection
+        finally:
+            connection.close()
+
+    @staticmethod
+    def _init_schema(connection):
+        """
+        Create or upgrade the database schema.
+
+        Args:
+            connection (sqlite3.Connection): Database connection.
+        """
+        version = connection.execute('PRAGMA user_version').fetchone()[0]
+        if version >= SCHEMA_VERSION:
+            return
+
+        if version < 1:
+            # Journal mode can't be changed inside a transaction
+            connection.execute('PRAGMA journal_mode = WAL')
+
+        # Lock the database for writing, then check the version again, since
+        # another process may have upgraded it in the meantime
+        connection.execute('BEGIN IMMEDIATE')
+        version = connection.execute('PRAGMA user_version').fetchone()[0]
+        if version >= SCHEMA_VERSION:
+            return
+
+        if version < 1:
+            connection.execute(
+                'CREATE TABLE IF NOT EXISTS hosts ('
+                'name TEXT PRIMARY KEY, provider TEXT, application TEXT, '
+                'user_config TEXT, status TEXT, outputs TEXT, created REAL, '
+                'updated REAL)')
+
+        if version < 2:
+            # Version 2: Hosts pools
+            connection.execute('ALTER TABLE hosts ADD COLUMN pool TEXT')
+            connection.execute('ALTER TABLE hosts ADD COLUMN claimed REAL')
+            connection.execute(
+                'CREATE TABLE IF NOT EXISTS pools ('
+                'name TEXT PRIMARY KEY, application TEXT, provider TEXT, '
+                'user_config TEXT, size INTEGER)')
+
+        for key in FILTERS:
+            connection.execute(
+                f'CREATE INDEX IF NOT EXISTS hosts_{key} ON hosts ({key})')
+        connection.execute(f'PRAGMA user_version = {SCHEMA_VERSION}')
+
+    @staticmethod
+    def _record(row):
+        """
+        Convert a database row to a record.
+
+        Args:
+            row (tuple): Database row.
+
+        Returns:
+            accelpy._registry.HostInfo: record.
+        """
+        record = dict(zip(COLUMNS, row))
+        record['outputs'] = loads(record['outputs'] or '{}')
+        return HostInfo(**record)
+
+
+class HostInfo:
+    """
+    Host information, as recorded in the hosts registry.
+
+    This is a lightweight record that never runs external tools and that can
+    be pickled. Use "open" to get the full "accelpy.Host".
+
+    Args:
+        name (str): Host name.
+        provider (str): Provider name.
+        application (str): Path to application definition file.
+        user_config (str): User configuration directory.
+        status (str): Host status ("initialized", "applied" or "destroyed").
+        outputs (dict): Last Terraform outputs.
+        created (float): Creation timestamp.
+        updated (float): Last update timestamp.
+        pool (str): Name of the pool the host belongs to, if any.
+        claimed (float): Timestamp of the host claim from its pool, if claimed.
+    """
+    __slots__ = COLUMNS
+
+    def __init__(self, name, provider=None, application=None,
+                 user_config=None, status=None, outputs=None, created=None,
+                 updated=None, pool=None, claimed=None):
+        self.name = name
+        self.provider = provider
+        self.application = application
+        self.user_config = user_config
+        self.status = status
+        self.outputs = outputs or dict()
+        self.created = created
+        self.updated = updated
+        self.pool = pool
+        self.claimed = claimed
+
+    def __str__(self):
+        return f'<{self.__class__.__module__}.{self.__class__.__name__} ' \
+            f'(name={self.name})>'
+
+    def __repr__(self):
+        return self.__str__()
+
+    def __eq__(self, other):
+        return (isinstance(other, HostInfo) and
+                self.to_dict() == other.to_dict())
+
+    def __hash__(self):
+        # "outputs" is a dict and is not hashable, equal records have anyway
+        # equal other values
+        return hash(tuple(
+            getattr(self, key) for key in COLUMNS if key != 'outputs'))
+
+    def to_dict(self):
+        """
+        Return information as dict.
+
+        Returns:
+            dict: Information.
+        """
+        return {key: getattr(self, key) for key in COLUMNS}
+
+    def open(self, readonly=True):
+        """
+        Open the host.
+
+        Args:
+            readonly (bool): If True, open the host in read-only mode.
+
+        Returns:
+            accelpy.Host: Host.
+        """
+        # Lazy import: Avoid circular import
+        from accelpy._host import Host
+        return Host(name=self.name, readonly=readonly)
@@ -0,0 +1,595 @@
+# coding=utf-8
+"""Local daemon keeping hosts in memory and running their operations"""
+from collections import deque
+from json import dumps, loads
+from os import chmod, remove, stat
+from os.path import isabs, isdir, join
+from socket import AF_UNIX, SOCK_STREAM, socket, timeout
+from threading import Condition, Event, Lock, Thread
+
+from accelpy._common import HOME_DIR, OUTPUT_TAIL_LINES
+from accelpy.exceptions import (
+    AccelizeException, ConfigurationException, RuntimeException)
+
+#: Daemon Unix socket path
+SOCKET_FILE = join(HOME_DIR, 'accelpy.sock')
+
+#: Delay between two checks of the daemon stop when waiting for clients
+ACCEPT_TIMEOUT = 0.5
+
+#: Host operations run by the daemon
+OPERATIONS = ('plan', 'apply', 'build', 'destroy')
+
+#: Host attributes returned from Terraform outputs, with their output name
+OUTPUTS = dict(ssh_private_key='host_ssh_private_key', ssh_user='remote_user',
+               private_ip='host_private_ip', public_ip='host_public_ip')
+
+#: Commands handled by the daemon
+COMMANDS = OPERATIONS + tuple(OUTPUTS) + ('info', 'list', 'wait')
+
+
+def request(command, line_callback=None, path=None, **kwargs):
+    """
+    Send a command to the daemon and return its result.
+
+    Args:
+        command (str): Command name, one of "COMMANDS".
+        line_callback (callable): Function called with each output line
+            (Without line ending) of the operation as argument.
+        path (str): Daemon socket path. Default to "SOCKET_FILE".
+        kwargs: Command arguments.
+
+    Returns:
+        object: Command result.
+
+    Raises:
+        FileNotFoundError, ConnectionRefusedError: Daemon not running.
+        accelpy.exceptions.AccelizeException: Command error.
+    """
+    with socket(AF_UNIX, SOCK_STREAM) as client:
+        client.connect(path or SOCKET_FILE)
+        client.sendall(
+            (dumps(dict(command=command, kwargs=kwargs)) + '\n').encode())
+
+        with client.makefile('r') as stream:
+            for line in stream:
+                message = loads(line)
+                if 'line' in message:
+                    if line_callback:
+                        line_callback(message['line'])
+                elif 'error' in message:
+                    # Lazy import: Only used on error
+                    import accelpy.exceptions as exceptions
+
+                    exception = getattr(
+                        exceptions, message.get('type', ''), None)
+                    if not (isinstance(exception, type) and
+                            issubclass(exception, AccelizeException)):
+                        exception = RuntimeException
+                    raise exception(message['error'])
+                else:
+                    return message.get('result')
+
+    raise RuntimeException('Connection to the accelpy daemon lost.')
+
+
+class Server:
+    """
+    Local daemon keeping hosts in memory and running their operations.
+
+    Clients communicate with the daemon using JSON lines on a Unix socket.
+    Hosts configurations, application definitions and utilities executables are
+    loaded only once, and Terraform outputs are read from memory until the
+    state file changes.
+
+    Operations run in the daemon and are not interrupted if the client
+    disconnects. A client can then wait for the operation end with the "wait"
+    command.
+
+    Args:
+        path (str): Socket path. Default to "SOCKET_FILE".
+    """
+
+    def __init__(self, path=None):
+        self._path = path or SOCKET_FILE
+        self._socket = None
+        self._thread = None
+        self._stopped = Event()
+        self._hosts = dict()
+        self._hosts_lock = Lock()
+        self._operations = dict()
+        self._operations_lock = Lock()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+    def __str__(self):
+        return f'<{self.__class__.__module__}.{self.__class__.__name__} ' \
+            f'(path={self._path})>'
+
+    def __repr__(self):
+        return self.__str__()
+
+    @property
+    def path(self):
+        """
+        Socket path.
+
+        Returns:
+            str: Path.
+        """
+        return self._path
+
+    def start(self):
+        """
+        Start to serve clients in a background thread.
+
+        Raises:
+            accelpy.exceptions.ConfigurationException: Daemon already running.
+        """
+        try:
+            request('list', path=self._path)
+        except (FileNotFoundError, ConnectionRefusedError):
+            pass
+        else:
+            raise ConfigurationException(
+                f'The accelpy daemon is already running on "{self._path}".')
+
+        # Remove the socket of a daemon not stopped properly
+        try:
+            remove(self._path)
+        except FileNotFoundError:
+            pass
+
+        self._stopped.clear()
+        self._socket = socket(AF_UNIX, SOCK_STREAM)
+        self._socket.settimeout(ACCEPT_TIMEOUT)
+        self._socket.bind(self._path)
+        chmod(self._path, 0o600)
+        self._socket.listen()
+
+        self._thread = Thread(target=self._serve, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """
+        Stop to serve clients and wait for running operations.
+        """
+        if self._socket is None:
+            return
+
+        try:
+            remove(self._path)
+        except FileNotFoundError:
+            pass
+        self._stopped.set()
+        self._thread.join()
+        self._socket.close()
+        self._socket = None
+
+        with self._operations_lock:
+            operations = list(self._operations.values())
+        for operation in operations:
+            operation.join()
+
+    def serve_forever(self):
+        """
+        Serve clients until interrupted.
+        """
+        self.start()
+        try:
+            self._thread.join()
+        finally:
+            self.stop()
+
+    def _serve(self):
+        """
+        Accept clients connections.
+        """
+        while not self._stopped.is_set():
+            try:
+                client = self._socket.accept()[0]
+            except timeout:
+                # Check if stopped
+                continue
+            client.settimeout(None)
+            Thread(target=self._handle, args=(client,), daemon=True).start()
+
+    def _handle(self, client):
+        """
+        Handle a client request.
+
+        Args:
+            client (socket.socket): Client socket.
+        """
+        with client, client.makefile('r') as stream:
+            try:
+                command, kwargs = self._parse(stream.readline())
+                if command in OPERATIONS or command == 'wait':
+                    result = self._follow(client, command, **kwargs)
+                else:
+                    result = self._query(command, **kwargs)
+                response = dict(result=result)
+
+            except (AccelizeException, OSError) as exception:
+                response = dict(
+                    error=str(exception), type=exception.__class__.__name__)
+            except Exception as exception:
+                response = dict(
+                    error=str(exception) or exception.__class__.__name__,
+                    type='RuntimeException')
+
+            self._send(client, response)
+
+    @staticmethod
+    def _parse(line):
+        """
+        Parse and validate a client request.
+
+        Args:
+            line (str): JSON request line.
+
+        Returns:
+            tuple: command (str), command arguments (dict).
+
+        Raises:
+            accelpy.exceptions.ConfigurationException: Invalid request.
+        """
+        try:
+            message = loads(line)
+            command = message['command']
+            kwargs = message.get('kwargs', dict())
+            if not (isinstance(kwargs, dict) and
+                    all(isinstance(key, str) for key in kwargs)):
+                raise TypeError('Invalid arguments')
+        except (ValueError, KeyError, TypeError, AttributeError):
+            raise ConfigurationException('Invalid request.')
+
+        if command not in COMMANDS:
+            raise ConfigurationException(f'Unsupported command "{command}".')
+        return command, kwargs
+
+    @staticmethod
+    def _send(client, message):
+        """
+        Send a message to a client.
+
+        Args:
+            client (socket.socket): Client socket.
+            message (dict): Message.
+
+        Returns:
+            bool: False if the client is disconnected.
+        """
+        try:
+            line = dumps(message)
+        except (TypeError, ValueError) as exception:
+            line = dumps(dict(error=f'Invalid result: {exception}',
+                              type='RuntimeException'))
+        try:
+            client.sendall((line + '\n').encode())
+        except OSError:
+            return False
+        return True
+
+    def _query(self, command, name=None, **kwargs):
+        """
+        Run a query command.
+
+        Args:
+            command (str): Command.
+            name (str): Host name.
+            kwargs: Command arguments.
+
+        Returns:
+            object: Command result.
+        """
+        # Lazy import: Only used when the daemon is running
+        from accelpy._host import iter_host_names
+
+        if command == 'list':
+            return list(iter_host_names(**kwargs))
+
+        elif command == 'info':
+            if name is None:
+                return [self._host(host_name).info()
+                        for host_name in iter_host_names()]
+            return self._host(name).info()
+
+        try:
+            key = OUTPUTS[command]
+        except KeyError:
+            raise ConfigurationException(f'Unsupported command "{command}".')
+
+        # Lazy import: Only used when the daemon is running
+        from accelpy._terraform import read_local_state
+
+        self._check_exists(name)
+        config_dir = self._config_dir(name)
+        state = read_local_state(config_dir)
+        if state is None:
+            # State can not be read directly, use Terraform
+            return getattr(self._host(name), command)
+
+        try:
+            value = state['outputs'][key]
+        except KeyError:
+            raise ConfigurationException('Configuration not applied.')
+
+        if command == 'ssh_private_key' and not isabs(value):
+            # Terraform returns relative path as "./file"
+            return join(config_dir, value.lstrip('./'))
+        return value
+
+    def _follow(self, client, command, name=None, **kwargs):
+        """
+        Start an operation if required, and stream its output to the client
+        until it ends.
+
+        Args:
+            client (socket.socket): Client socket.
+            command (str): Operation name, or "wait" to only wait an operation
+                already started.
+            name (str): Host name.
+            kwargs: Operation arguments.
+
+        Returns:
+            object: Operation result.
+        """
+        if command == 'wait':
+            with self._operations_lock:
+                try:
+                    operation = self._operations[name]
+                except KeyError:
+                    raise ConfigurationException(
+                        f'No operation started on "{name}".')
+        else:
+            operation = self._start(command, name, kwargs)
+
+        for line in operation.follow():
+            if not self._send(client, dict(line=line)):
+                # Client disconnected, the operation continue
+                return None
+
+        return operation.result()
+
+    def _start(self, command, name, kwargs):
+        """
+        Start an operation.
+
+        Args:
+            command (str): Operation name.
+            name (str): Host name.
+            kwargs: Operation arguments.
+
+        Returns:
+            accelpy._server._Operation: Operation.
+        """
+        self._check_exists(name)
+
+        with self._operations_lock:
+            operation = self._operations.get(name)
+            if operation is not None and operation.running:
+                raise ConfigurationException(
+                    f'The "{operation.command}" operation is already running '
+                    f'on "{name}".')
+
+            operation = self._operations[name] = _Operation(
+                command, name, kwargs)
+
+        # Hosts loaded for queries may be outdated after the operation
+        operation.start(self._forget, name)
+        return operation
+
+    def _host(self, name):
+        """
+        Get a read-only host, loaded only once until its configuration changes.
+
+        Args:
+            name (str): Host name.
+
+        Returns:
+            accelpy._host.Host: Host.
+        """
+        self._check_exists(name)
+        config_dir = self._config_dir(name)
+        try:
+            key = stat(join(config_dir, 'user_parameters.json')).st_mtime_ns
+        except FileNotFoundError:
+            key = None
+
+        with self._hosts_lock:
+            try:
+                cached_key, host = self._hosts[name]
+                if cached_key == key:
+                    return host
+            except KeyError:
+                pass
+
+            # Lazy import: Only used when the daemon is running
+            from accelpy._host import Host
+
+            host = Host(name=name, readonly=True)
+            self._hosts[name] = (key, host)
+            return host
+
+    def _forget(self, name):
+        """
+        Remove an host from memory.
+
+        Args:
+            name (str): Host name.
+        """
+        with self._hosts_lock:
+            self._hosts.pop(name, None)
+
+    def _check_exists(self, name):
+        """
+        Check if a host configuration exists.
+
+        Args:
+            name (str): Host name.
+
+        Raises:
+            accelpy.exceptions.ConfigurationException: No configuration.
+        """
+        if not name or not isdir(self._config_dir(name)):
+            raise ConfigurationException(f'No configuration named "{name}".')
+
+    @staticmethod
+    def _config_dir(name):
+        """
+        Host configuration directory.
+
+        Args:
+            name (str): Host name.
+
+        Returns:
+            str: Path.
+        """
+        # Lazy import: Only used when the daemon is running
+        from accelpy._host import CONFIG_DIR
+
+        return join(CONFIG_DIR, name)
+
+
+class _Operation:
+    """
+    Host operation running in the daemon.
+
+    Only the last "OUTPUT_TAIL_LINES" output lines are kept in memory.
+
+    Args:
+        command (str): Operation name.
+        name (str): Host name.
+        kwargs (dict): Operation arguments.
+    """
+
+    def __init__(self, command, name, kwargs):
+        self.command = command
+        self._name = name
+        self._kwargs = kwargs
+        self._lines = deque(maxlen=OUTPUT_TAIL_LINES)
+        self._count = 0
+        self._condition = Condition()
+        self._done = False
+        self._result = None
+        self._error = None
+        self._thread = None
+
+    @property
+    def running(self):
+        """
+        True if the operation is running.
+
+        Returns:
+            bool: Running.
+        """
+        with self._condition:
+            return not self._done
+
+    def start(self, callback, *args):
+        """
+        Start the operation in a background thread.
+
+        Args:
+            callback (callable): Function called when the operation ends.
+            args: Callback arguments.
+        """
+        self._thread = Thread(target=self._run, args=(callback, args))
+        self._thread.start()
+
+    def join(self):
+        """
+        Wait for the operation end.
+        """
+        if self._thread is not None:
+            self._thread.join()
+
+    def follow(self):
+        """
+        Output lines of the operation until it ends, starting from the oldest
+        line kept in memory.
+
+        Returns:
+            generator of str: Output lines.
+        """
+        seen = 0
+        while True:
+            with self._condition:
+                self._condition.wait_for(
+                    lambda: self._count > seen or self._done)
+                first = self._count - len(self._lines)
+                lines = list(self._lines)[max(seen - first, 0):]
+                seen = self._count
+                done = self._done
+
+            yield from lines
+            if done:
+                return
+
+    def result(self):
+        """
+        Operation result.
+
+        Returns:
+            object: Result.
+
+        Raises:
+            accelpy.exceptions.AccelizeException: Operation error.
+        """
+        if self._error is not None:
+            raise self._error
+        return self._result
+
+    def _run(self, callback, args):
+        """
+        Run the operation.
+
+        Args:
+            callback (callable): Function called when the operation ends.
+            args: Callback arguments.
+        """
+        # Lazy import: Only used when the daemon is running
+        from accelpy._host import Host
+
+        result = error = None
+        try:
+            with Host(name=self._name) as host:
+                method = getattr(host, self.command)
+                if self.command == 'plan':
+                    result = method()
+                else:
+                    # Output is streamed to clients instead of the daemon
+                    # standard output
+                    result = method(line_callback=self._write, **dict(
+                        self._kwargs, quiet=True))
+
+        except (AccelizeException, OSError) as exception:
+            error = exception
+        except Exception as exception:
+            error = RuntimeException(str(exception))
+
+        finally:
+            callback(*args)
+            with self._condition:
+                self._result = result
+                self._error = error
+                self._done = True
+                self._condition.notify_all()
+
+    def _write(self, line):
+        """
+        Keep an output line.
+
+        Args:
+            line (str): Output line.
+        """
+        with self._condition:
+            self._lines.append(line)
+            self._count += 1
+            self._condition.notify_all()
@@ -1,13 +1,336 @@
 # coding=utf-8
 """Terraform configuration"""
-from json import loads
-from os import makedirs, remove
-from os.path import join, isfile
-from time import sleep
+from json import dumps, loads
+from os import (
+    environ, fsdecode, getpid, makedirs, remove, replace, scandir, stat)
+from os.path import dirname, join, isabs, isfile
+from time import monotonic, sleep
 
-from accelpy._common import json_write, symlink
+from accelpy._common import file_lock, json_read, json_write, symlink
 from accelpy._hashicorp import Utility
-from accelpy.exceptions import RuntimeException
+from accelpy.exceptions import ConfigurationException, RuntimeException
+
+#: Name of the file where are saved resources operations durations
+DURATIONS_FILE = 'durations.json'
+
+#: Name of the file where is saved the initialization state, in ".terraform"
+INIT_FILE = 'accelpy_init.json'
+
+#: Terraform dependency lock file name
+LOCK_FILE = '.terraform.lock.hcl'
+
+#: Name of the Terraform CLI configuration file generated in the install
+#: directory
+CLI_CONFIG_FILE = 'terraformrc'
+
+#: Terraform state format versions supported by "read_state"
+STATE_VERSIONS = (4,)
+
+# Cached parsed state files, per path
+_STATES = dict()
+
+
+def read_state(path):
+    """
+    Read a Terraform state file without calling Terraform.
+
+    The parsed state is cached until the file is modified.
+
+    Args:
+        path (str): Path to "terraform.tfstate" file.
+
+    Returns:
+        dict: State with "serial" (State serial), "outputs" (Outputs values per
+            name) and "resources" (Resources addresses, like returned by
+            "terraform state list") keys. None if the state format version is
+            not supported.
+
+    Raises:
+        accelpy.exceptions.RuntimeException: Invalid state file.
+    """
+    file_stat = stat(path)
+    key = (file_stat.st_mtime_ns, file_stat.st_size, file_stat.st_ino)
+
+    try:
+        cached_key, state = _STATES[path]
+        if cached_key == key:
+            return state
+    except KeyError:
+        pass
+
+    try:
+        with open(path, 'rt') as state_file:
+            content = loads(state_file.read())
+        version = content['version']
+    except (ValueError, KeyError, TypeError):
+        raise RuntimeException(f'Invalid Terraform state file "{path}"')
+
+    if version not in STATE_VERSIONS:
+        return None
+
+    resources = []
+    for resource in content.get('resources', ()):
+        address = f"{resource['type']}.{resource['name']}"
+        if resource.get('mode') == 'data':
+            address = f'data.{address}'
+        if resource.get('module'):
+            address = f"{resource['module']}.{address}"
+
+        for instance in resource.get('instances', ()):
+            try:
+                index = instance['index_key']
+            except KeyError:
+                resources.append(address)
+                continue
+            resources.append(f'{address}[{index}]' if isinstance(index, int)
+                             else f'{address}["{index}"]')
+
+    state = dict(
+        serial=content.get('serial'), resources=resources,
+        outputs={name: output['value'] for name, output in
+                 content.get('outputs', dict()).items()})
+
+    _STATES[path] = (key, state)
+    return state
+
+
+def read_local_state(config_dir):
+    """
+    Read the local Terraform state of a configuration without calling
+    Terraform.
+
+    Args:
+        config_dir (str): Configuration directory.
+
+    Returns:
+        dict: State, see "read_state". An empty state if there is no state
+            file. None if the state can not be read directly (Remote
+            backend or unsupported state version).
+    """
+    backend_state = join(config_dir, '.terraform', 'terraform.tfstate')
+    if isfile(backend_state) and json_read(backend_state).get(
+            'backend', dict()).get('type', 'local') != 'local':
+        # Non local backend configured
+        return None
+
+    try:
+        return read_state(join(config_dir, 'terraform.tfstate'))
+    except FileNotFoundError:
+        return dict(serial=None, resources=[], outputs=dict())
+
+
+class TerraformEvent:
+    """
+    Terraform machine-readable UI event.
+
+    Events are parsed from the Terraform "-json" output.
+
+    Args:
+        type (str): Terraform message type (Like "apply_start",
+            "apply_complete", "apply_errored", "provision_progress",
+            "diagnostic", ...).
+        level (str): Message level ("info", "warn" or "error").
+        message (str): Human-readable message.
+        timestamp (str): Message ISO 8601 timestamp.
+        resource (str): Address of the related resource, if any.
+        action (str): Resource action (Like "create" or "delete"), if any.
+        provisioner (str): Related provisioner (Like "local-exec"), if any.
+        elapsed (float): Elapsed seconds since the resource operation start,
+            if known.
+        diagnostic (dict): Diagnostic details, if any.
+    """
+    __slots__ = ('type', 'level', 'message', 'timestamp', 'resource',
+                 'action', 'provisioner', 'elapsed', 'diagnostic')
+
+    def __init__(self, type, level=None, message=None, timestamp=None,
+                 resource=None, action=None, provisioner=None, elapsed=None,
+                 diagnostic=None):
+        self.type = type
+        self.level = level
+        self.message = message
+        self.timestamp = timestamp
+        self.resource = resource
+        self.action = action
+        self.provisioner = provisioner
+        self.elapsed = elapsed
+        self.diagnostic = diagnostic
+
+    def __str__(self):
+        return self.message or ''
+
+    def __repr__(self):
+        return f'<{self.__class__.__module__}.{self.__class__.__name__} ' \
+            f'(type={self.type}, resource={self.resource})>'
+
+    @classmethod
+    def from_json(cls, line):
+        """
+        Parse a Terraform "-json" output line.
+
+        Args:
+            line (str): Output line.
+
+        Returns:
+            accelpy._terraform.TerraformEvent: Event. None if the line is not a
+                Terraform JSON message.
+        """
+        try:
+            content = loads(line)
+            event_type = content['type']
+        except (ValueError, KeyError, TypeError):
+            return None
+
+        hook = content.get('hook') or dict()
+        return cls(
+            type=event_type, level=content.get('@level'),
+            message=content.get('@message'),
+            timestamp=content.get('@timestamp'),
+            resource=(hook.get('resource') or dict()).get('addr'),
+            action=hook.get('action'), provisioner=hook.get('provisioner'),
+            elapsed=hook.get('elapsed_seconds'),
+            diagnostic=content.get('diagnostic'))
+
+    @property
+    def stage(self):
+        """
+        Resource operation stage.
+
+        Returns:
+            str: "apply", "provision" or "refresh". None if not a resource
+                operation event.
+        """
+        stage, _, status = self.type.rpartition('_')
+        if stage in ('apply', 'provision', 'refresh') and status in (
+                'start', 'progress', 'complete', 'errored'):
+            return stage
+        return None
+
+    @property
+    def status(self):
+        """
+        Resource operation status.
+
+        Returns:
+            str: "start", "progress", "complete" or "errored". None if not a
+                resource operation event.
+        """
+        return self.type.rpartition('_')[2] if self.stage else None
+
+
+class _EventsHandler:
+    """
+    Terraform "-json" output lines handler.
+
+    Lines are converted to events, human-readable messages are shown and
+    resources operations durations are measured.
+
+    Args:
+        quiet (bool): If True, hide outputs.
+        line_callback (callable): Function called with each human-readable
+            message.
+        event_callback (callable): Function called with each
+            "accelpy._terraform.TerraformEvent".
+    """
+
+    def __init__(self, quiet=False, line_callback=None, event_callback=None):
+        self._quiet = quiet
+        self._line_callback = line_callback
+        self._event_callback = event_callback
+        self._starts = dict()
+        self._errors = []
+        self.durations = []
+
+    def __call__(self, line):
+        """
+        Handle an output line.
+
+        Args:
+            line (str): line.
+        """
+        event = TerraformEvent.from_json(line)
+        if event is None:
+            # Not a JSON message (Like some early errors)
+            message = line
+        else:
+            message = event.message or ''
+            self._handle(event)
+            if self._event_callback:
+                self._event_callback(event)
+
+        if not self._quiet:
+            print(message, flush=True)
+        if self._line_callback:
+            self._line_callback(message)
+
+    def _handle(self, event):
+        """
+        Measure resources operations durations and collect errors.
+
+        Args:
+            event (accelpy._terraform.TerraformEvent): Event.
+        """
+        if event.level == 'error':
+            diagnostic = event.diagnostic or dict()
+            self._errors.append('\n'.join(
+                text for text in (event.message, diagnostic.get('detail'))
+                if text))
+
+        status = event.status
+        if status is None:
+            return
+
+        key = (event.stage, event.resource, event.provisioner)
+        now = monotonic()
+        if status == 'start':
+            self._starts[key] = now
+            return
+
+        elif status == 'progress':
+            return
+
+        try:
+            event.elapsed = round(now - self._starts.pop(key), 3)
+        except KeyError:
+            # Start not seen, use Terraform value
+            pass
+
+        self.durations.append(dict(
+            resource=event.resource, stage=event.stage,
+            provisioner=event.provisioner, action=event.action,
+            status=status, elapsed=event.elapsed))
+
+    def exception(self, exception):
+        """
+        Get the exception to raise on Terraform error.
+
+        Args:
+            exception (accelpy.exceptions.RuntimeException): Terraform call
+                exception.
+
+        Returns:
+            accelpy.exceptions.RuntimeException: Exception with human-readable
+                errors messages from Terraform diagnostics if any, else
+                the original exception.
+        """
+        errors, self._errors = self._errors, []
+        return RuntimeException('\n\n'.join(errors)) if errors else exception
+
+    def save(self, path, operation):
+        """
+        Save resources operations durations, slowest first.
+
+        Args:
+            path (str): Durations file path.
+            operation (str): Terraform operation name.
+        """
+        try:
+            durations = json_read(path)
+        except (OSError, ValueError):
+            durations = dict()
+        durations[operation] = sorted(
+            self.durations, key=lambda item: item['elapsed'] or 0,
+            reverse=True)
+        json_write(durations, path, indent=2)
 
 
 class Terraform(Utility):
@@ -38,11 +361,19 @@ class Terraform(Utility):
     _FILE = __file__
     _EXTS_INCLUDE = ('.tf', '.tfvars', '.tf.json', '.tfvars.json')
 
+    # Commands arguments
+    _INIT_ARGS = ('init', '-no-color', '-input=false')
+    _PLAN_ARGS = ('plan', '-no-color', '-input=false', '-out=tfplan')
+    _DESTROY_ARGS = ('destroy', '-no-color', '-json', '-auto-approve')
+
     def __init__(self, *args, **kwargs):
         Utility.__init__(self, *args, **kwargs)
         self._initialized = False
+        self._state_file = join(self._config_dir, 'terraform.tfstate')
+        self._durations_file = join(self._config_dir, DURATIONS_FILE)
+        self._init_file = join(self._config_dir, '.terraform', INIT_FILE)
 
-    def create_configuration(self):
+    def create_configuration(self, sources=None):
         """
         Generate Terraform configuration.
 
@@ -57,16 +388,29 @@ class Terraform(Utility):
         If multiples files with the same name are found, the last one found is
         used. Directories are checked in the listed order to allow user to
         override default configuration easily.
+
+        Args:
+            sources (list of tuple of str): Sources as returned by
+                "get_sources". If not specified, sources are retrieved.
         """
         # Lazy import: Only used if new configuration
         from accelpy._ansible import Ansible
 
-        # Symlink common plugins dir to to avoid to re-download them each time
+        # Providers are shared between hosts using the plugin cache directory
+        # (See "_environ"), remove link to it from previous versions.
         dot_dir = join(self._config_dir, '.terraform')
         makedirs(dot_dir, exist_ok=True)
-        symlink(self._plugins_dir(), join(dot_dir, 'plugins'))
+        try:
+            remove(join(dot_dir, 'plugins'))
+        except (FileNotFoundError, IsADirectoryError):
+            pass
+
         # Link configuration files matching provider and options
-        for name, src_path in self._list_sources():
+        if sources is None:
+            sources = self.get_sources()
+        sources = dict(sources)
+
+        for name, src_path in sources.items():
             dst_path = join(self._config_dir, name)
 
             # Replace existing file
@@ -78,6 +422,17 @@ class Terraform(Utility):
             # Create symbolic link to configuration file
             symlink(src_path, dst_path)
 
+        # Remove links to sources not used anymore and outdated plan
+        with scandir(self._config_dir) as entries:
+            for entry in entries:
+                if (entry.is_symlink() and entry.name not in sources and any(
+                        entry.name.endswith(ext) for ext in self._EXTS_INCLUDE)):
+                    remove(entry.path)
+        try:
+            remove(join(self._config_dir, 'tfplan'))
+        except FileNotFoundError:
+            pass
+
         # Add variables
         tf_vars = {
             key: value for key, value in self._variables.items()
@@ -86,15 +441,143 @@ class Terraform(Utility):
         json_write(
             tf_vars, join(self._config_dir, 'generated.auto.tfvars.json'))
 
-        # Initialize terraform
+    def configuration_digest(self):
+        """
+        Return a digest of the Terraform configuration files (Variables files
+        excluded). The configuration needs to be initialized again when it
+        changes.
+
+        Returns:
+            str: SHA-256 hexadecimal digest.
+        """
+        # Lazy import: Only used to detect changes
+        from hashlib import sha256
+
+        hasher = sha256()
+        with scandir(self._config_dir) as entries:
+            names = sorted(entry.name for entry in entries if entry.is_file())
+        for name in names:
+            if name.endswith(('.tf', '.tf.json')):
+                hasher.update(name.encode() + b'\0')
+                with open(join(self._config_dir, name), 'rb') as file:
+                    hasher.update(file.read())
+        return hasher.hexdigest()
+
+    def update_variables(self, **variables):
+        """
+        Update input variables of an existing configuration.
+
+        The saved plan, if any, is removed since it becomes outdated.
+
+        Args:
+            variables: Variables values. Variables with None value are removed.
+        """
+        tf_vars_json = join(self._config_dir, 'generated.auto.tfvars.json')
+        tf_vars = json_read(tf_vars_json)
+        for key, value in variables.items():
+            self._variables[key] = value
+            if value is None:
+                tf_vars.pop(key, None)
+            else:
+                tf_vars[key] = value
+        json_write(tf_vars, tf_vars_json)
+
+        try:
+            remove(join(self._config_dir, 'tfplan'))
+        except FileNotFoundError:
+            pass
+
     def _init(self):
         """
         Initialize Terraform
         """
         if not self._initialized:
-            self._exec('init', '-no-color', '-input=false', pipe_stdout=True)
+            if not self._is_initialized():
+                # The plugin cache does not support concurrent initializations
+                with file_lock(self._init_lock_file()):
+                    if not self._is_initialized():
+                        self._exec(*self._INIT_ARGS, pipe_stdout=True)
+                        self._set_initialized()
+            self._initialized = True
+
+    async def _init_async(self):
+        """
+        Initialize Terraform using asyncio.
+        """
+        if not self._initialized:
+            if not self._is_initialized():
+                # Lazy import: Only used with asyncio
+                from asyncio import get_event_loop
+
+                # The plugin cache does not support concurrent
+                # initializations. The lock is acquired in a thread to not
+                # block the event loop.
+                lock = file_lock(self._init_lock_file())
+                await get_event_loop().run_in_executor(None, lock.__enter__)
+                try:
+                    if not self._is_initialized():
+                        await self._exec_async(
+                            *self._INIT_ARGS, pipe_stdout=True)
+                        self._set_initialized()
+                finally:
+                    lock.__exit__(None, None, None)
             self._initialized = True
 
+    @classmethod
+    def _init_lock_file(cls):
+        """
+        Lock file of initializations, next to the shared plugin cache.
+
+        Returns:
+            str: Lock file path.
+        """
+        makedirs(cls._install_dir(), exist_ok=True)
+        return f'{cls._plugins_dir()}.lock'
+
+    def _init_digest(self):
+        """
+        Return a digest of everything the initialization depends on:
+        Configuration files, dependency lock file and Terraform executable.
+
+        Returns:
+            str: SHA-256 hexadecimal digest.
+        """
+        # Lazy import: Only used to detect changes
+        from hashlib import sha256
+
+        executable = self._executable_file()
+        exec_stat = stat(executable)
+        hasher = sha256(f'{self.configuration_digest()}\0{executable}\0'
+                        f'{exec_stat.st_size}\0{exec_stat.st_mtime_ns}\0'
+                        .encode())
+        try:
+            with open(join(self._config_dir, LOCK_FILE), 'rb') as file:
+                hasher.update(file.read())
+        except FileNotFoundError:
+            pass
+        return hasher.hexdigest()
+
+    def _is_initialized(self):
+        """
+        Check if the configuration was already initialized, eventually by
+        another process, and nothing changed since.
+
+        Returns:
+            bool: True if initialized.
+        """
+        try:
+            init = json_read(self._init_file)
+        except (OSError, ValueError):
+            return False
+        return init.get('digest') == self._init_digest()
+
+    def _set_initialized(self):
+        """
+        Save the initialization state.
+        """
+        makedirs(dirname(self._init_file), exist_ok=True)
+        json_write(dict(digest=self._init_digest()), self._init_file)
+
     def plan(self):
         """
         Generate and show an execution plan. a TF plan is also saved in the
@@ -104,59 +587,369 @@ class Terraform(Utility):
             str: Command output
         """
         self._init()
-        return self._exec('plan', '-no-color', '-input=false', '-out=tfplan',
-                          pipe_stdout=True).stdout
+        return self._exec(*self._PLAN_ARGS, pipe_stdout=True).stdout
+
+    async def plan_async(self):
+        """
+        Generate and show an execution plan using asyncio. a TF plan is also
+        saved in the configuration directory.
 
-    def apply(self, quiet=False, retries=10, delay=1.0):
+        Returns:
+            str: Command output
+        """
+        await self._init_async()
+        return (await self._exec_async(
+            *self._PLAN_ARGS, pipe_stdout=True)).stdout
+
+    def apply(self, quiet=False, retries=10, delay=1.0, line_callback=None,
+              log_file=None, event_callback=None):
         """
         Builds or changes infrastructure.
 
+        Resources operations durations are saved in the "durations.json" file
+        of the configuration directory.
+
         Args:
             quiet (bool): If True, hide outputs.
             retries (int): Number of time to retries to apply the configuration.
                 Apply is retried only on a specified set of known retryable
                 errors.
             delay (float): Delay to wait between retries
+            line_callback (callable): Function called with each human-readable
+                output line.
+            log_file (path-like object): Path to a file where append the
+                Terraform JSON output.
+            event_callback (callable): Function called with each
+                "accelpy._terraform.TerraformEvent".
         """
         self._init()
 
         failures = 0
-        args = ['apply', '-no-color', '-auto-approve', '-input=false']
-        if isfile(join(self._config_dir, 'tfplan')):
-            # Use "tfplan" if any
-            args.append('tfplan')
+        args = self._apply_args()
+        handler = _EventsHandler(quiet, line_callback, event_callback)
 
-        while True:
-            try:
-                self._exec(*args, pipe_stdout=quiet)
-                break
-            except RuntimeException as exception:
-                if failures > retries:
-                    raise RuntimeException(
-                        f'Unable to apply after {retries} retries\n\n'
-                        f'{str(exception)}')
-
-                for retryable_error in (
-                        "Error requesting spot instances: "
-                        "InvalidSubnetID.NotFound: "
-                        "No default subnet for availability zone: 'null'",
-                        'Error while waiting for spot request',):
-                    if retryable_error in str(exception):
-                        break
-                else:
-                    raise
-                failures += 1
-                sleep(delay)
-
-    def destroy(self, quiet=False):
+        try:
+            while True:
+                try:
+                    self._exec(*args, pipe_stdout=True, line_callback=handler,
+                               log_file=log_file)
+                    break
+                except RuntimeException as exception:
+                    self._check_retryable(
+                        handler.exception(exception), failures, retries)
+                    failures += 1
+                    sleep(delay)
+        finally:
+            handler.save(self._durations_file, 'apply')
+
+    async def apply_async(self, quiet=False, retries=10, delay=1.0,
+                          line_callback=None, log_file=None,
+                          event_callback=None):
+        """
+        Builds or changes infrastructure using asyncio.
+
+        Resources operations durations are saved in the "durations.json" file
+        of the configuration directory.
+
+        Args:
+            quiet (bool): If True, hide outputs.
+            retries (int): Number of time to retries to apply the configuration.
+                Apply is retried only on a specified set of known retryable
+                errors.
+            delay (float): Delay to wait between retries
+            line_callback (callable): Function called with each human-readable
+                output line.
+            log_file (path-like object): Path to a file where append the
+                Terraform JSON output.
+            event_callback (callable): Function called with each
+                "accelpy._terraform.TerraformEvent".
+        """
+        # Lazy import: Only used with asyncio
+        from asyncio import sleep as sleep_async
+
+        await self._init_async()
+
+        failures = 0
+        args = self._apply_args()
+        handler = _EventsHandler(quiet, line_callback, event_callback)
+
+        try:
+            while True:
+                try:
+                    await self._exec_async(
+                        *args, pipe_stdout=True, line_callback=handler,
+                        log_file=log_file)
+                    break
+                except RuntimeException as exception:
+                    self._check_retryable(
+                        handler.exception(exception), failures, retries)
+                    failures += 1
+                    await sleep_async(delay)
+        finally:
+            handler.save(self._durations_file, 'apply')
+
+    def destroy(self, quiet=False, line_callback=None, log_file=None,
+                event_callback=None):
         """
         Destroy Terraform-managed infrastructure.
 
+        Resources operations durations are saved in the "durations.json" file
+        of the configuration directory.
+
         Args:
             quiet (bool): If True, hide outputs.
+            line_callback (callable): Function called with each human-readable
+                output line.
+            log_file (path-like object): Path to a file where append the
+                Terraform JSON output.
+            event_callback (callable): Function called with each
+                "accelpy._terraform.TerraformEvent".
         """
         self._init()
-        self._exec('destroy', '-no-color', '-auto-approve', pipe_stdout=quiet)
+        handler = _EventsHandler(quiet, line_callback, event_callback)
+        try:
+            self._exec(*self._DESTROY_ARGS, pipe_stdout=True,
+                       line_callback=handler, log_file=log_file)
+        except RuntimeException as exception:
+            raise handler.exception(exception)
+        finally:
+            handler.save(self._durations_file, 'destroy')
+
+    async def destroy_async(self, quiet=False, line_callback=None,
+                            log_file=None, event_callback=None):
+        """
+        Destroy Terraform-managed infrastructure using asyncio.
+
+        Resources operations durations are saved in the "durations.json" file
+        of the configuration directory.
+
+        Args:
+            quiet (bool): If True, hide outputs.
+            line_callback (callable): Function called with each human-readable
+                output line.
+            log_file (path-like object): Path to a file where append the
+                Terraform JSON output.
+            event_callback (callable): Function called with each
+                "accelpy._terraform.TerraformEvent".
+        """
+        await self._init_async()
+        handler = _EventsHandler(quiet, line_callback, event_callback)
+        try:
+            await self._exec_async(
+                *self._DESTROY_ARGS, pipe_stdout=True, line_callback=handler,
+                log_file=log_file)
+        except RuntimeException as exception:
+            raise handler.exception(exception)
+        finally:
+            handler.save(self._durations_file, 'destroy')
+
+    def _apply_args(self):
+        """
+        Terraform apply arguments.
+
+        Returns:
+            list of str: Arguments.
+        """
+        args = ['apply', '-no-color', '-json', '-auto-approve', '-input=false']
+        if isfile(join(self._config_dir, 'tfplan')):
+            # Use "tfplan" if any
+            args.append('tfplan')
+        return args
+
+    @staticmethod
+    def _check_retryable(exception, failures, retries):
+        """
+        Check if apply can be retried after an error.
+
+        Args:
+            exception (accelpy.exceptions.RuntimeException): Apply error.
+            failures (int): Number of failures before this one.
+            retries (int): Maximum number of retries.
+
+        Raises:
+            accelpy.exceptions.RuntimeException: Not retryable error, or
+                maximum retries reached.
+        """
+        if failures > retries:
+            raise RuntimeException(
+                f'Unable to apply after {retries} retries\n\n'
+                f'{str(exception)}')
+
+        for retryable_error in (
+                "Error requesting spot instances: "
+                "InvalidSubnetID.NotFound: "
+                "No default subnet for availability zone: 'null'",
+                'Error while waiting for spot request',):
+            if retryable_error in str(exception):
+                return
+        raise exception
+
+    def mirror_providers(self):
+        """
+        Download providers required by the configuration to the local
+        filesystem mirror. Next initializations of all hosts resolve these
+        providers from the mirror without network access.
+
+        Returns:
+            list of str: Providers available in the mirror.
+        """
+        makedirs(self._mirror_dir(), exist_ok=True)
+        self._exec('providers', 'mirror', self._mirror_dir(), pipe_stdout=True)
+        return self.mirrored_providers()
+
+    @classmethod
+    def mirrored_providers(cls):
+        """
+        Providers available in the local filesystem mirror.
+
+        Returns:
+            list of str: Providers addresses ("hostname/namespace/type").
+        """
+        providers = []
+        try:
+            with scandir(cls._mirror_dir()) as hostnames:
+                for hostname in hostnames:
+                    if not hostname.is_dir():
+                        continue
+                    with scandir(hostname.path) as namespaces:
+                        for namespace in namespaces:
+                            if not namespace.is_dir():
+                                continue
+                            with scandir(namespace.path) as types:
+                                providers.extend(
+                                    f'{hostname.name}/{namespace.name}/'
+                                    f'{provider.name}' for provider in types
+                                    if provider.is_dir())
+        except FileNotFoundError:
+            pass
+        return sorted(providers)
+
+    @classmethod
+    def import_mirror(cls, archive):
+        """
+        Add providers to the local filesystem mirror from a tar archive.
+
+        This allows to provide providers to hosts without network access.
+
+        Args:
+            archive (path-like object): Path to the tar archive, like generated
+                by "export_mirror" or by "terraform providers mirror".
+
+        Returns:
+            list of str: Providers available in the mirror.
+
+        Raises:
+            accelpy.exceptions.ConfigurationException: Invalid archive.
+        """
+        # Lazy import: Only used to import mirror
+        from tarfile import open as tar_open, TarError
+
+        try:
+            with tar_open(fsdecode(archive)) as tar_file:
+                members = tar_file.getmembers()
+                for member in members:
+                    if (isabs(member.name) or '..' in member.name.split('/')
+                            or not (member.isfile() or member.isdir())):
+                        raise ConfigurationException(
+                            f'Invalid provider mirror archive "{archive}": '
+                            f'Unsafe member "{member.name}".')
+                tar_file.extractall(cls._mirror_dir(), members=members)
+        except TarError as exception:
+            raise ConfigurationException(
+                f'Invalid provider mirror archive "{archive}": {exception}')
+        return cls.mirrored_providers()
+
+    @classmethod
+    def export_mirror(cls, archive):
+        """
+        Save the local filesystem mirror as a tar archive, to import it on
+        another machine with "import_mirror".
+
+        Args:
+            archive (path-like object): Path to the ".tar.gz" archive to create.
+        """
+        # Lazy import: Only used to export mirror
+        from tarfile import open as tar_open
+
+        with tar_open(fsdecode(archive), 'w:gz') as tar_file:
+            for provider in cls.mirrored_providers():
+                tar_file.add(join(cls._mirror_dir(), provider), provider)
+
+    @classmethod
+    def _mirror_dir(cls):
+        """
+        Local filesystem providers mirror directory.
+
+        Returns:
+            str: Mirror directory.
+        """
+        return join(cls._install_dir(), 'mirror')
+
+    @classmethod
+    def _environ(cls):
+        """
+        Terraform environment variables.
+
+        Providers are downloaded once in the shared plugin cache directory.
+        Providers available in the local filesystem mirror are resolved from it
+        without network access. User defined Terraform CLI configuration or
+        plugin cache directory are preserved.
+
+        Returns:
+            dict: Environment variables.
+        """
+        env = dict(environ)
+        if 'TF_PLUGIN_CACHE_DIR' not in env:
+            makedirs(cls._plugins_dir(), exist_ok=True)
+            env['TF_PLUGIN_CACHE_DIR'] = cls._plugins_dir()
+
+        if not ('TF_CLI_CONFIG_FILE' in env or 'TERRAFORM_CONFIG' in env):
+            cli_config = cls._cli_config()
+            if cli_config:
+                env['TF_CLI_CONFIG_FILE'] = cli_config
+        return env
+
+    @classmethod
+    def _cli_config(cls):
+        """
+        Generate the Terraform CLI configuration file that installs providers
+        from the local filesystem mirror.
+
+        Returns:
+            str: Path to the CLI configuration file. None if no provider in
+                the mirror.
+        """
+        providers = cls.mirrored_providers()
+        if not providers:
+            return None
+
+        include = dumps(providers)
+        content = '\n'.join((
+            'provider_installation {',
+            '  filesystem_mirror {',
+            f'    path    = {dumps(cls._mirror_dir())}',
+            f'    include = {include}',
+            '  }',
+            '  direct {',
+            f'    exclude = {include}',
+            '  }',
+            '}',
+            ''))
+
+        path = join(cls._install_dir(), CLI_CONFIG_FILE)
+        try:
+            with open(path, 'rt') as file:
+                if file.read() == content:
+                    return path
+        except FileNotFoundError:
+            pass
+
+        # Write atomically, since may be read concurrently by other processes
+        tmp_path = f'{path}.{getpid()}'
+        with open(tmp_path, 'wt') as file:
+            file.write(content)
+        replace(tmp_path, path)
+        return path
 
     def refresh(self, quiet=False):
         """
@@ -179,6 +972,10 @@ class Terraform(Utility):
         Returns:
             dict: Configuration output.
         """
+        state = self._read_state()
+        if state is not None:
+            return state['outputs']
+
         process = self._exec('output', '-no-color', '-json', pipe_stdout=True)
         out = loads(process.stdout.strip())
         return {key: out[key]['value'] for key in out}
@@ -190,6 +987,10 @@ class Terraform(Utility):
         Returns:
             list of str: List of resources.
         """
+        state = self._read_state()
+        if state is not None:
+            return state['resources']
+
         result = self._exec('state', 'list', pipe_stdout=True, check=False)
 
         if result.returncode:
@@ -210,4 +1011,15 @@ class Terraform(Utility):
         Returns:
             bool: True if Terraform state present.
         """
-        return isfile(join(self._config_dir, 'terraform.tfstate'))
+        return isfile(self._state_file)
+
+    def _read_state(self):
+        """
+        Read the local Terraform state file.
+
+        Returns:
+            dict: State, see "read_state". An empty state if there is no state
+                file. None if the state can not be read directly (Remote
+                backend or unsupported state version).
+        """
+        return read_local_state(self._config_dir)
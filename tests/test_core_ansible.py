@@ -62,3 +62,42 @@ def test_ansible(tmpdir):
     assert 'pre_tasks' in playbook
     assert not playbook['vars']
     assert 'container_service' in playbook['roles']
+
+
+def test_ansible_digest(tmpdir):
+    """
+    Test Ansible provisioning digest
+
+    Args:
+        tmpdir (py.path.local) tmpdir pytest fixture
+    """
+    from accelpy._ansible import Ansible
+    from accelpy._common import json_write
+
+    source_dir = tmpdir.join('source').ensure(dir=True)
+    json_write(dict(client_secret='', client_id=''),
+               source_dir.join('cred.json'))
+    role_dir = source_dir.join('roles', 'common.init')
+    role_dir.join('tasks', 'main.yml').write('- debug: msg=init\n', ensure=True)
+
+    digests = []
+    for name in ('config_0', 'config_1'):
+        config_dir = tmpdir.join(name).ensure(dir=True)
+        conf = config_dir.join('conf.json')
+        json_write(dict(key='value'), conf)
+        ansible = Ansible(config_dir, user_config=source_dir,
+                          variables=dict(key='value', conf_src=str(conf)))
+        ansible.create_configuration()
+        digests.append(ansible.digest())
+
+    # Test: Same sources in different configurations have the same digest
+    assert digests[0] == digests[1]
+
+    # Test: Digest changes with roles content
+    role_dir.join('tasks', 'main.yml').write('- debug: msg=changed\n')
+    assert ansible.digest() != digests[1]
+    digests[1] = ansible.digest()
+
+    # Test: Digest changes with variables files content
+    json_write(dict(key='other_value'), conf)
+    assert ansible.digest() != digests[1]
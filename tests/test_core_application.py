@@ -285,3 +285,56 @@ fpga:
 """)
     with pytest.raises(ConfigurationException):
         lint(yml_file)
+
+
+def test_definition_cache(tmpdir):
+    """
+    Test validated application definition cache
+
+    Args:
+        tmpdir (py.path.local) tmpdir pytest fixture
+    """
+    import accelpy._application as accelpy_application
+    from accelpy._application import Application
+    from accelpy.exceptions import ConfigurationException
+
+    cache_dir = tmpdir.join('cache')
+    yml_file = mock_application(tmpdir)
+
+    accelpy_application_cache_dir = accelpy_application.CACHE_DIR
+    accelpy_application.CACHE_DIR = str(cache_dir)
+    accelpy_application_yaml_load = accelpy_application.yaml_load
+    try:
+        # Test: Validated definition cached
+        app = Application(yml_file)
+        assert len(cache_dir.listdir()) == 1
+        assert app['package']['type'] == 'container_image'
+
+        # Test: Cached definition loaded without parsing YAML
+        def yaml_load(*_, **__):
+            """Fake YAML loader"""
+            raise AssertionError('Should be loaded from cache')
+
+        accelpy_application.yaml_load = yaml_load
+        cached = Application(yml_file)
+        assert cached._definition == app._definition
+        assert cached.environments == app.environments
+        accelpy_application.yaml_load = accelpy_application_yaml_load
+
+        # Test: Content change invalidates the cache
+        mock_application(tmpdir, override={'application': {
+            'name': 'my_app', 'version': '1.0.0', 'env': {'version': '2.0.0'}}})
+        app = Application(yml_file)
+        assert app.environments == {'env'}
+        assert app.get('application', 'version', env='env') == '2.0.0'
+        assert len(cache_dir.listdir()) == 2
+
+        # Test: Invalid definition not cached
+        mock_application(tmpdir, override={'fpga': {'count': 'one'}})
+        with pytest.raises(ConfigurationException):
+            Application(yml_file)
+        assert len(cache_dir.listdir()) == 2
+
+    finally:
+        accelpy_application.CACHE_DIR = accelpy_application_cache_dir
+        accelpy_application.yaml_load = accelpy_application_yaml_load
@@ -12,3 +12,183 @@ def test_recursive_update():
                 'key3': 3, 'key5': 5.0, 'key6': {}}
 
     assert recursive_update(to_update, update) == expected
+
+
+def test_call_async(tmpdir):
+    """
+    Tests call_async
+
+    Args:
+        tmpdir (py.path.local) tmpdir pytest fixture
+    """
+    from asyncio import new_event_loop, sleep, wait_for, TimeoutError
+    from os import kill
+    from sys import executable
+    import pytest
+    from accelpy._common import call_async
+    from accelpy.exceptions import RuntimeException
+
+    pid_file = tmpdir.join('pid')
+
+    async def run_cancelled():
+        """Run a process group and cancel it"""
+        with pytest.raises(TimeoutError):
+            await wait_for(call_async(
+                ('sh', '-c', f'sleep 60 & echo $! > {pid_file}; wait')), 1.0)
+
+    async def wait_terminated(pid):
+        """Wait until process is terminated"""
+        for _ in range(100):
+            try:
+                kill(pid, 0)
+            except ProcessLookupError:
+                return True
+            await sleep(0.05)
+        return False
+
+    loop = new_event_loop()
+    try:
+        # Test: Call and retrieve output
+        result = loop.run_until_complete(
+            call_async(('echo', 'accelpy'), pipe_stdout=True))
+        assert result.returncode == 0
+        assert result.stdout.strip() == 'accelpy'
+
+        # Test: Call and raise on error
+        with pytest.raises(RuntimeException) as exception:
+            loop.run_until_complete(
+                call_async(('sh', '-c', 'echo error >&2; exit 1')))
+        assert exception.match('error')
+
+        # Test: Call and ignore error
+        assert loop.run_until_complete(
+            call_async(('false',), check=False)).returncode
+
+        # Test: Cancellation terminates the whole process group
+        loop.run_until_complete(run_cancelled())
+        assert loop.run_until_complete(
+            wait_terminated(int(pid_file.read_text('utf-8'))))
+    finally:
+        loop.close()
+
+
+def test_call_streamed(tmpdir):
+    """
+    Tests call and call_async with streamed output
+
+    Args:
+        tmpdir (py.path.local) tmpdir pytest fixture
+    """
+    from asyncio import new_event_loop
+    from os import kill
+    from sys import executable
+    import pytest
+    from accelpy._common import (
+        call, call_async, OUTPUT_CHUNK_SIZE, OUTPUT_TAIL_LINES)
+    from accelpy.exceptions import RuntimeException
+
+    log_file = tmpdir.join('output.log')
+    lines_count = OUTPUT_TAIL_LINES * 3
+    command = ('sh', '-c', f'seq 1 {lines_count}; echo error >&2')
+    expected = [str(index) for index in range(1, lines_count + 1)]
+    expected.append('error')
+
+    # Test: Lines passed to callback, written to log, only tail in memory
+    lines = []
+    result = call(command, pipe_stdout=True, line_callback=lines.append,
+                  log_file=log_file)
+    assert lines == expected
+    assert log_file.read_text('utf-8').splitlines() == expected
+    assert result.stdout.splitlines() == expected[-OUTPUT_TAIL_LINES:]
+
+    # Test: Log file is appended
+    call(('echo', 'appended'), pipe_stdout=True, log_file=log_file)
+    assert log_file.read_text('utf-8').splitlines()[-1] == 'appended'
+
+    # Test: Error message from output tail
+    with pytest.raises(RuntimeException) as exception:
+        call(('sh', '-c', 'echo streamed_error; exit 1'), pipe_stdout=True,
+             line_callback=lines.append)
+    assert exception.match('streamed_error')
+
+    # Test: Lines longer than the read chunk size
+    size = OUTPUT_CHUNK_SIZE * 20
+    long_lines = (
+        executable, '-c', f'print("a"); print("é" * {size}, end="")')
+    lines = []
+    call(long_lines, pipe_stdout=True, line_callback=lines.append)
+    assert lines == ['a', 'é' * size]
+
+    # Test: Callback error terminates the process
+    pid_file = tmpdir.join('pid')
+    sleeping = ('sh', '-c', f'echo $$ > {pid_file}; echo line; exec sleep 60')
+
+    def line_callback(_):
+        """Raise error"""
+        raise ValueError('callback error')
+
+    with pytest.raises(ValueError):
+        call(sleeping, pipe_stdout=True, line_callback=line_callback)
+    with pytest.raises(ProcessLookupError):
+        kill(int(pid_file.read_text('utf-8')), 0)
+
+    loop = new_event_loop()
+    try:
+        # Test: Async call
+        lines = []
+        result = loop.run_until_complete(call_async(
+            command, pipe_stdout=True, line_callback=lines.append))
+        assert lines == expected
+        assert result.stdout.splitlines() == expected[-OUTPUT_TAIL_LINES:]
+
+        # Test: Async call error
+        with pytest.raises(RuntimeException) as exception:
+            loop.run_until_complete(call_async(
+                ('sh', '-c', 'echo streamed_error; exit 1'), pipe_stdout=True,
+                line_callback=lines.append))
+        assert exception.match('streamed_error')
+
+        # Test: Async call with lines longer than the read chunk size
+        lines = []
+        loop.run_until_complete(call_async(
+            long_lines, pipe_stdout=True, line_callback=lines.append))
+        assert lines == ['a', 'é' * size]
+
+        # Test: Async call callback error terminates the process
+        with pytest.raises(ValueError):
+            loop.run_until_complete(call_async(
+                sleeping, pipe_stdout=True, line_callback=line_callback))
+        with pytest.raises(ProcessLookupError):
+            kill(int(pid_file.read_text('utf-8')), 0)
+    finally:
+        loop.close()
+
+
+def test_file_lock(tmpdir):
+    """
+    Tests file_lock
+
+    Args:
+        tmpdir (py.path.local) tmpdir pytest fixture
+    """
+    from concurrent.futures import ThreadPoolExecutor
+    from time import sleep
+    from accelpy._common import file_lock
+
+    lock_file = tmpdir.join('lock')
+    running = []
+    overlaps = []
+
+    def locked(_):
+        """Run in lock and detect concurrent runs"""
+        with file_lock(lock_file):
+            running.append(1)
+            sleep(0.01)
+            overlaps.append(len(running))
+            running.pop()
+
+    # Test: Only one lock owner at a time
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        list(executor.map(locked, range(8)))
+    assert overlaps == [1] * 8
+    assert lock_file.check()
@@ -0,0 +1,288 @@
+# coding=utf-8
+"""Fleet tests"""
+
+
+def test_fleet(tmpdir):
+    """
+    Test fleet
+
+    Args:
+        tmpdir (py.path.local) tmpdir pytest fixture
+    """
+    from threading import Barrier
+    import accelpy._host as accelpy_host
+    import accelpy._fleet as accelpy_fleet
+    from accelpy._fleet import Fleet
+    from accelpy.exceptions import RuntimeException
+    from accelpy._common import json_write
+
+    names = ('host_0', 'host_1', 'host_2', 'host_3')
+    barrier = Barrier(len(names), timeout=10)
+    failing = 'host_2'
+
+    class FakeHost:
+        """Fake host"""
+
+        def __init__(self, name):
+            self.name = name
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *_):
+            pass
+
+        def apply(self, quiet=False):
+            """Fake apply that requires all hosts to run concurrently"""
+            assert quiet
+            barrier.wait()
+            if self.name == failing:
+                raise RuntimeException('apply error')
+
+        def build(self, **_):
+            """Fake build"""
+            return f'image_{self.name}'
+
+    # Mock config dir and host
+    accelpy_host_config_dir = accelpy_host.CONFIG_DIR
+    config_dir = tmpdir.join('config').ensure(dir=True)
+    accelpy_host.CONFIG_DIR = str(config_dir)
+    fleet_host = accelpy_fleet.Host
+    accelpy_fleet.Host = FakeHost
+    fleet_prepare = Fleet._prepare
+    Fleet._prepare = staticmethod(lambda _: None)
+
+    try:
+        for name in names + ('other',):
+            json_write(dict(provider='testing', user_config=str(tmpdir)),
+                       config_dir.join(name).ensure(
+                           'user_parameters.json'))
+        config_dir.join('latest').ensure()
+
+        # Test: Select hosts by names and pattern
+        assert Fleet(names=['other']).names == ('other',)
+        assert Fleet(pattern='host_*').names == names
+        assert Fleet(names=['other'], pattern='host_[01]').names == (
+            'host_0', 'host_1', 'other')
+        assert not len(Fleet())
+        assert Fleet().apply() == dict()
+
+        # Test: Run concurrently with errors isolated per host
+        fleet = Fleet(pattern='host_*')
+        assert len(fleet) == len(names)
+        results = fleet.apply()
+        assert sorted(results) == list(names)
+        assert isinstance(results[failing]['error'], RuntimeException)
+        for name in names:
+            if name != failing:
+                assert results[name] == dict(result=None, error=None)
+
+        # Test: Summary
+        summary = fleet.summary(results)
+        assert summary.startswith('3 succeeded, 1 failed')
+        assert f'{failing}: failed: apply error' in summary
+
+        # Test: Results values and bounded workers
+        results = Fleet(pattern='host_*', workers=1).build()
+        assert results['host_0']['result'] == 'image_host_0'
+        assert 'host_0: succeeded: image_host_0' in fleet.summary(results)
+
+    # Restore mocked config dir and host
+    finally:
+        accelpy_host.CONFIG_DIR = accelpy_host_config_dir
+        accelpy_fleet.Host = fleet_host
+        Fleet._prepare = fleet_prepare
+
+
+def test_fleet_build_once(tmpdir):
+    """
+    Test fleet "build once, apply many"
+
+    Args:
+        tmpdir (py.path.local) tmpdir pytest fixture
+    """
+    import accelpy._host as accelpy_host
+    import accelpy._fleet as accelpy_fleet
+    from accelpy._fleet import Fleet
+    from accelpy._host import get_registry
+    from accelpy.exceptions import RuntimeException
+    from accelpy._common import json_write
+    from tests.test_core_application import mock_application
+
+    builds = []
+    images = dict()
+
+    class FakeHost:
+        """Fake host"""
+
+        def __init__(self, name):
+            self.name = name
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *_):
+            pass
+
+        def build(self, quiet=False, cache=True):
+            """Fake build"""
+            assert quiet and cache
+            builds.append(self.name)
+            if self.name.startswith('failing'):
+                raise RuntimeException('build error')
+            return f'image_{self.name}'
+
+        def use_image(self, image):
+            """Fake use image"""
+            images[self.name] = image
+
+        def apply(self, quiet=False):
+            """Fake apply"""
+            assert quiet
+            return images.get(self.name)
+
+    # Mock config dir and host
+    accelpy_host_config_dir = accelpy_host.CONFIG_DIR
+    config_dir = tmpdir.join('config').ensure(dir=True)
+    accelpy_host.CONFIG_DIR = str(config_dir)
+    fleet_host = accelpy_fleet.Host
+    accelpy_fleet.Host = FakeHost
+    fleet_prepare = Fleet._prepare
+    Fleet._prepare = staticmethod(lambda _: None)
+
+    try:
+        container = mock_application(tmpdir.ensure('container', dir=True))
+        vm_image = mock_application(
+            tmpdir.ensure('vm_image', dir=True),
+            override={'package': {'type': 'vm_image', 'name': 'image'}})
+
+        hosts = {
+            'app_0': (container, 'aws'), 'app_1': (container, 'aws'),
+            'app_2': (container, 'aws'), 'other_provider': (container, 'gcp'),
+            'vm_0': (vm_image, 'aws'), 'vm_1': (vm_image, 'aws'),
+            'failing_0': (container, 'failing'),
+            'failing_1': (container, 'failing')}
+        for name in hosts:
+            json_write(dict(provider='testing', user_config=str(tmpdir)),
+                       config_dir.join(name).ensure('user_parameters.json'))
+        get_registry().update_many({
+            name: dict(application=str(application), provider=provider)
+            for name, (application, provider) in hosts.items()})
+
+        # Test: Image built once per group, then hosts applied from it
+        results = Fleet(pattern='*').apply(build_once=True)
+        assert sorted(builds) == ['app_0', 'failing_0']
+        for name in ('app_0', 'app_1', 'app_2'):
+            assert results[name] == dict(result='image_app_0', error=None)
+        for name in ('other_provider', 'vm_0', 'vm_1'):
+            assert results[name] == dict(result=None, error=None)
+
+        # Test: Build error reported on all hosts of the group
+        for name in ('failing_0', 'failing_1'):
+            assert isinstance(results[name]['error'], RuntimeException)
+        assert 'failing_1' not in images
+
+    # Restore mocked config dir and host
+    finally:
+        accelpy_host.CONFIG_DIR = accelpy_host_config_dir
+        accelpy_fleet.Host = fleet_host
+        Fleet._prepare = fleet_prepare
+
+
+def test_fleet_destroy(tmpdir):
+    """
+    Test fleet destroy with selection, rate limit and journal
+
+    Args:
+        tmpdir (py.path.local) tmpdir pytest fixture
+    """
+    from time import monotonic
+    import accelpy._host as accelpy_host
+    import accelpy._fleet as accelpy_fleet
+    from accelpy._fleet import Fleet
+    from accelpy.exceptions import RuntimeException
+    from accelpy._common import json_write
+
+    names = ('host_0', 'host_1', 'host_2', 'host_3')
+    failing = ['host_2']
+    unexpected = ['host_3']
+    destroyed = []
+
+    class FakeHost:
+        """Fake host"""
+
+        def __init__(self, name):
+            self.name = name
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *_):
+            pass
+
+        def destroy(self, quiet=False, delete=None):
+            """Fake destroy"""
+            assert quiet
+            assert delete
+            if self.name in failing:
+                raise RuntimeException('destroy error')
+            elif self.name in unexpected:
+                raise KeyError('unexpected error')
+            destroyed.append(self.name)
+            accelpy_host.get_registry().update(self.name, status='destroyed')
+
+    # Mock config dir and host
+    accelpy_host_config_dir = accelpy_host.CONFIG_DIR
+    config_dir = tmpdir.join('config').ensure(dir=True)
+    accelpy_host.CONFIG_DIR = str(config_dir)
+    fleet_host = accelpy_fleet.Host
+    accelpy_fleet.Host = FakeHost
+    fleet_prepare = Fleet._prepare
+    Fleet._prepare = staticmethod(lambda _: None)
+    journal = tmpdir.join('journal.jsonl')
+
+    try:
+        for name in names + ('other',):
+            json_write(dict(provider='other' if name == 'other' else 'testing',
+                            user_config=str(tmpdir)),
+                       config_dir.join(name).ensure('user_parameters.json'))
+
+        # Test: Select hosts
+        assert Fleet.select().names == names + ('other',)
+        fleet = Fleet.select(provider='testing')
+        assert fleet.names == names
+
+        # Test: Destroy with rate limit, errors are recorded in the journal
+        start = monotonic()
+        results = fleet.destroy(delete=True, rate=20, journal=journal)
+        assert monotonic() - start >= 0.15
+        assert isinstance(results['host_2']['error'], RuntimeException)
+        assert isinstance(results['host_3']['error'], KeyError)
+        assert sorted(destroyed) == ['host_0', 'host_1']
+        assert journal.check(file=True)
+        assert 'destroy error' in journal.read()
+        assert 'unexpected error' in journal.read()
+
+        # Test: Resume, hosts applied again since are not skipped
+        accelpy_host.get_registry().update('host_0', status='applied')
+        del destroyed[:], failing[:], unexpected[:]
+        results = fleet.destroy(delete=True, journal=journal)
+        assert sorted(destroyed) == ['host_0', 'host_2', 'host_3']
+        assert results['host_1'] == dict(
+            result='already destroyed', error=None)
+        assert results['host_2'] == dict(result=None, error=None)
+
+        # Test: Journal removed once all hosts are destroyed
+        assert not journal.check()
+
+        # Test: Truncated journal lines are ignored
+        journal.write('{"name": "host_1", "event": "completed"}\n{"name"')
+        del destroyed[:]
+        fleet.destroy(delete=True, journal=journal)
+        assert sorted(destroyed) == ['host_0', 'host_2', 'host_3']
+
+    # Restore mocked config dir and host
+    finally:
+        accelpy_host.CONFIG_DIR = accelpy_host_config_dir
+        accelpy_fleet.Host = fleet_host
+        Fleet._prepare = fleet_prepare
@@ -116,3 +116,437 @@ def test_utility(tmpdir):
     # Test: User source directory
     utility = Terraform(config_dir, user_config=tmpdir)
     assert utility._source_dirs[-1] == fsdecode(tmpdir)
+
+
+def test_executable_manifest(tmpdir):
+    """
+    Test executable trusted from its manifest
+
+    Args:
+        tmpdir (py.path.local) tmpdir pytest fixture
+    """
+    from os import utime
+    from accelpy._common import json_read
+    from accelpy._hashicorp import Utility, MANIFEST_SUFFIX
+
+    install_dir = tmpdir.join('install').ensure(dir=True)
+    calls = install_dir.join('calls')
+    exec_file = install_dir.join('1.0.0', 'terraform')
+    exec_file.write(
+        f'#!/bin/sh\necho x >> "{calls}"\necho "Terraform v1.0.0"\n',
+        ensure=True)
+    exec_file.chmod(0o755)
+
+    # Mock utility installed and up to date
+    class Terraform(Utility):
+        """Terraform utility"""
+
+        @classmethod
+        def _install_dir(cls):
+            """Fake install directory"""
+            return str(install_dir)
+
+        @classmethod
+        def _get_last_version(cls):
+            """Fake last version"""
+            return dict(current_version='1.0.0', executable_name='terraform')
+
+    def version_calls():
+        """Return the number of "version" calls"""
+        return len(calls.readlines()) if calls.check() else 0
+
+    # Test: Version queried once, then read from manifest
+    assert Terraform._get_executable() == str(exec_file)
+    assert version_calls() == 1
+    manifest = json_read(str(exec_file) + MANIFEST_SUFFIX)
+    assert manifest['version'] == '1.0.0'
+    assert manifest['size'] == exec_file.size()
+    assert len(manifest['sha256']) == 64
+
+    Terraform._executable = None
+    assert Terraform._get_executable() == str(exec_file)
+    assert Terraform(tmpdir).version == '1.0.0'
+    assert version_calls() == 1
+
+    # Test: Version queried again if executable modified
+    utime(str(exec_file), ns=(0, 0))
+    Terraform._executable = None
+    assert Terraform._get_executable() == str(exec_file)
+    assert version_calls() == 2
+
+
+def test_last_version(tmpdir):
+    """
+    Test last version information, pinned version and offline mode
+
+    Args:
+        tmpdir (py.path.local) tmpdir pytest fixture
+    """
+    from http.server import BaseHTTPRequestHandler, HTTPServer
+    from json import dumps
+    from os import environ, utime
+    from threading import Thread
+    from time import sleep, time
+    import accelpy._hashicorp as accelpy_hashicorp
+    from accelpy._common import json_write
+    from accelpy._hashicorp import Utility, SETTINGS_FILE
+    from accelpy.exceptions import ConfigurationException, RuntimeException
+
+    install_dir = tmpdir.join('install').ensure(dir=True)
+    home_dir = tmpdir.join('home').ensure(dir=True)
+    info_cache = install_dir.join('info.json')
+    requests = []
+
+    # Mock checkpoint API
+    class Handler(BaseHTTPRequestHandler):
+        """Checkpoint API handler"""
+
+        def do_GET(self):
+            """Return last version, or "Not Modified" if ETag matches"""
+            requests.append(self.headers.get('If-None-Match'))
+            if self.headers.get('If-None-Match') == '"1"':
+                self.send_response(304)
+                self.end_headers()
+                return
+            body = dumps(dict(
+                current_version='1.0.0',
+                current_download_url='https://releases/terraform/1.0.0/'
+            )).encode()
+            self.send_response(200)
+            self.send_header('ETag', '"1"')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *_):
+            """Disable logging"""
+
+    server = HTTPServer(('127.0.0.1', 0), Handler)
+    Thread(target=server.serve_forever, daemon=True).start()
+
+    # Mock utility to use temporary install directory
+    class Terraform(Utility):
+        """Terraform utility"""
+
+        @classmethod
+        def _install_dir(cls):
+            """Fake install directory"""
+            return str(install_dir)
+
+    def expire():
+        """Expire the cache and return its modification time"""
+        utime(str(info_cache), (0, 0))
+        return info_cache.mtime()
+
+    def wait_update(mtime):
+        """Wait for the cache update in background"""
+        for _ in range(100):
+            if info_cache.mtime() != mtime:
+                return
+            sleep(0.05)
+
+    checkpoint_url = accelpy_hashicorp.CHECKPOINT_URL
+    accelpy_hashicorp.CHECKPOINT_URL = \
+        f'http://127.0.0.1:{server.server_address[1]}/'
+    accelpy_home_dir = accelpy_hashicorp.HOME_DIR
+    accelpy_hashicorp.HOME_DIR = str(home_dir)
+    try:
+        # Test: Retrieved and cached
+        release = Terraform._get_last_version()
+        assert release['current_version'] == '1.0.0'
+        assert release['etag'] == '"1"'
+        assert release['archive_url'].startswith(
+            'https://releases/terraform/1.0.0/terraform_1.0.0_')
+        assert requests == [None]
+
+        # Test: Cached
+        assert Terraform._get_last_version() == release
+        assert len(requests) == 1
+
+        # Test: Expired cache returned, then revalidated in background once
+        mtime = expire()
+        for _ in range(8):
+            assert Terraform._get_last_version() == release
+        wait_update(mtime)
+        accelpy_hashicorp._join_revalidations()
+        assert requests == [None, '"1"']
+        assert info_cache.mtime() > time() - 60
+
+        mtime = expire()
+        assert Terraform._get_last_version() == release
+        sleep(0.2)
+        assert requests == [None, '"1"']
+
+        # Test: Expired cache returned if checkpoint API unavailable
+        server.shutdown()
+        server.server_close()
+        mtime = expire()
+        assert Terraform._get_last_version() == release
+        sleep(0.2)
+        assert info_cache.mtime() == mtime
+        with pytest.raises(RuntimeException):
+            Terraform._check_last_version(str(info_cache))
+
+        # Test: Pinned version
+        environ['ACCELPY_TERRAFORM_VERSION'] = '0.12.0'
+        try:
+            release = Terraform._get_last_version()
+        finally:
+            del environ['ACCELPY_TERRAFORM_VERSION']
+        assert release['current_version'] == '0.12.0'
+        assert release['archive_url'].startswith(
+            'https://releases.hashicorp.com/terraform/0.12.0/'
+            'terraform_0.12.0_')
+
+        # Test: Offline mode with cache
+        json_write(dict(offline=True), home_dir.join(SETTINGS_FILE))
+        install_dir.join('1.0.0', 'terraform').ensure()
+        assert Terraform._get_last_version()['current_version'] == '1.0.0'
+
+        # Test: Offline mode with cached version not installed
+        install_dir.join('1.0.0').remove()
+        install_dir.join('0.13.0', 'terraform').ensure()
+        assert Terraform._get_last_version()['current_version'] == '0.13.0'
+
+        # Test: Offline mode without cache
+        info_cache.remove()
+        assert Terraform._get_last_version()['current_version'] == '0.13.0'
+
+        install_dir.join('0.13.0').remove()
+        with pytest.raises(RuntimeException):
+            Terraform._get_last_version()
+
+        # Test: Offline mode does not install
+        with pytest.raises(RuntimeException):
+            Terraform._get_executable('2.0.0')
+
+        # Test: Invalid settings file
+        for content in ('{"offline": ', '[]'):
+            home_dir.join(SETTINGS_FILE).write(content)
+            with pytest.raises(ConfigurationException) as exception:
+                Terraform._get_last_version()
+            assert exception.match(SETTINGS_FILE)
+
+    # Restore mocked values
+    finally:
+        accelpy_hashicorp.CHECKPOINT_URL = checkpoint_url
+        accelpy_hashicorp.HOME_DIR = accelpy_home_dir
+        Terraform._executable = None
+
+
+def test_install(tmpdir):
+    """
+    Test streamed and resumable utility installation
+
+    Args:
+        tmpdir (py.path.local) tmpdir pytest fixture
+    """
+    from concurrent.futures import ThreadPoolExecutor
+    from hashlib import sha256
+    from http.server import BaseHTTPRequestHandler, HTTPServer
+    from os import environ
+    from threading import Thread
+    from zipfile import ZipFile
+    import accelpy._hashicorp as accelpy_hashicorp
+    from accelpy._hashicorp import Utility
+    from accelpy.exceptions import RuntimeException
+
+    install_dir = tmpdir.join('install').ensure(dir=True)
+    releases_dir = tmpdir.join('releases', 'terraform', '1.0.0').ensure(
+        dir=True)
+
+    # Mock utility to use temporary install directory
+    class Terraform(Utility):
+        """Terraform utility"""
+
+        @classmethod
+        def _install_dir(cls):
+            """Fake install directory"""
+            return str(install_dir)
+
+        @classmethod
+        def _gpg_verify(cls, data, signature):
+            """Fake signature verification"""
+            assert signature == b'signature'
+
+    # Mock release
+    archive_name = Terraform._release_info(dict(
+        current_version='1.0.0', current_download_url=''))['archive_name']
+    with ZipFile(str(releases_dir.join(archive_name)), 'w') as archive:
+        archive.writestr('terraform', '#!/bin/sh\necho "Terraform v1.0.0"\n')
+    archive = releases_dir.join(archive_name).read_binary()
+    releases_dir.join('terraform_1.0.0_SHA256SUMS').write(
+        f'{sha256(archive).hexdigest()}  {archive_name}\n')
+    releases_dir.join('terraform_1.0.0_SHA256SUMS.sig').write('signature')
+    served = []
+
+    # Mock releases server
+    class Handler(BaseHTTPRequestHandler):
+        """Releases server handler, with "Range" support"""
+
+        def do_GET(self):
+            """Return file content"""
+            path = tmpdir.join('releases', self.path)
+            if not path.check():
+                self.send_error(404)
+                return
+            data = path.read_binary()
+            start = int(self.headers.get('Range', 'bytes=0-')[6:-1])
+            self.send_response(206 if start else 200)
+            self.send_header('Content-Length', str(len(data) - start))
+            self.end_headers()
+            self.wfile.write(data[start:])
+            served.append((self.path, len(data) - start))
+
+        def log_message(self, *_):
+            """Disable logging"""
+
+    server = HTTPServer(('127.0.0.1', 0), Handler)
+    Thread(target=server.serve_forever, daemon=True).start()
+    url = f'http://127.0.0.1:{server.server_address[1]}/'
+
+    releases_url = accelpy_hashicorp.RELEASES_URL
+    accelpy_hashicorp.RELEASES_URL = url
+    environ['ACCELPY_TERRAFORM_VERSION'] = '1.0.0'
+    try:
+        # Test: Download streamed to file and hashed
+        path = str(tmpdir.join('archive.zip'))
+        digest = Terraform._download_file(
+            f'{url}terraform/1.0.0/{archive_name}', path)
+        assert digest == sha256(archive).hexdigest()
+        assert tmpdir.join('archive.zip').read_binary() == archive
+        assert not tmpdir.join('archive.zip.part').check()
+
+        # Test: Interrupted download resumed
+        del served[:]
+        tmpdir.join('archive.zip.part').write_binary(archive[:10])
+        assert Terraform._download_file(
+            f'{url}terraform/1.0.0/{archive_name}', path) == digest
+        assert tmpdir.join('archive.zip').read_binary() == archive
+        assert served == [(f'/terraform/1.0.0/{archive_name}',
+                           len(archive) - 10)]
+
+        # Test: Download error
+        with pytest.raises(RuntimeException):
+            Terraform._download_file(f'{url}not_exists', path)
+
+        # Test: Install once from concurrent threads
+        del served[:]
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            exec_files = set(executor.map(
+                lambda _: Terraform._get_executable(), range(8)))
+        exec_file = str(install_dir.join('1.0.0', 'terraform'))
+        assert exec_files == {exec_file}
+        assert sorted(path for path, _ in served) == sorted((
+            f'/terraform/1.0.0/{archive_name}',
+            '/terraform/1.0.0/terraform_1.0.0_SHA256SUMS',
+            '/terraform/1.0.0/terraform_1.0.0_SHA256SUMS.sig'))
+        assert Terraform(tmpdir).version == '1.0.0'
+        assert not install_dir.join(archive_name).check()
+        assert sorted(item.basename for item in install_dir.listdir()) == [
+            '.install.lock', '1.0.0', 'plugins']
+        assert sorted(item.basename for item in install_dir.join(
+            '1.0.0').listdir()) == ['terraform', 'terraform.manifest.json']
+
+        # Test: Invalid checksum
+        Terraform._executable = None
+        install_dir.join('1.0.0', 'terraform').remove()
+        releases_dir.join('terraform_1.0.0_SHA256SUMS').write(
+            f'{"0" * 64}  {archive_name}\n')
+        with pytest.raises(RuntimeException):
+            Terraform._get_executable()
+        assert not install_dir.join('1.0.0', archive_name).check()
+
+        # Test: Signature download error
+        releases_dir.join('terraform_1.0.0_SHA256SUMS.sig').remove()
+        with pytest.raises(RuntimeException):
+            Terraform._get_executable()
+        assert not install_dir.join('1.0.0', archive_name).check()
+
+    # Restore mocked values
+    finally:
+        del environ['ACCELPY_TERRAFORM_VERSION']
+        accelpy_hashicorp.RELEASES_URL = releases_url
+        Terraform._executable = None
+        server.shutdown()
+        server.server_close()
+
+
+def test_versions(tmpdir):
+    """
+    Test side by side utility versions
+
+    Args:
+        tmpdir (py.path.local) tmpdir pytest fixture
+    """
+    from accelpy._common import json_write
+    from accelpy._hashicorp import Utility
+
+    install_dir = tmpdir.join('install').ensure(dir=True)
+    current = ['0.9.0']
+
+    def install(path, version):
+        """Install a fake executable"""
+        path.write(f'#!/bin/sh\necho "Terraform v{version}"\n', ensure=True)
+        path.chmod(0o755)
+
+    # Mock utility with some installed versions
+    class Terraform(Utility):
+        """Terraform utility"""
+
+        @classmethod
+        def _install_dir(cls):
+            """Fake install directory"""
+            return str(install_dir)
+
+        @classmethod
+        def _get_last_version(cls):
+            """Fake last version, that must not be used if None"""
+            assert current[0] is not None
+            return cls._pinned_release(current[0])
+
+    install(install_dir.join('terraform'), '0.9.0')
+    install(install_dir.join('0.10.0', 'terraform'), '0.10.0')
+    install(install_dir.join('1.0.0', 'terraform'), '1.0.0')
+    install_dir.join('plugins').ensure(dir=True)
+
+    try:
+        # Test: Executable installed by previous versions moved to its version
+        # directory
+        assert Terraform.installed_versions() == ['0.10.0', '1.0.0']
+        assert Terraform._get_executable() == str(
+            install_dir.join('0.9.0', 'terraform'))
+        assert not install_dir.join('terraform').check()
+        assert Terraform.installed_versions() == ['0.9.0', '0.10.0', '1.0.0']
+
+        # Test: Use a specific version
+        assert Terraform._get_executable('0.10.0') == str(
+            install_dir.join('0.10.0', 'terraform'))
+        assert Terraform(tmpdir, version='1.0.0').version == '1.0.0'
+
+        # Test: Version used saved on first use
+        versions = []
+        utility = Terraform(tmpdir, version_callback=versions.append)
+        assert utility.version == '0.9.0'
+        assert utility.version == '0.9.0'
+        assert versions == ['0.9.0']
+
+        # Test: Remove unused versions, current version known locally and last
+        # installed version are kept
+        install(install_dir.join('0.8.0', 'terraform'), '0.8.0')
+        install(install_dir.join('0.11.0', 'terraform'), '0.11.0')
+        json_write(dict(current_version='0.10.0'), install_dir.join(
+            'info.json'))
+        current[0] = None
+        assert Terraform.remove_unused_versions(['0.9.0']) == [
+            '0.8.0', '0.11.0']
+        assert Terraform.installed_versions() == ['0.9.0', '0.10.0', '1.0.0']
+        assert install_dir.join('plugins').check(dir=True)
+
+        install_dir.join('info.json').remove()
+        assert Terraform.remove_unused_versions(['0.9.0']) == ['0.10.0']
+        assert Terraform.installed_versions() == ['0.9.0', '1.0.0']
+
+    # Restore mocked values
+    finally:
+        Terraform._executable = None
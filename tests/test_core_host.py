@@ -11,7 +11,7 @@ def test_host(tmpdir):
         tmpdir (py.path.local) tmpdir pytest fixture
     """
     import accelpy._host as accelpy_host
-    from accelpy._host import Host, iter_hosts
+    from accelpy._host import Host, iter_hosts, get_registry
     from accelpy.exceptions import ConfigurationException
     from accelpy._application import Application
 
@@ -74,9 +74,15 @@ def test_host(tmpdir):
         with pytest.raises(ConfigurationException):
             assert host.private_ip
 
+        # Test: Registered host
+        assert get_registry().get(name).status == 'initialized'
+
         # Test: Terraform apply
         host.apply(quiet=True)
         assert host_config_dir.join('terraform.tfstate').isfile()
+        record = get_registry().get(name)
+        assert record.status == 'applied'
+        assert record.outputs['host_private_ip'] == "127.0.0.1"
 
         # Test: Output variable
         assert host.private_ip == "127.0.0.1"
@@ -87,6 +93,7 @@ def test_host(tmpdir):
 
         # Test: Terraform destroy
         host.destroy(quiet=True, delete=True)
+        assert get_registry().get(name).status == 'destroyed'
 
         # Test: Do destroy on exit
         with Host(application=application, user_config=source_dir,
@@ -123,6 +130,10 @@ def test_host(tmpdir):
         # Test: Iter over host
         config_dir.join('latest').ensure()
         assert host_not_destroyed in tuple(host.name for host in iter_hosts())
+        assert host_not_destroyed in tuple(
+            host.name for host in iter_hosts(status='applied'))
+        assert host_not_destroyed not in tuple(
+            host.name for host in iter_hosts(provider='not_exists'))
 
         # Test: Build image
         provider = 'testing'
@@ -158,3 +169,365 @@ def test_host(tmpdir):
     # Restore mocked config dir
     finally:
         accelpy_host.CONFIG_DIR = accelpy_host_config_dir
+
+
+def test_host_async(tmpdir):
+    """
+    Test host asyncio API
+
+    Args:
+        tmpdir (py.path.local) tmpdir pytest fixture
+    """
+    from asyncio import new_event_loop
+    import accelpy._host as accelpy_host
+    from accelpy._host import Host
+
+    from tests.test_core_terraform import mock_terraform_provider
+    from tests.test_core_packer import mock_packer_provider
+    from tests.test_core_ansible import mock_ansible_local
+    from tests.test_core_application import mock_application
+
+    source_dir = tmpdir.join('source').ensure(dir=True)
+
+    # Mock config dir
+    accelpy_host_config_dir = accelpy_host.CONFIG_DIR
+    config_dir = tmpdir.join('config').ensure(dir=True)
+    accelpy_host.CONFIG_DIR = str(config_dir)
+
+    # Mock application definition file & provider specific configuration
+    application = mock_application(source_dir)
+    mock_terraform_provider(source_dir)
+    artifact = mock_packer_provider(source_dir)
+
+    loop = new_event_loop()
+    try:
+        with Host(application=application, user_config=source_dir,
+                  provider='testing', keep_config=False) as host:
+            host_config_dir = config_dir.join(host.name)
+            mock_ansible_local(host_config_dir)
+
+            # Test: Plan
+            assert loop.run_until_complete(host.plan_async())
+
+            # Test: Apply
+            loop.run_until_complete(host.apply_async(quiet=True))
+            assert host_config_dir.join('terraform.tfstate').isfile()
+            assert host.public_ip == "127.0.0.1"
+
+            # Test: Build
+            assert loop.run_until_complete(
+                host.build_async(quiet=True)) == artifact
+
+            # Test: Destroy
+            loop.run_until_complete(host.destroy_async(quiet=True))
+            assert not host._terraform.state_list()
+
+    # Restore mocked config dir
+    finally:
+        loop.close()
+        accelpy_host.CONFIG_DIR = accelpy_host_config_dir
+
+
+def test_host_create_many(tmpdir):
+    """
+    Test many hosts creation
+
+    Args:
+        tmpdir (py.path.local) tmpdir pytest fixture
+    """
+    import accelpy._host as accelpy_host
+    from accelpy._host import Host
+    from accelpy._terraform import Terraform
+    from accelpy.exceptions import ConfigurationException
+
+    from tests.test_core_terraform import mock_terraform_provider
+    from tests.test_core_application import mock_application
+
+    source_dir = tmpdir.join('source').ensure(dir=True)
+
+    # Mock config dir
+    accelpy_host_config_dir = accelpy_host.CONFIG_DIR
+    config_dir = tmpdir.join('config').ensure(dir=True)
+    accelpy_host.CONFIG_DIR = str(config_dir)
+
+    # Mock application definition file & provider specific configuration
+    application = mock_application(source_dir)
+    mock_terraform_provider(source_dir)
+
+    # Count sources retrieval
+    terraform_get_sources = Terraform.get_sources
+    calls = []
+
+    def get_sources(self):
+        """Counted sources retrieval"""
+        calls.append(self)
+        return terraform_get_sources(self)
+
+    Terraform.get_sources = get_sources
+
+    # Tests
+    try:
+        # Test: Create many hosts with names prefix
+        hosts = Host.create_many(3, application=application, name='many',
+                                 user_config=source_dir)
+        assert [host.name for host in hosts] == ['many_0', 'many_1', 'many_2']
+        assert len(calls) == 1
+        for host in hosts:
+            host_config_dir = config_dir.join(host.name)
+            assert host_config_dir.join('playbook.yml').isfile()
+            assert host_config_dir.join('common.tf').isfile()
+            assert host_config_dir.join('template.json').isfile()
+            assert host_config_dir.join('application.yml').isfile()
+            assert host.name in host_config_dir.join(
+                'generated.auto.tfvars.json').read_text('utf-8')
+
+        # Test: Existing names should raise
+        with pytest.raises(ConfigurationException):
+            Host.create_many(2, application=application, name='many',
+                             user_config=source_dir)
+
+        # Test: Create many hosts with generated names
+        hosts = Host.create_many(2, application=application,
+                                 user_config=source_dir)
+        assert len(set(host.name for host in hosts)) == 2
+        assert len(calls) == 2
+
+    # Restore mocked config dir and sources retrieval
+    finally:
+        accelpy_host.CONFIG_DIR = accelpy_host_config_dir
+        Terraform.get_sources = terraform_get_sources
+
+
+def test_host_readonly(tmpdir):
+    """
+    Test read-only host
+
+    Args:
+        tmpdir (py.path.local) tmpdir pytest fixture
+    """
+    import accelpy._host as accelpy_host
+    from accelpy._host import Host, iter_hosts, iter_hosts_info
+    from accelpy._common import json_write
+    from accelpy.exceptions import ConfigurationException
+
+    # Mock config dir
+    accelpy_host_config_dir = accelpy_host.CONFIG_DIR
+    config_dir = tmpdir.join('config').ensure(dir=True)
+    accelpy_host.CONFIG_DIR = str(config_dir)
+
+    try:
+        # Mock existing applied configuration
+        name = 'testing'
+        host_config_dir = config_dir.join(name).ensure(dir=True)
+        json_write(dict(provider='testing', user_config=str(tmpdir)),
+                   host_config_dir.join('user_parameters.json'))
+        json_write({'version': 4, 'serial': 1, 'resources': [], 'outputs': {
+            'host_public_ip': {'value': '127.0.0.1'},
+            'remote_user': {'value': 'user'}}},
+            host_config_dir.join('terraform.tfstate'))
+
+        # Test: Not existing host should raise
+        with pytest.raises(ConfigurationException):
+            Host(name='not_exists', readonly=True)
+
+        # Test: Read-only host outputs
+        with Host(name=name, readonly=True, keep_config=False) as host:
+            assert host.readonly
+            assert host.public_ip == '127.0.0.1'
+            assert host.ssh_user == 'user'
+
+            # Test: Information
+            info = host.info()
+            assert info['name'] == name
+            assert info['provider'] == 'testing'
+            assert info['config_dir'] == str(host_config_dir)
+            assert info['public_ip'] == '127.0.0.1'
+            assert info['private_ip'] is None
+            assert info['ssh_private_key'] is None
+            assert info['outputs']['remote_user'] == 'user'
+
+            # Test: Modifications should raise
+            for method in (host.plan, host.apply, host.build, host.destroy):
+                with pytest.raises(ConfigurationException):
+                    method()
+
+        # Test: Never cleaned up
+        assert host_config_dir.isdir()
+
+        # Test: Iter over information and read-only hosts
+        info = next(iter_hosts_info())
+        assert info.name == name
+        assert info.status == 'applied'
+        host = info.open()
+        assert host.readonly and host.name == name
+        assert all(host.readonly for host in iter_hosts(readonly=True))
+
+    # Restore mocked config dir
+    finally:
+        accelpy_host.CONFIG_DIR = accelpy_host_config_dir
+
+
+def test_host_update_configuration(tmpdir):
+    """
+    Test host configuration update
+
+    Args:
+        tmpdir (py.path.local) tmpdir pytest fixture
+    """
+    import accelpy._host as accelpy_host
+    from accelpy._host import Host
+    from accelpy._common import json_read, json_write
+
+    from tests.test_core_terraform import mock_terraform_provider
+    from tests.test_core_packer import mock_packer_provider
+    from tests.test_core_application import mock_application
+
+    source_dir = tmpdir.join('source').ensure(dir=True)
+
+    # Mock config dir
+    accelpy_host_config_dir = accelpy_host.CONFIG_DIR
+    config_dir = tmpdir.join('config').ensure(dir=True)
+    accelpy_host.CONFIG_DIR = str(config_dir)
+
+    # Mock application definition file & provider specific configuration
+    application = mock_application(source_dir)
+    mock_terraform_provider(source_dir)
+    mock_packer_provider(source_dir)
+
+    # Tests
+    try:
+        host = Host(application=application, name='testing',
+                    provider='testing', user_config=source_dir)
+        host_config_dir = config_dir.join('testing')
+
+        # Test: Nothing to update
+        assert host.update_configuration() == dict(
+            terraform=False, ansible=False, packer=False,
+            terraform_init=False)
+
+        # Test: New Terraform source
+        override = source_dir.join('common.extra.tf')
+        override.write('# Override\n')
+        assert host.update_configuration() == dict(
+            terraform=True, ansible=False, packer=False,
+            terraform_init=True)
+        assert host_config_dir.join('common.extra.tf').islink()
+
+        # Test: Terraform source removed
+        override.remove()
+        assert host.update_configuration()['terraform']
+        assert not host_config_dir.join('common.extra.tf').exists()
+
+        # Test: Packer source updated
+        packer_source = source_dir.join('testing.json')
+        template = json_read(packer_source)
+        template['builders'][0]['content'] = 'updated'
+        json_write(template, packer_source)
+        assert host.update_configuration() == dict(
+            terraform=False, ansible=False, packer=True,
+            terraform_init=False)
+        assert 'updated' in host_config_dir.join(
+            'template.json').read_text('utf-8')
+
+        # Test: Application updated
+        mock_application(source_dir, override={
+            'firewall_rules': [{'start_port': 1000, 'end_port': 1000,
+                                'protocol': 'tcp', 'direction': 'ingress'}]})
+        result = host.update_configuration()
+        assert result['terraform'] and result['ansible']
+        assert not result['terraform_init']
+        assert '1000' in host_config_dir.join(
+            'generated.auto.tfvars.json').read_text('utf-8')
+
+        # Test: Image used by host is kept
+        host.use_image('image_id')
+        host = Host(name='testing')
+        mock_application(source_dir)
+        host.update_configuration()
+        assert json_read(host_config_dir.join(
+            'generated.auto.tfvars.json'))['package_vm_image'] == 'image_id'
+
+    # Restore mocked config dir
+    finally:
+        accelpy_host.CONFIG_DIR = accelpy_host_config_dir
+
+
+def test_host_utilities_versions(tmpdir):
+    """
+    Test host utilities versions pinning and upgrade
+
+    Args:
+        tmpdir (py.path.local) tmpdir pytest fixture
+    """
+    import accelpy._host as accelpy_host
+    from accelpy._host import Host
+    from accelpy._common import json_read
+    from accelpy._packer import Packer
+    from accelpy._terraform import Terraform
+
+    from tests.test_core_terraform import mock_terraform_provider
+    from tests.test_core_packer import mock_packer_provider
+    from tests.test_core_application import mock_application
+
+    source_dir = tmpdir.join('source').ensure(dir=True)
+    current = ['1.0.0']
+    used = dict()
+
+    # Mock config dir
+    accelpy_host_config_dir = accelpy_host.CONFIG_DIR
+    config_dir = tmpdir.join('config').ensure(dir=True)
+    accelpy_host.CONFIG_DIR = str(config_dir)
+
+    # Mock application definition file & provider specific configuration
+    application = mock_application(source_dir)
+    mock_terraform_provider(source_dir)
+    mock_packer_provider(source_dir)
+
+    # Mock utilities installation
+    mocked = dict()
+    for utility in (Terraform, Packer):
+        mocked[utility] = {key: utility.__dict__.get(key) for key in (
+            '_get_executable', 'current_version', 'remove_unused_versions')}
+        utility._get_executable = classmethod(
+            lambda cls, version=None: str(tmpdir.join(
+                version or current[0], cls._name())))
+        utility.current_version = classmethod(lambda cls: current[0])
+        utility.remove_unused_versions = classmethod(
+            lambda cls, versions=(): used.update({cls._name(): versions}))
+
+    # Tests
+    try:
+        host = Host(application=application, name='testing',
+                    provider='testing', user_config=source_dir)
+        user_parameters_json = config_dir.join(
+            'testing', 'user_parameters.json')
+        assert 'terraform_version' not in json_read(user_parameters_json)
+
+        # Test: Version saved on first use
+        host._terraform._executable_file()
+        assert json_read(user_parameters_json)['terraform_version'] == '1.0.0'
+
+        # Test: Saved version used, even if a new version is available
+        current[0] = '2.0.0'
+        host = Host(name='testing')
+        assert host._terraform._executable_file() == str(
+            tmpdir.join('1.0.0', 'terraform'))
+        assert Host(name='testing', readonly=True)._terraform_state.\
+            _executable_file() == str(tmpdir.join('1.0.0', 'terraform'))
+
+        # Test: Upgrade
+        assert host.upgrade_utilities() == dict(
+            terraform=('1.0.0', '2.0.0'), packer=(None, '2.0.0'))
+        assert host._terraform._executable_file() == str(
+            tmpdir.join('2.0.0', 'terraform'))
+        assert used == dict(terraform={'2.0.0'}, packer={'2.0.0'})
+
+    # Restore mocked config dir and utilities
+    finally:
+        accelpy_host.CONFIG_DIR = accelpy_host_config_dir
+        for utility, attributes in mocked.items():
+            for key, value in attributes.items():
+                if value is None:
+                    delattr(utility, key)
+                else:
+                    setattr(utility, key, value)
@@ -39,6 +39,7 @@ def test_command_line_interface(tmpdir):
         tmpdir (py.path.local) tmpdir pytest fixture
     """
 
+    from json import loads
     import accelpy._host as accelpy_host
 
     from py.path import local  # Use same path interface as Pytest
@@ -137,6 +138,26 @@ def test_command_line_interface(tmpdir):
         assert not result.returncode
         assert result.stdout.strip() == 'user'
 
+        # Test: info
+        result = cli('info', '-n', name, '--json')
+        assert not result.returncode
+        info = loads(result.stdout)
+        assert info['name'] == name
+        assert info['status'] == 'applied'
+        assert info['public_ip'] == '127.0.0.1'
+        assert info['ssh_user'] == 'user'
+        assert str(host_config_dir) in info['ssh_private_key']
+        assert info['outputs']['host_private_ip'] == '127.0.0.1'
+
+        result = cli('info', '-n', name)
+        assert not result.returncode
+        assert 'public_ip: 127.0.0.1' in result.stdout.splitlines()
+
+        # Test: info on all hosts
+        result = cli('info', '--all', '--json')
+        assert not result.returncode
+        assert name in [info['name'] for info in loads(result.stdout)]
+
         # Test: list
         result = cli('list')
         assert not result.returncode
@@ -159,6 +180,15 @@ def test_command_line_interface(tmpdir):
         assert name
         assert not cli('destroy', '-d', '-q').returncode
 
+        # Test: many configurations
+        result = cli('init', '-n', name, '-a', application, '-c', source_dir,
+                     '-p', 'testing', '--count', '2')
+        assert not result.returncode
+        assert result.stdout.split() == [f'{name}_0', f'{name}_1']
+        for host_name in result.stdout.split():
+            assert config_dir.join(host_name).isdir()
+            assert not cli('destroy', '-n', host_name, '-d', '-q').returncode
+
     # Clean up
     finally:
         if host_config_dir.isdir():
@@ -167,3 +197,161 @@ def test_command_line_interface(tmpdir):
             config_dir.join(name).remove(rec=1, ignore_errors=True)
         if latest.isfile():
             latest.remove(ignore_errors=True)
+
+
+def test_command_line_startup(tmpdir):
+    """
+    Tests the command line interface startup of query commands.
+
+    Args:
+        tmpdir (py.path.local) tmpdir pytest fixture
+    """
+    from json import dumps, loads
+    from os import environ
+    from subprocess import run, PIPE
+    from sys import executable
+
+    # Mock an applied host configuration in a new user directory
+    home = tmpdir.join('home').ensure(dir=True)
+    config_dir = home.join('.accelize', 'hosts')
+    config_dir.join('latest').write('other', ensure=True)
+    config_dir.join('other').ensure(dir=True)
+    config_dir.join('host', 'terraform.tfstate').write(dumps(dict(
+        version=4, serial=1, resources=[], outputs=dict(
+            remote_user=dict(value='user'),
+            host_public_ip=dict(value='127.0.0.1'),
+            host_ssh_private_key=dict(value='./key.pem')))), ensure=True)
+
+    # Run the command, then report its duration and imported modules
+    script = '\n'.join((
+        'import sys', 'from json import dumps', 'from time import perf_counter',
+        'start = perf_counter()',
+        'from accelpy.__main__ import _run_command',
+        'try:', '    _run_command(sys.argv[1:])', 'except SystemExit:', '    pass',
+        'sys.stderr.write(dumps(dict(duration=perf_counter() - start, '
+        'modules=list(sys.modules))))'))
+
+    def run_query(*args):
+        """
+        Run a query command.
+
+        Args:
+            *args: CLI arguments.
+
+        Returns:
+            tuple: stdout, duration, modules.
+        """
+        result = run([executable, '-c', script] + list(args),
+                     stdout=PIPE, stderr=PIPE, universal_newlines=True,
+                     env=dict(environ, HOME=str(home)), check=True)
+        report = loads(result.stderr.splitlines()[-1])
+        return result.stdout.strip(), report['duration'], report['modules']
+
+    # Test: Importing the package should not import any of its modules
+    result = run([executable, '-c', 'import accelpy, sys; print(sorted('
+                  'm for m in sys.modules if m.startswith("accelpy")))'],
+                 stdout=PIPE, universal_newlines=True, check=True)
+    assert result.stdout.strip() == "['accelpy']"
+
+    # Test: Query commands do not load YAML or host configuration
+    for args, expected in (
+            (('ssh_user', '-n', 'host'), 'user'),
+            (('public_ip', '-n', 'host'), '127.0.0.1'),
+            (('ssh_private_key', '-n', 'host'),
+             str(config_dir.join('host', 'key.pem')))):
+        stdout, duration, modules = run_query(*args)
+        assert stdout == expected
+        assert 'yaml' not in modules
+        assert 'accelpy._host' not in modules
+        assert 'accelpy._application' not in modules
+
+        # Generous regression bound, query commands run in about 20 ms
+        assert duration < 0.5
+
+    # Test: Query commands do not change the latest used host
+    assert config_dir.join('latest').read() == 'other'
+
+    # Test: List does not load YAML
+    _, _, modules = run_query('list')
+    assert 'yaml' not in modules
+
+
+def test_command_line_batch(tmpdir):
+    """
+    Tests the command line interface batch mode.
+
+    Args:
+        tmpdir (py.path.local) tmpdir pytest fixture
+    """
+    from json import dumps, loads
+    from os import environ
+    from subprocess import run, PIPE
+    from sys import executable
+    from accelpy.__main__ import __file__ as cli_exec
+    from tests.test_core_application import mock_application
+
+    # Mock an applied host configuration in a new user directory
+    home = tmpdir.join('home').ensure(dir=True)
+    config_dir = home.join('.accelize', 'hosts')
+    config_dir.join('host', 'terraform.tfstate').write(dumps(dict(
+        version=4, serial=1, resources=[], outputs=dict(
+            remote_user=dict(value='user'),
+            host_public_ip=dict(value='127.0.0.1')))), ensure=True)
+    application = mock_application(tmpdir.join('source').ensure(dir=True))
+
+    actions = [
+        dict(action='public_ip', name='host', id='ip'),
+        dict(action='ssh_user', name='host'),
+        dict(action='private_ip', name='host'),
+        dict(action='lint', file=str(application)),
+        dict(action='lint'),
+        dict(action='public_ip', name='host', bad_argument=True),
+        dict(action='fleet', operation='bad_operation'),
+        dict(action='serve'),
+        dict(action='not_exists')]
+    lines = [dumps(action) for action in actions]
+    lines.insert(4, 'not_json')
+
+    result = run([executable, cli_exec, 'batch', '-w', '4'],
+                 input='\n'.join(lines), stdout=PIPE, stderr=PIPE,
+                 universal_newlines=True, env=dict(environ, HOME=str(home)))
+    assert not result.returncode
+
+    # Test: Results are returned with the action ID, or the line number
+    results = {response.pop('id'): response
+               for response in map(loads, result.stdout.splitlines())}
+    assert results.keys() == {'ip', *range(2, len(lines) + 1)}
+    assert results['ip'] == dict(action='public_ip', result='127.0.0.1')
+    assert results[2] == dict(action='ssh_user', result='user')
+    assert results[4] == dict(action='lint', result=None)
+    assert results[5] == dict(error='Invalid JSON object.')
+
+    # Test: Errors do not stop others actions
+    for index in (3, 6, 7, 8, 9, 10):
+        assert 'result' not in results[index]
+        assert results[index]['error']
+
+    # Test: Arguments converted like the command line parser does
+    import pytest
+    from accelpy.__main__ import _batch_args, _parser
+    from accelpy.exceptions import ConfigurationException
+
+    commands = _parser()[1]
+    args = _batch_args(commands, dict(
+        action='sync', name='ab', workers='2', upgrade=True))
+    assert args.name == ['ab']
+    assert args.workers == 2
+    assert args.upgrade is True
+
+    args = _batch_args(commands, dict(action='sync', name=['a', 'b']))
+    assert args.name == ['a', 'b']
+    assert args.workers is None
+    assert args.upgrade is False
+
+    for request in (dict(action='sync', workers='two'),
+                    dict(action='sync', upgrade='yes'),
+                    dict(action='sync', name=dict(a='b')),
+                    dict(action='sync', name=['a', ['b']]),
+                    dict(action='init', count=1.5)):
+        with pytest.raises(ConfigurationException):
+            _batch_args(commands, request)
@@ -78,3 +78,81 @@ def test_packer(tmpdir):
     assert packer.get_artifact(
         dict(builder_type='not_exist_builder',
              artifact_id='artifact_id')) == 'artifact_id'
+
+
+def test_image_cache(tmpdir):
+    """
+    Test Packer images cache
+
+    Args:
+        tmpdir (py.path.local) tmpdir pytest fixture
+    """
+    from os.path import join
+    from accelpy._common import json_write
+    from accelpy._packer import Packer
+
+    install_dir = tmpdir.join('install')
+    artifact = tmpdir.join('image.img')
+
+    class FakePacker(Packer):
+        """Fake Packer"""
+        builds = 0
+
+        @classmethod
+        def _install_dir(cls):
+            """Mocked install dir"""
+            return str(install_dir)
+
+        def _exec(self, *_, **__):
+            """Fake build that write a manifest"""
+            FakePacker.builds += 1
+            artifact.ensure()
+            run_uuid = str(self.builds)
+            json_write(dict(last_run_uuid=run_uuid, builds=[dict(
+                packer_run_uuid=run_uuid, builder_type='file',
+                files=[dict(name=str(artifact))])]),
+                       join(self._config_dir, 'packer-manifest.json'))
+
+    packers = []
+    for name in ('host_0', 'host_1'):
+        config_dir = tmpdir.join(name).ensure(dir=True)
+        json_write(dict(variables=dict(image_name=name, key='value')),
+                   config_dir.join('template.json'))
+        packers.append(FakePacker(config_dir))
+
+    # Test: Fingerprint does not depends on image name
+    fingerprint = packers[0].fingerprint('digest')
+    assert packers[1].fingerprint('digest') == fingerprint
+    assert packers[1].fingerprint('other_digest') != fingerprint
+
+    # Test: Build without cache
+    assert packers[0].get_cached_image(fingerprint) is None
+    packers[0].build(quiet=True)
+    assert FakePacker.builds == 1
+    assert packers[0].get_cached_image(fingerprint) is None
+
+    # Test: Build and cache
+    manifest = packers[0].build(quiet=True, fingerprint=fingerprint)
+    assert FakePacker.builds == 2
+    assert packers[0].get_cached_image(fingerprint) == manifest
+
+    # Test: Cached image returned without building
+    assert packers[1].build(quiet=True, fingerprint=fingerprint) == manifest
+    assert FakePacker.builds == 2
+
+    # Test: Removed image file is not returned
+    artifact.remove()
+    assert packers[1].get_cached_image(fingerprint) is None
+    packers[1].build(quiet=True, fingerprint=fingerprint)
+    assert FakePacker.builds == 3
+
+    # Test: Concurrent builds do not lose images
+    from concurrent.futures import ThreadPoolExecutor
+
+    fingerprints = [packers[0].fingerprint(str(index)) for index in range(8)]
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        list(executor.map(lambda key: packers[0]._built(key), fingerprints))
+    images = FakePacker._read_images()
+    assert set(fingerprints).issubset(images)
+    assert sorted(path.basename for path in install_dir.listdir()) == [
+        'images.json', 'images.json.lock']
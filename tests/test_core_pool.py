@@ -0,0 +1,174 @@
+# coding=utf-8
+"""Pool tests"""
+
+
+def test_pool(tmpdir):
+    """
+    Test pool
+
+    Args:
+        tmpdir (py.path.local) tmpdir pytest fixture
+    """
+    from concurrent.futures import ThreadPoolExecutor
+    from time import sleep
+    import pytest
+    import accelpy._host as accelpy_host
+    import accelpy._fleet as accelpy_fleet
+    import accelpy._pool as accelpy_pool
+    from accelpy._host import get_registry
+    from accelpy._fleet import Fleet
+    from accelpy._pool import Pool
+    from accelpy._common import json_write
+    from accelpy.exceptions import ConfigurationException, RuntimeException
+
+    application = tmpdir.join('application.yml').ensure()
+    failures = set()
+
+    class FakeHost:
+        """Fake host"""
+
+        def __init__(self, name, application=None, provider=None,
+                     user_config=None, **_):
+            self.name = name
+            if application:
+                json_write(dict(provider=provider, user_config=user_config),
+                           config_dir.join(name).ensure(
+                               'user_parameters.json'))
+                get_registry().update(name, provider=provider,
+                                      application=application,
+                                      status='initialized')
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *_):
+            pass
+
+        def apply(self, **_):
+            """Fake apply"""
+            if failures:
+                failures.pop()
+                raise RuntimeException('apply error')
+            get_registry().update(self.name, status='applied')
+
+        def destroy(self, delete=None, **_):
+            """Fake destroy"""
+            assert delete
+            config_dir.join(self.name).remove(rec=1)
+            get_registry().remove(self.name)
+
+    # Mock config dir and host
+    accelpy_host_config_dir = accelpy_host.CONFIG_DIR
+    config_dir = tmpdir.join('config').ensure(dir=True)
+    accelpy_host.CONFIG_DIR = str(config_dir)
+    fleet_host = accelpy_fleet.Host
+    pool_host = accelpy_pool.Host
+    accelpy_fleet.Host = accelpy_pool.Host = FakeHost
+    fleet_prepare = Fleet._prepare
+    Fleet._prepare = staticmethod(lambda _: None)
+
+    try:
+        # Test: Unknown pool
+        with pytest.raises(ConfigurationException):
+            Pool('pool')
+
+        # Test: Fill pool
+        pool = Pool('pool', application=application, provider='testing',
+                    size=3)
+        assert pool.status() == dict(size=3, ready=0, pending=0, claimed=0)
+        results = pool.fill()
+        assert len(results) == 3
+        assert all(name.startswith('pool_') for name in results)
+        assert pool.status() == dict(size=3, ready=3, pending=0, claimed=0)
+        assert pool.fill() == dict()
+
+        # Test: Failed hosts are removed
+        failures.add(1)
+        pool.claim()
+        results = pool.fill()
+        assert len(results) == 1
+        assert pool.last_results is results
+        assert pool.status() == dict(size=3, ready=2, pending=0, claimed=1)
+        assert len(get_registry().select(pool='pool')) == 3
+
+        # Test: Existing pool opened by name
+        pool = Pool('pool')
+        assert pool.size == 3
+
+        # Test: Existing pool size kept if not specified
+        assert Pool('pool', application=application,
+                    provider='testing').size == 3
+
+        # Test: Claim is atomic
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            claims = list(executor.map(
+                lambda _: get_registry().claim('pool'), range(8)))
+        claimed = [record.name for record in claims if record]
+        assert len(claimed) == len(set(claimed)) == 2
+        assert pool.status() == dict(size=3, ready=0, pending=0, claimed=3)
+
+        # Test: Claim on empty pool
+        with pytest.raises(RuntimeException):
+            pool.claim()
+        with pytest.raises(RuntimeException):
+            pool.claim(timeout=0.1)
+
+        # Test: Release
+        pool.release(claimed[0])
+        assert pool.claim().name == claimed[0]
+        pool.release(claimed[1], destroy=True)
+        assert get_registry().get(claimed[1]) is None
+        with pytest.raises(ConfigurationException):
+            pool.release(claimed[1])
+
+        # Test: Background refill
+        with Pool('pool', size=4) as pool:
+            for _ in range(100):
+                if pool.status()['ready'] == 4:
+                    break
+                sleep(0.05)
+            assert pool.status() == dict(size=4, ready=4, pending=0, claimed=2)
+
+            # Test: Refilled after claim
+            pool.claim()
+            for _ in range(100):
+                if pool.status()['ready'] == 4:
+                    break
+                sleep(0.05)
+            assert pool.status() == dict(size=4, ready=4, pending=0, claimed=3)
+
+        # Test: Background refill continues after errors
+        fills = []
+
+        def fill():
+            """Fake fill failing once"""
+            fills.append(None)
+            if len(fills) == 1:
+                raise KeyError('fill error')
+
+        failing_pool = Pool('pool')
+        failing_pool.fill = fill
+        failing_pool.start(interval=0.01)
+        for _ in range(100):
+            if len(fills) > 1:
+                break
+            sleep(0.05)
+        failing_pool.stop()
+        assert len(fills) > 1
+        assert isinstance(
+            failing_pool.last_results['pool_*']['error'], KeyError)
+
+        # Test: Drain
+        results = pool.drain()
+        assert len(results) == 4
+        assert get_registry().get_pool('pool') is None
+        records = get_registry().select()
+        assert len(records) == 3
+        assert all(record.pool is None for record in records)
+
+    # Restore mocked config dir and host
+    finally:
+        accelpy_host.CONFIG_DIR = accelpy_host_config_dir
+        accelpy_fleet.Host = fleet_host
+        accelpy_pool.Host = pool_host
+        Fleet._prepare = fleet_prepare
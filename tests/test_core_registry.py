@@ -0,0 +1,189 @@
+# coding=utf-8
+"""Hosts registry tests"""
+
+
+def test_registry(tmpdir):
+    """
+    Test hosts registry
+
+    Args:
+        tmpdir (py.path.local) tmpdir pytest fixture
+    """
+    from accelpy._registry import Registry
+
+    path = tmpdir.join('registry.sqlite')
+    registry = Registry(path)
+
+    # Test: Empty registry
+    assert registry.select() == []
+    assert registry.get('host_0') is None
+
+    # Test: Add hosts
+    registry.update('host_0', provider='aws', application='app.yml',
+                    status='initialized')
+    registry.update_many({
+        'host_1': dict(provider='aws', application='other.yml',
+                       status='initialized'),
+        'host_2': dict(provider='testing', application='app.yml',
+                       status='initialized')})
+
+    record = registry.get('host_0')
+    assert record.name == 'host_0'
+    assert record.provider == 'aws'
+    assert record.outputs == {}
+    assert record.created == record.updated
+
+    # Test: Update host
+    outputs = dict(host_public_ip='127.0.0.1')
+    registry.update('host_0', status='applied', outputs=outputs)
+    record = registry.get('host_0')
+    assert record.status == 'applied'
+    assert record.outputs == outputs
+    assert record.provider == 'aws'
+    assert record.updated >= record.created
+
+    # Test: Select with filters (Persisted between instances)
+    registry = Registry(path)
+    assert [record.name for record in registry.select()] == [
+        'host_0', 'host_1', 'host_2']
+    assert [record.name for record in registry.select(provider='aws')] == [
+        'host_0', 'host_1']
+    assert [record.name for record in registry.select(
+        provider='aws', application='app.yml')] == ['host_0']
+    assert [record.name for record in registry.select(
+        status='initialized', provider=None)] == ['host_1', 'host_2']
+
+    # Test: Remove host
+    registry.remove('host_1')
+    assert registry.get('host_1') is None
+    assert len(registry.select()) == 2
+
+
+def test_get_registry(tmpdir):
+    """
+    Test registry initialization from existing configurations.
+
+    Args:
+        tmpdir (py.path.local) tmpdir pytest fixture
+    """
+    import accelpy._host as accelpy_host
+    from accelpy._host import get_registry, iter_host_names
+    from accelpy._common import json_write
+
+    # Mock config dir
+    accelpy_host_config_dir = accelpy_host.CONFIG_DIR
+    config_dir = tmpdir.join('config').ensure(dir=True)
+    accelpy_host.CONFIG_DIR = str(config_dir)
+
+    try:
+        # Mock existing configurations
+        application = tmpdir.join('application.yml').ensure()
+        for name, provider in (('host_0', 'aws'), ('host_1', 'testing')):
+            host_dir = config_dir.join(name).ensure(dir=True)
+            json_write(dict(provider=provider, user_config=str(tmpdir)),
+                       host_dir.join('user_parameters.json'))
+            host_dir.join('application.yml').mksymlinkto(application)
+        config_dir.join('host_0', 'terraform.tfstate').ensure()
+        config_dir.join('not_a_host').ensure(dir=True)
+        config_dir.join('latest').ensure()
+
+        # Test: Registry initialized from configurations
+        record = get_registry().get('host_0')
+        assert record.status == 'applied'
+        assert record.application == str(application)
+        assert get_registry().get('host_1').status == 'initialized'
+        assert get_registry().get('not_a_host') is None
+
+        # Test: Filtered names
+        assert list(iter_host_names()) == ['host_0', 'host_1']
+        assert list(iter_host_names(provider='testing')) == ['host_1']
+        assert list(iter_host_names(application=application)) == [
+            'host_0', 'host_1']
+        assert list(iter_host_names(status='applied')) == ['host_0']
+
+        # Test: Reconciled only once per process
+        get_registry().update('host_1', status='destroyed')
+        host_dir = config_dir.join('host_2').ensure(dir=True)
+        json_write(dict(provider='aws', user_config=str(tmpdir)),
+                   host_dir.join('user_parameters.json'))
+        config_dir.join('host_0').remove()
+        assert list(iter_host_names(provider='aws')) == ['host_0']
+
+        # Test: Configurations added and removed after the registry creation
+        accelpy_host._RECONCILED.clear()
+        assert list(iter_host_names(provider='aws')) == ['host_2']
+        assert get_registry().get('host_2').status == 'initialized'
+        assert get_registry().get('host_0') is None
+
+        # Test: Existing records not overwritten
+        assert get_registry().get('host_1').status == 'destroyed'
+
+    # Restore mocked config dir
+    finally:
+        accelpy_host.CONFIG_DIR = accelpy_host_config_dir
+
+
+def test_host_info():
+    """
+    Test host information record.
+    """
+    from pickle import dumps, loads
+    from accelpy._registry import HostInfo
+
+    info = HostInfo(name='host_0', provider='aws', status='applied',
+                    outputs=dict(host_public_ip='127.0.0.1'))
+
+    # Test: Lightweight record
+    assert not hasattr(info, '__dict__')
+    assert 'host_0' in str(info)
+    assert info.to_dict()['outputs'] == dict(host_public_ip='127.0.0.1')
+    assert info.user_config is None
+
+    # Test: Pickle
+    assert loads(dumps(info)) == info
+
+    # Test: Hashable
+    assert {info, loads(dumps(info))} == {info}
+    assert info != HostInfo(name='host_1')
+
+
+def test_registry_upgrade(tmpdir):
+    """
+    Test hosts registry schema upgrade.
+
+    Args:
+        tmpdir (py.path.local) tmpdir pytest fixture
+    """
+    from sqlite3 import connect
+    from accelpy._registry import Registry
+
+    # Mock version 1 registry
+    path = str(tmpdir.join('registry.sqlite'))
+    connection = connect(path)
+    with connection:
+        connection.execute(
+            'CREATE TABLE hosts (name TEXT PRIMARY KEY, provider TEXT, '
+            'application TEXT, user_config TEXT, status TEXT, outputs TEXT, '
+            'created REAL, updated REAL)')
+        connection.execute(
+            "INSERT INTO hosts (name, status) VALUES ('host_0', 'applied')")
+        connection.execute('PRAGMA user_version = 1')
+    connection.close()
+
+    # Test: Existing records kept and new columns available
+    registry = Registry(path)
+    record = registry.get('host_0')
+    assert record.status == 'applied'
+    assert record.pool is None
+    registry.update('host_0', pool='pool')
+    assert registry.claim('pool').name == 'host_0'
+    assert registry.claim('pool') is None
+
+    # Test: Concurrent creation of a new registry
+    from concurrent.futures import ThreadPoolExecutor
+
+    path = str(tmpdir.join('concurrent.sqlite'))
+    with ThreadPoolExecutor(max_workers=16) as executor:
+        registries = list(executor.map(Registry, [path] * 16))
+    registries[0].update('host_0', status='applied')
+    assert registries[-1].get('host_0').status == 'applied'
@@ -0,0 +1,139 @@
+# coding=utf-8
+"""Daemon tests"""
+
+
+def test_server(tmpdir):
+    """
+    Tests the daemon.
+
+    Args:
+        tmpdir (py.path.local) tmpdir pytest fixture
+    """
+    from json import dumps, loads
+    from socket import AF_UNIX, SOCK_STREAM, socket
+    from threading import Event
+    import pytest
+    import accelpy._host as accelpy_host
+    from accelpy._server import Server, request
+    from accelpy.exceptions import ConfigurationException, RuntimeException
+
+    config_dir = tmpdir.join('hosts').ensure(dir=True)
+    path = str(tmpdir.join('accelpy.sock'))
+    release = Event()
+
+    class FakeHost:
+        """Fake host"""
+
+        def __init__(self, name, **_):
+            self.name = name
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *_):
+            pass
+
+        @staticmethod
+        def apply(quiet=False, line_callback=None):
+            """Fake apply waiting to be released"""
+            assert quiet
+            line_callback('line 1')
+            release.wait()
+            line_callback('line 2')
+
+        @staticmethod
+        def plan():
+            """Fake plan"""
+            return 'plan'
+
+        @staticmethod
+        def destroy(**_):
+            """Fake destroy"""
+            raise RuntimeException('destroy error')
+
+    # Mock an applied host configuration
+    config_dir.join('host', 'terraform.tfstate').write(dumps(dict(
+        version=4, serial=1, resources=[], outputs=dict(
+            remote_user=dict(value='user'),
+            host_public_ip=dict(value='127.0.0.1'),
+            host_ssh_private_key=dict(value='./key.pem')))), ensure=True)
+
+    accelpy_host_config_dir = accelpy_host.CONFIG_DIR
+    accelpy_host.CONFIG_DIR = str(config_dir)
+    accelpy_host_host = accelpy_host.Host
+    accelpy_host.Host = FakeHost
+    try:
+        # Test: Not running
+        with pytest.raises(FileNotFoundError):
+            request('public_ip', name='host', path=path)
+
+        with Server(path=path) as server:
+            assert server.path == path
+
+            # Test: Only one daemon
+            with pytest.raises(ConfigurationException):
+                Server(path=path).start()
+
+            # Test: Queries
+            assert request('public_ip', name='host', path=path) == '127.0.0.1'
+            assert request('ssh_user', name='host', path=path) == 'user'
+            assert request('ssh_private_key', name='host', path=path) == str(
+                config_dir.join('host', 'key.pem'))
+
+            # Test: Errors
+            with pytest.raises(ConfigurationException):
+                request('private_ip', name='host', path=path)
+            with pytest.raises(ConfigurationException):
+                request('public_ip', name='not_exists', path=path)
+            with pytest.raises(ConfigurationException):
+                request('not_exists', path=path)
+            with pytest.raises(ConfigurationException):
+                request('wait', name='host', path=path)
+
+            # Test: Invalid requests
+            for line in ('not_json', '[]', '{"command": "list", "kwargs": 1}'):
+                with socket(AF_UNIX, SOCK_STREAM) as client:
+                    client.connect(path)
+                    client.sendall((line + '\n').encode())
+                    with client.makefile('r') as stream:
+                        assert loads(stream.readline()) == dict(
+                            error='Invalid request.',
+                            type='ConfigurationException')
+
+            # Test: Unexpected error returned to the client with its message
+            with pytest.raises(RuntimeException) as exception:
+                request('info', name='host', path=path)
+            assert 'info' in str(exception.value)
+
+            # Test: Operation result
+            assert request('plan', name='host', path=path) == 'plan'
+            with pytest.raises(RuntimeException):
+                request('destroy', name='host', path=path)
+
+            # Test: Operation continue after client disconnection
+            with socket(AF_UNIX, SOCK_STREAM) as client:
+                client.connect(path)
+                client.sendall((dumps(dict(
+                    command='apply', kwargs=dict(name='host'))) +
+                    '\n').encode())
+                with client.makefile('r') as stream:
+                    assert loads(stream.readline()) == dict(line='line 1')
+
+            # Test: Only one operation at once per host
+            with pytest.raises(ConfigurationException):
+                request('plan', name='host', path=path)
+
+            # Test: Wait for the operation end
+            lines = []
+            release.set()
+            assert request('wait', name='host', path=path,
+                           line_callback=lines.append) is None
+            assert lines == ['line 1', 'line 2']
+
+        # Test: Socket removed on stop
+        assert not tmpdir.join('accelpy.sock').exists()
+
+    finally:
+        release.set()
+        accelpy_host.CONFIG_DIR = accelpy_host_config_dir
+        accelpy_host.Host = accelpy_host_host
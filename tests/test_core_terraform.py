@@ -178,3 +178,374 @@ def test_common_configuration(tmpdir):
     terraform.apply(quiet=True)
 
     assert terraform.output['host_ssh_private_key'] == str(user_ssh_key)
+
+
+def test_read_state(tmpdir):
+    """
+    Test Terraform state reader
+
+    Args:
+        tmpdir (py.path.local) tmpdir pytest fixture
+    """
+    from os import utime
+    from accelpy._common import json_write
+    from accelpy._terraform import read_state, Terraform
+    from accelpy.exceptions import RuntimeException
+
+    config_dir = tmpdir.join('config').ensure(dir=True)
+    state_file = config_dir.join('terraform.tfstate')
+    state_path = str(state_file)
+    terraform = Terraform(config_dir)
+
+    # Test: No state
+    assert terraform.state_list() == []
+    assert terraform.output == dict()
+
+    # Test: Read state
+    state = {
+        "version": 4,
+        "serial": 3,
+        "outputs": {
+            "host_public_ip": {"value": "127.0.0.1", "type": "string"},
+            "remote_user": {"value": "user", "type": "string"}},
+        "resources": [
+            {"mode": "data", "type": "http", "name": "public_ip",
+             "instances": [{"attributes": {}}]},
+            {"mode": "managed", "type": "local_file", "name": "key",
+             "each": "list", "instances": [
+                 {"index_key": 0, "attributes": {}},
+                 {"index_key": 1, "attributes": {}}]},
+            {"module": "module.network", "mode": "managed", "type": "aws_vpc",
+             "name": "vpc", "each": "map", "instances": [
+                 {"index_key": "main", "attributes": {}}]},
+            {"mode": "managed", "type": "aws_instance", "name": "empty",
+             "instances": []}]}
+    json_write(state, state_file)
+
+    result = read_state(state_path)
+    assert result['serial'] == 3
+    assert result['outputs'] == {
+        "host_public_ip": "127.0.0.1", "remote_user": "user"}
+    assert result['resources'] == [
+        'data.http.public_ip', 'local_file.key[0]', 'local_file.key[1]',
+        'module.network.aws_vpc.vpc["main"]']
+    assert terraform.state_list() == result['resources']
+    assert terraform.output == result['outputs']
+
+    # Test: Cached result
+    assert read_state(state_path) is result
+
+    # Test: Cache invalidated on file change
+    state['serial'] = 4
+    state['resources'] = []
+    json_write(state, state_file)
+    utime(state_path, ns=(0, 0))
+    assert read_state(state_path)['serial'] == 4
+    assert terraform.state_list() == []
+
+    # Test: Unsupported version
+    json_write(dict(version=3, modules=[]), state_file)
+    assert read_state(state_path) is None
+
+    # Test: Invalid state
+    state_file.write(b'invalid_state_file')
+    with pytest.raises(RuntimeException):
+        read_state(state_path)
+    with pytest.raises(RuntimeException):
+        terraform.state_list()
+
+
+def test_events(tmpdir):
+    """
+    Test Terraform machine-readable output events
+
+    Args:
+        tmpdir (py.path.local) tmpdir pytest fixture
+    """
+    from json import dumps
+    import pytest
+    from accelpy._common import json_read
+    from accelpy._terraform import Terraform, TerraformEvent, DURATIONS_FILE
+    from accelpy.exceptions import RuntimeException
+
+    resource = {"addr": "aws_instance.instance", "resource_type": "aws_instance",
+                "resource_name": "instance", "implied_provider": "aws"}
+    messages = [
+        {"@level": "info", "@message": "Terraform 1.0.0", "type": "version"},
+        {"@level": "info", "@message": "aws_instance.instance: Creating...",
+         "type": "apply_start",
+         "hook": {"resource": resource, "action": "create"}},
+        {"@level": "info",
+         "@message": "aws_instance.instance: Creation complete after 12s",
+         "type": "apply_complete",
+         "hook": {"resource": resource, "action": "create",
+                  "elapsed_seconds": 12}},
+        {"@level": "info",
+         "@message": "aws_instance.instance: Provisioning with 'local-exec'...",
+         "type": "provision_start",
+         "hook": {"resource": resource, "provisioner": "local-exec"}},
+        {"@level": "info",
+         "@message": "aws_instance.instance: (local-exec): PLAY RECAP",
+         "type": "provision_progress",
+         "hook": {"resource": resource, "provisioner": "local-exec",
+                  "output": "PLAY RECAP"}},
+        {"@level": "info",
+         "@message": "aws_instance.instance: (local-exec) Provisioning done",
+         "type": "provision_complete",
+         "hook": {"resource": resource, "provisioner": "local-exec"}}]
+    error = {"@level": "error", "@message": "Error: Error launching instance",
+             "type": "diagnostic",
+             "diagnostic": {"severity": "error",
+                            "summary": "Error launching instance",
+                            "detail": "Insufficient capacity"}}
+    lines = [dumps(message) for message in messages] + ['Not JSON line']
+
+    # Test: Parse events
+    event = TerraformEvent.from_json(lines[2])
+    assert event.type == 'apply_complete'
+    assert event.stage == 'apply'
+    assert event.status == 'complete'
+    assert event.resource == 'aws_instance.instance'
+    assert event.action == 'create'
+    assert event.elapsed == 12
+    assert str(event) == messages[2]['@message']
+    assert TerraformEvent.from_json(lines[0]).stage is None
+    assert TerraformEvent.from_json('Not JSON line') is None
+    assert TerraformEvent.from_json('{}') is None
+
+    # Mock Terraform calls
+    executable = tmpdir.join('terraform').ensure()
+
+    class FakeTerraform(Terraform):
+        """Fake Terraform"""
+        fail = False
+
+        @classmethod
+        def _get_executable(cls, version=None):
+            """Fake executable"""
+            return str(executable)
+
+        def _exec(self, *args, line_callback=None, **_):
+            """
+            Fake calls that output JSON messages
+            """
+            if '-json' not in args:
+                return
+            for line in lines:
+                line_callback(line)
+            if self.fail:
+                line_callback(dumps(error))
+                raise RuntimeException(dumps(error))
+
+    config_dir = tmpdir.join('config').ensure(dir=True)
+    terraform = FakeTerraform(config_dir)
+
+    # Test: Events and human-readable messages
+    events = []
+    outputs = []
+    terraform.apply(quiet=True, event_callback=events.append,
+                    line_callback=outputs.append)
+    assert [event.type for event in events] == [
+        message['type'] for message in messages]
+    assert outputs == [message['@message'] for message in messages] + [
+        'Not JSON line']
+
+    # Test: Durations
+    durations = json_read(config_dir.join(DURATIONS_FILE))['apply']
+    assert len(durations) == 2
+    assert {(item['stage'], item['provisioner']) for item in durations} == {
+        ('apply', None), ('provision', 'local-exec')}
+    for item in durations:
+        assert item['resource'] == 'aws_instance.instance'
+        assert item['status'] == 'complete'
+        assert item['elapsed'] >= 0
+
+    # Test: Errors from diagnostics
+    terraform.fail = True
+    with pytest.raises(RuntimeException) as exception:
+        terraform.destroy(quiet=True)
+    assert str(exception.value) == 'Error: Error launching instance\n' \
+                                   'Insufficient capacity'
+    durations = json_read(config_dir.join(DURATIONS_FILE))
+    assert len(durations['apply']) == len(durations['destroy']) == 2
+
+
+def test_init_cache(tmpdir):
+    """
+    Test Terraform initialization state persistence
+
+    Args:
+        tmpdir (py.path.local) tmpdir pytest fixture
+    """
+    from asyncio import new_event_loop
+    from concurrent.futures import ThreadPoolExecutor
+    from time import sleep
+    from accelpy._terraform import Terraform, LOCK_FILE
+
+    config_dir = tmpdir.join('config').ensure(dir=True)
+    source_dir = tmpdir.join('source').ensure(dir=True)
+    install_dir = tmpdir.join('install')
+    executable = tmpdir.join('terraform').ensure()
+    mock_terraform_provider(source_dir)
+    calls = []
+
+    # Mock Terraform calls
+    class FakeTerraform(Terraform):
+        """Fake Terraform"""
+
+        @classmethod
+        def _get_executable(cls, version=None):
+            """Fake executable"""
+            return str(executable)
+
+        @classmethod
+        def _install_dir(cls):
+            """Fake install directory"""
+            return str(install_dir)
+
+        def _exec(self, *args, **_):
+            """Fake calls"""
+            calls.append(args[0])
+
+    def init():
+        """Initialize a new Terraform instance and return True if called"""
+        del calls[:]
+        FakeTerraform(config_dir, user_config=source_dir)._init()
+        return calls == ['init']
+
+    FakeTerraform(config_dir, variables=dict(host_name='testing'),
+                  user_config=source_dir).create_configuration()
+
+    # Test: Initialized once, then state is shared between instances
+    assert init()
+    assert not init()
+
+    # Test: Initialized again on configuration change
+    source_dir.join('common.testing_override.tf.json').write('{}')
+    config_dir.join('common.testing_override.tf.json').mksymlinkto(
+        source_dir.join('common.testing_override.tf.json'))
+    assert init()
+    assert not init()
+
+    # Test: Initialized again on lock file change
+    config_dir.join(LOCK_FILE).write('provider')
+    assert init()
+    assert not init()
+
+    # Test: Initialized again on executable change
+    executable.write('new version')
+    assert init()
+    assert not init()
+
+    # Test: Initialized again if state removed
+    config_dir.join('.terraform').remove(rec=1)
+    config_dir.join('.terraform').ensure(dir=True)
+    assert init()
+
+    # Test: Concurrent initializations are serialized
+    running = []
+    overlaps = []
+
+    class SlowTerraform(FakeTerraform):
+        """Fake Terraform with slow initialization"""
+
+        def _exec(self, *args, **_):
+            """Fake slow calls"""
+            running.append(None)
+            overlaps.append(len(running) > 1)
+            sleep(0.05)
+            running.pop()
+
+        async def _exec_async(self, *args, **kwargs):
+            """Fake slow async calls"""
+            self._exec(*args, **kwargs)
+
+    terraforms = []
+    for index in range(4):
+        host_dir = tmpdir.join(f'config_{index}').ensure(dir=True)
+        terraform = SlowTerraform(
+            host_dir, variables=dict(host_name='testing'),
+            user_config=source_dir)
+        terraform.create_configuration()
+        terraforms.append(terraform)
+
+    loop = new_event_loop()
+    try:
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            futures = [executor.submit(terraform._init)
+                       for terraform in terraforms[:3]]
+            loop.run_until_complete(terraforms[3]._init_async())
+            for future in futures:
+                future.result()
+    finally:
+        loop.close()
+    assert len(overlaps) == 4
+    assert not any(overlaps)
+    assert install_dir.join('plugins.lock').check(file=True)
+
+
+def test_providers_mirror(tmpdir):
+    """
+    Test Terraform providers plugin cache and local filesystem mirror
+
+    Args:
+        tmpdir (py.path.local) tmpdir pytest fixture
+    """
+    import tarfile
+    from accelpy._terraform import Terraform
+    from accelpy.exceptions import ConfigurationException
+
+    install_dir = tmpdir.join('install')
+    provider = 'registry.terraform.io/hashicorp/aws'
+
+    # Mock install directory
+    class FakeTerraform(Terraform):
+        """Fake Terraform"""
+
+        @classmethod
+        def _install_dir(cls):
+            """Fake install directory"""
+            return str(install_dir)
+
+    # Test: Plugin cache only without mirrored providers
+    env = FakeTerraform._environ()
+    assert env['TF_PLUGIN_CACHE_DIR'] == str(install_dir.join('plugins'))
+    assert install_dir.join('plugins').check(dir=True)
+    assert FakeTerraform.mirrored_providers() == []
+    assert env.get('TF_CLI_CONFIG_FILE') != str(install_dir.join('terraformrc'))
+
+    # Test: Import mirror from archive
+    source_dir = tmpdir.join('source')
+    source_dir.join(provider, 'terraform-provider-aws_1.0.0_linux_amd64.zip'
+                    ).write('provider', ensure=True)
+    archive = tmpdir.join('providers.tar')
+    with tarfile.open(str(archive), 'w') as tar_file:
+        tar_file.add(str(source_dir.join('registry.terraform.io')),
+                     'registry.terraform.io')
+    assert FakeTerraform.import_mirror(archive) == [provider]
+
+    # Test: Mirrored providers are resolved from mirror only
+    cli_config = FakeTerraform._environ()['TF_CLI_CONFIG_FILE']
+    assert cli_config == str(install_dir.join('terraformrc'))
+    content = install_dir.join('terraformrc').read()
+    assert 'filesystem_mirror' in content
+    assert content.count(f'"{provider}"') == 2
+    assert FakeTerraform._cli_config() == cli_config
+
+    # Test: Export mirror
+    exported = tmpdir.join('exported.tar.gz')
+    FakeTerraform.export_mirror(exported)
+    with tarfile.open(str(exported)) as tar_file:
+        assert f'{provider}/terraform-provider-aws_1.0.0_linux_amd64.zip' in \
+            tar_file.getnames()
+
+    # Test: Unsafe or invalid archives
+    with tarfile.open(str(archive), 'w') as tar_file:
+        tar_file.add(str(source_dir.join(provider)), '../escape')
+    with pytest.raises(ConfigurationException):
+        FakeTerraform.import_mirror(archive)
+    assert not install_dir.join('escape').check()
+
+    archive.write('invalid')
+    with pytest.raises(ConfigurationException):
+        FakeTerraform.import_mirror(archive)